@@ -0,0 +1,261 @@
+"""Benchmarks for image_ops hot paths with JSON baselines.
+
+Generates a synthetic corpus (camera-sized JPEGs, RGBA PNGs, a long animated
+GIF), times the hot paths and reports images/s, MB/s and peak RSS. Each
+benchmark runs in a fresh process so its peak RSS is its own.
+
+    python benchmarks/bench_image_ops.py --megapixels 12 48 --save-baseline base.json
+    python benchmarks/bench_image_ops.py --megapixels 12 48 --baseline base.json
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from PIL import Image  # noqa: E402
+
+from image_ops import (  # noqa: E402
+    apply_transforms,
+    convert_batch,
+    extract_gif_frame,
+    save_image,
+)
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+DEFAULT_THRESHOLD = 0.15
+
+
+def _peak_rss_mb(who=None):
+    """Peak resident set size in MB (None where the resource module is missing)."""
+    if resource is None:
+        return None
+    usage = resource.getrusage(resource.RUSAGE_SELF if who is None else who)
+    # ru_maxrss is KiB on Linux, bytes on macOS
+    scale = 1 if sys.platform == 'darwin' else 1024
+    return usage.ru_maxrss * scale / 1e6
+
+
+def _textured(size, mode="RGB"):
+    """Smooth noise over a gradient: compresses like a photo, unlike flat colour."""
+    small = (max(1, size[0] // 8), max(1, size[1] // 8))
+    bands = [
+        Image.effect_noise(small, 64).resize(size, Image.Resampling.BICUBIC)
+        for _ in range(len(mode))
+    ]
+    gradient = Image.linear_gradient('L').resize(size)
+    bands = [Image.blend(band, gradient, 0.3) for band in bands]
+    return Image.merge(mode, bands)
+
+
+def _size_4x3(megapixels):
+    width = int((megapixels * 1e6 * 4 / 3) ** 0.5)
+    return width, int(width * 3 / 4)
+
+
+def make_corpus(directory, megapixels=(12,), batch_size=8, gif_frames=300, batch_megapixels=6, rgba_megapixels=4):
+    """Write the synthetic corpus into directory (reused if already present)."""
+    corpus = {'jpeg': {}, 'batch': [], 'png_rgba': None, 'gif': None}
+    os.makedirs(directory, exist_ok=True)
+    for mp in megapixels:
+        size = _size_4x3(mp)
+        path = os.path.join(directory, f"camera_{mp}mp.jpg")
+        if not os.path.exists(path):
+            _textured(size).save(path, quality=90)
+        corpus['jpeg'][mp] = path
+
+    batch_img = None
+    for i in range(batch_size):
+        path = os.path.join(directory, f"batch_{batch_megapixels}mp_{i:03d}.jpg")
+        if not os.path.exists(path):
+            if batch_img is None:
+                batch_img = _textured(_size_4x3(batch_megapixels))
+            batch_img.rotate(i * 7).save(path, quality=88)
+        corpus['batch'].append(path)
+
+    path = os.path.join(directory, f"overlay_rgba_{rgba_megapixels}mp.png")
+    if not os.path.exists(path):
+        _textured(_size_4x3(rgba_megapixels), mode="RGBA").save(path)
+    corpus['png_rgba'] = path
+
+    path = os.path.join(directory, f"long_{gif_frames}.gif")
+    if not os.path.exists(path):
+        base = _textured((320, 240)).convert('P', palette=Image.Palette.ADAPTIVE)
+        frames = [base.rotate(i % 360) for i in range(gif_frames)]
+        frames[0].save(path, save_all=True, append_images=frames[1:], duration=40, loop=0)
+    corpus['gif'] = path
+    return corpus
+
+
+def _time(fn, repeat):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return times
+
+
+def bench_apply_transforms(repeat, path):
+    with Image.open(path) as img:
+        source = img.copy()
+    options = dict(enable_resize=True, resize_width=1600, resize_height=1600, rotate_degrees=90, grayscale=True)
+    times = _time(lambda: apply_transforms(source.copy(), **options), repeat)
+    return times, 1, source.width * source.height * len(source.getbands())
+
+
+def bench_save_image(repeat, path, output_format):
+    with Image.open(path) as img:
+        source = img.copy()
+    with tempfile.TemporaryDirectory(prefix="bench_save_") as out_dir:
+        output_path = os.path.join(out_dir, f"out.{output_format}")
+        times = _time(lambda: save_image(source, output_path, output_format, quality=85), repeat)
+    return times, 1, source.width * source.height * len(source.getbands())
+
+
+def bench_extract_gif_frame(repeat, path):
+    def run():
+        with Image.open(path) as img:
+            extract_gif_frame(img, img.n_frames - 1)
+    times = _time(run, repeat)
+    return times, 1, os.path.getsize(path)
+
+
+def bench_convert_batch(repeat, paths, workers):
+    def run():
+        with tempfile.TemporaryDirectory(prefix="bench_batch_") as out_dir:
+            for result in convert_batch(
+                paths, out_dir, 'webp', workers=workers, enable_resize=True, resize_width=1600, resize_height=1600
+            ):
+                if result.error:
+                    raise RuntimeError(result.error)
+    times = _time(run, repeat)
+    return times, len(paths), sum(os.path.getsize(p) for p in paths)
+
+
+def _run_one(name, func_name, args, repeat):
+    """Run a benchmark function (in a fresh worker process) and summarize it."""
+    times, images, nbytes = globals()[func_name](repeat, *args)
+    best = min(times)
+    peak = _peak_rss_mb()
+    if func_name == 'bench_convert_batch' and resource is not None:
+        peak = max(peak, _peak_rss_mb(resource.RUSAGE_CHILDREN))
+    return {
+        'name': name,
+        'seconds_min': best,
+        'seconds_median': statistics.median(times),
+        'images_per_sec': images / best,
+        'mb_per_sec': nbytes / best / 1e6,
+        'peak_rss_mb': peak,
+    }
+
+
+def plan_benchmarks(corpus, workers):
+    """Return (name, function name, args) for every benchmark over the corpus."""
+    plan = []
+    for mp, path in sorted(corpus['jpeg'].items()):
+        plan.append((f"apply_transforms[{mp}mp]", 'bench_apply_transforms', (path,)))
+        for output_format in ('jpg', 'png', 'webp'):
+            plan.append((f"save_image[{output_format},{mp}mp]", 'bench_save_image', (path, output_format)))
+    plan.append(("save_image[png,rgba]", 'bench_save_image', (corpus['png_rgba'], 'png')))
+    plan.append(("extract_gif_frame[last]", 'bench_extract_gif_frame', (corpus['gif'],)))
+    plan.append(
+        (f"convert_batch[{len(corpus['batch'])}x,w{workers}]", 'bench_convert_batch', (corpus['batch'], workers))
+    )
+    return plan
+
+
+def run_suite(corpus, repeat=3, workers=None, isolate=True):
+    """Run every benchmark; returns a results dict suitable for a JSON baseline."""
+    workers = workers or os.cpu_count() or 1
+    results = []
+    for name, func_name, args in plan_benchmarks(corpus, workers):
+        if isolate:
+            with ProcessPoolExecutor(max_workers=1, mp_context=get_context('spawn')) as pool:
+                results.append(pool.submit(_run_one, name, func_name, args, repeat).result())
+        else:
+            results.append(_run_one(name, func_name, args, repeat))
+    return {
+        'python': platform.python_version(),
+        'pillow': Image.__version__,
+        'machine': platform.machine(),
+        'cpu_count': os.cpu_count(),
+        'benchmarks': {r['name']: r for r in results},
+    }
+
+
+def compare_to_baseline(results, baseline, threshold=DEFAULT_THRESHOLD):
+    """Return a list of (name, baseline seconds, current seconds) slower than threshold."""
+    regressions = []
+    for name, current in results['benchmarks'].items():
+        previous = baseline.get('benchmarks', {}).get(name)
+        if previous is None:
+            continue
+        if current['seconds_min'] > previous['seconds_min'] * (1 + threshold):
+            regressions.append((name, previous['seconds_min'], current['seconds_min']))
+    return regressions
+
+
+def format_results(results):
+    lines = [f"{'benchmark':40} {'best s':>9} {'img/s':>9} {'MB/s':>9} {'peak RSS MB':>12}"]
+    for r in results['benchmarks'].values():
+        rss = f"{r['peak_rss_mb']:.0f}" if r['peak_rss_mb'] is not None else "n/a"
+        lines.append(
+            f"{r['name']:40} {r['seconds_min']:9.3f} {r['images_per_sec']:9.2f} {r['mb_per_sec']:9.1f} {rss:>12}"
+        )
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark image_ops hot paths.")
+    parser.add_argument('--corpus-dir', default=os.path.join(tempfile.gettempdir(), 'image_ops_bench_corpus'))
+    parser.add_argument('--megapixels', type=int, nargs='+', default=[12], help="JPEG sizes to test (e.g. 12 24 48)")
+    parser.add_argument('--batch-size', type=int, default=8, help="images in the convert_batch benchmark")
+    parser.add_argument('--batch-megapixels', type=int, default=6, help="size of each convert_batch image")
+    parser.add_argument('--gif-frames', type=int, default=300, help="frames in the animated GIF")
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('-j', '--workers', type=int, default=None)
+    parser.add_argument('--json', help="write results to this JSON file")
+    parser.add_argument('--save-baseline', help="write results as a baseline JSON file")
+    parser.add_argument('--baseline', help="compare against this baseline JSON file")
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD, help="allowed slowdown (0.15 = 15%%)")
+    args = parser.parse_args(argv)
+
+    corpus = make_corpus(
+        args.corpus_dir, args.megapixels, args.batch_size, args.gif_frames, args.batch_megapixels
+    )
+    results = run_suite(corpus, repeat=args.repeat, workers=args.workers)
+    print(format_results(results))
+
+    for path in (args.json, args.save_baseline):
+        if path:
+            with open(path, 'w') as f:
+                json.dump(results, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        regressions = compare_to_baseline(results, baseline, args.threshold)
+        for name, before, after in regressions:
+            print(f"REGRESSION {name}: {before:.3f}s -> {after:.3f}s (+{(after / before - 1) * 100:.0f}%)")
+        if regressions:
+            return 1
+        print(f"No regressions beyond {args.threshold:.0%}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,144 @@
+"""Opt-in on-disk cache of converted outputs, keyed by source content + settings.
+
+Layout of a cache directory:
+    index.json               source signatures and cached entries (LRU order)
+    objects/<ab>/<key>.<ext> one encoded output per key
+"""
+import hashlib
+import json
+import os
+
+from image_ops import link_or_copy, settings_digest
+
+INDEX_NAME = 'index.json'
+INDEX_VERSION = 1
+
+
+def file_digest(file_path, chunk_size=1 << 20):
+    """Return the sha256 hex digest of a file's contents."""
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class OutputCache:
+    """Reuse previous conversion outputs when source and settings are unchanged.
+
+    A source is identified by its content hash, which is only recomputed when
+    its size or mtime changes. The cache key combines that hash with the
+    normalized conversion settings. Hits are hard-linked (or copied when
+    ``link`` is False or linking fails) to the output path.
+
+    With ``max_entries`` at most that many outputs are kept (default:
+    unlimited). The least recently used output is evicted, but never one
+    used by this cache instance: once the whole cache has been used in the
+    current run, new outputs are not added. A run over a tree larger than
+    the cache thus keeps a stable max_entries of hits instead of evicting
+    every entry before the next run reaches it. Source hashes are not
+    capped. Call save() (or use the cache as a context manager) to persist
+    the index.
+    """
+
+    def __init__(self, cache_dir, max_entries=None, link=True):
+        self.cache_dir = cache_dir
+        self.max_entries = None if max_entries is None else max(1, int(max_entries))
+        self.link = link
+        self.hits = 0
+        self.misses = 0
+        self._used = set()  # keys fetched or stored by this instance
+        self._index_path = os.path.join(cache_dir, INDEX_NAME)
+        os.makedirs(os.path.join(cache_dir, 'objects'), exist_ok=True)
+        self._sources, self._entries = self._load_index()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.save()
+
+    def _load_index(self):
+        try:
+            with open(self._index_path, 'r') as f:
+                index = json.load(f)
+        except (OSError, ValueError):
+            return {}, {}
+        if index.get('version') != INDEX_VERSION:
+            return {}, {}
+        # JSON objects keep insertion order, which doubles as LRU order
+        return index.get('sources', {}), index.get('entries', {})
+
+    def save(self):
+        """Write the index atomically."""
+        index = {'version': INDEX_VERSION, 'sources': self._sources, 'entries': self._entries}
+        tmp_path = f"{self._index_path}.tmp-{os.getpid()}"
+        with open(tmp_path, 'w') as f:
+            json.dump(index, f)
+        os.replace(tmp_path, self._index_path)
+
+    def source_digest(self, input_path):
+        """Return the content hash of input_path, rehashing only if size/mtime changed."""
+        stat = os.stat(input_path)
+        path = os.path.abspath(input_path)
+        signature = [stat.st_size, stat.st_mtime_ns]
+        known = self._sources.pop(path, None)
+        if known is not None and known[:2] == signature:
+            digest = known[2]
+        else:
+            digest = file_digest(input_path)
+        self._sources[path] = signature + [digest]
+        return digest
+
+    def key_for(self, input_path, output_format, options):
+        """Return the cache key for converting input_path with these settings."""
+        source = self.source_digest(input_path)
+        settings = settings_digest(output_format, **options)
+        return hashlib.sha256(f"{source}:{settings}".encode('ascii')).hexdigest()
+
+    def _object_path(self, key, output_path):
+        ext = os.path.splitext(output_path)[1]
+        return os.path.join(self.cache_dir, 'objects', key[:2], key + ext)
+
+    def fetch(self, key, output_path):
+        """Place the cached output for key at output_path. Returns False on a miss."""
+        entry = self._entries.pop(key, None)
+        if entry is None or not os.path.isfile(os.path.join(self.cache_dir, entry)):
+            self.misses += 1
+            return False
+        self._entries[key] = entry
+        self._used.add(key)
+        object_path = os.path.join(self.cache_dir, entry)
+        if not (os.path.exists(output_path) and os.path.samefile(object_path, output_path)):
+            if os.path.lexists(output_path):
+                os.remove(output_path)
+            link_or_copy(object_path, output_path, self.link)
+        self.hits += 1
+        return True
+
+    def store(self, key, output_path):
+        """Record output_path as the result for key, evicting old entries if needed.
+
+        Returns False (storing nothing) when the cache is full of entries
+        used in this run.
+        """
+        if self.max_entries is not None and key not in self._entries:
+            while len(self._entries) >= self.max_entries:
+                # Used entries move to the end, so the oldest is the unused candidate
+                old_key = next(iter(self._entries))
+                if old_key in self._used:
+                    return False
+                old_entry = self._entries.pop(old_key)
+                try:
+                    os.remove(os.path.join(self.cache_dir, old_entry))
+                except OSError:
+                    pass
+        object_path = self._object_path(key, output_path)
+        os.makedirs(os.path.dirname(object_path), exist_ok=True)
+        if os.path.lexists(object_path):
+            os.remove(object_path)
+        link_or_copy(output_path, object_path, self.link)
+        self._entries.pop(key, None)
+        self._entries[key] = os.path.relpath(object_path, self.cache_dir)
+        self._used.add(key)
+        return True
@@ -0,0 +1,369 @@
+"""Headless batch conversion driven by config.yaml (no Tkinter).
+
+Usage:
+    python image_cli.py photos/ "scans/**/*.png" -o out/ --config config.yaml -j 8
+"""
+import argparse
+import itertools
+import json
+import os
+import sys
+import time
+
+from image_cache import OutputCache
+from image_journal import BatchJournal
+from image_pipeline import convert_pipelined
+from image_watch import (
+    DEFAULT_POLL_INTERVAL,
+    DEFAULT_SETTLE_SECONDS,
+    check_watch_output_dir,
+    watch_and_convert,
+)
+from image_ops import (
+    ENCODER_PROFILES,
+    PASSTHROUGH_MODES,
+    benchmark_encoder_profiles,
+    convert_batch,
+    explain_conversion,
+    format_encoder_benchmark,
+    format_profile_summary,
+    iter_image_paths,
+    load_yaml,
+    options_from_config,
+    parse_byte_size,
+    parse_frame_spec,
+    parse_variants,
+    probe_images,
+    summarize_profiles,
+)
+
+
+def _variants(value):
+    """argparse type for --variants."""
+    try:
+        return parse_variants(value)
+    except ValueError as e:
+        raise argparse.ArgumentTypeError(str(e)) from None
+
+
+def _gif_frames(value):
+    """argparse type for --gif-frames: validate the spec, keep it as text."""
+    try:
+        parse_frame_spec(value)
+    except ValueError as e:
+        raise argparse.ArgumentTypeError(str(e)) from None
+    return value
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        description="Convert images in batch using settings from a config file."
+    )
+    parser.add_argument(
+        'inputs', nargs='+',
+        help="image files, directories, glob patterns, @file with one path per line, or - for stdin",
+    )
+    parser.add_argument('-o', '--output-dir', help="directory for converted images")
+    parser.add_argument('-c', '--config', default='config.yaml', help="settings file (default: config.yaml)")
+    parser.add_argument('-f', '--format', dest='output_format', help="output format (overrides config)")
+    parser.add_argument('-q', '--quality', type=int, help="JPG/WEBP quality 1-100 (overrides config)")
+    parser.add_argument('-j', '--workers', type=int, default=None, help="worker processes (default: CPU count)")
+    parser.add_argument(
+        '--variants', type=_variants,
+        help="write several sizes per image, e.g. '1600:webp,800:webp,320:jpg' (overrides config)",
+    )
+    parser.add_argument(
+        '--gif-frames', type=_gif_frames,
+        help="save these frames of each GIF, e.g. '0,5,9', '10-20', 'all:10' (overrides config)",
+    )
+    parser.add_argument(
+        '--encoder-profile', choices=sorted(ENCODER_PROFILES), help="encoder speed/size trade-off (overrides config)"
+    )
+    parser.add_argument(
+        '--bench-encoders', action='store_true',
+        help="instead of converting, report encode time and output size of every encoder profile",
+    )
+    parser.add_argument(
+        '--probe', action='store_true',
+        help="instead of converting, list each input's format, size, frames and integrity from its headers",
+    )
+    parser.add_argument(
+        '--explain', action='store_true',
+        help="instead of converting, show the steps each input would go through with these settings",
+    )
+    parser.add_argument('--bench-sample', type=int, default=8, help="images sampled by --bench-encoders")
+    parser.add_argument(
+        '--memory-budget', type=parse_byte_size,
+        help="cap the estimated decoded size of queued images, e.g. 4G or 512M (overrides config)",
+    )
+    parser.add_argument('--no-tiles', action='store_true', help="never convert large PNGs strip by strip")
+    parser.add_argument(
+        '--io-depth', type=int,
+        help="overlap reads and writes with conversion, keeping up to N files in flight (for network mounts)",
+    )
+    parser.add_argument(
+        '--passthrough', choices=PASSTHROUGH_MODES,
+        help="copy (default), hard-link or re-encode (off) files that need no changes (overrides config)",
+    )
+    parser.add_argument(
+        '--watch', action='store_true',
+        help="keep running and convert images as they appear in the input directories (Ctrl-C to stop)",
+    )
+    parser.add_argument(
+        '--poll-interval', type=float, default=DEFAULT_POLL_INTERVAL,
+        help=f"seconds between checks for new files in --watch mode (default: {DEFAULT_POLL_INTERVAL})",
+    )
+    parser.add_argument(
+        '--settle', type=float, default=DEFAULT_SETTLE_SECONDS,
+        help=f"seconds a new file must stop changing before it is converted (default: {DEFAULT_SETTLE_SECONDS})",
+    )
+    parser.add_argument('--full-decode', action='store_true', help="decode sources at full size before resizing")
+    parser.add_argument('--cache-dir', help="reuse unchanged outputs from this cache directory (overrides config)")
+    parser.add_argument(
+        '--cache-max-entries', type=int, help="cap on the outputs kept in the cache (default: unlimited)"
+    )
+    parser.add_argument(
+        '--job-id', help="journal progress under this id; rerunning with the same id skips finished files"
+    )
+    parser.add_argument(
+        '--journal-dir', default='.image_jobs', help="where job journals are kept (default: .image_jobs)"
+    )
+    parser.add_argument('--profile', action='store_true', help="print per-stage timings for the batch")
+    parser.add_argument('--profile-json', help="write the per-stage timing summary to this JSON file")
+    parser.add_argument('-r', '--recursive', action='store_true', help="recurse into input directories")
+    parser.add_argument('--quiet', action='store_true', help="only print errors and the summary")
+    return parser
+
+
+def _bench_encoders(input_paths, args, options):
+    sample = list(itertools.islice(input_paths, max(1, args.bench_sample)))
+    if not sample:
+        print("No input images found", file=sys.stderr)
+        return 2
+    output_formats = [args.output_format.lower()] if args.output_format else ['jpeg', 'png', 'webp']
+    results = benchmark_encoder_profiles(
+        sample,
+        output_formats,
+        quality=options['quality'],
+        encoder_overrides=options.get('encoder_overrides'),
+    )
+    print(format_encoder_benchmark(results))
+    return 0
+
+
+def _probe(input_paths, args):
+    probes = probe_images(input_paths, workers=args.workers)
+    if not probes:
+        print("No input images found", file=sys.stderr)
+        return 2
+    for probe in probes:
+        if probe.status == 'corrupt':
+            print(f"{probe.path}: corrupt ({probe.error})")
+            continue
+        width, height = probe.size
+        line = f"{probe.path}: {probe.format} {width}x{height} {probe.mode}, {probe.n_frames} frame(s)"
+        if probe.status != 'ok':
+            line += f", {probe.status}"
+        print(line)
+    bad = sum(probe.status != 'ok' for probe in probes)
+    print(f"Probed {len(probes)} file(s), {bad} damaged")
+    return 1 if bad else 0
+
+
+def _explain(input_paths, output_format, options):
+    if options.get('variants') or options.get('gif_frames'):
+        print("Note: showing the single-output conversion; variants and GIF frame lists are not explained",
+              file=sys.stderr)
+    count = 0
+    for input_path in input_paths:
+        count += 1
+        print(f"{input_path}:")
+        for line in explain_conversion(input_path, output_format, **options):
+            print(f"  {line}")
+    if not count:
+        print("No input images found", file=sys.stderr)
+        return 2
+    return 0
+
+
+def _watch(args, output_format, options):
+    directories = [path for path in args.inputs if os.path.isdir(path)]
+    if len(directories) != len(args.inputs):
+        print("--watch needs input directories", file=sys.stderr)
+        return 2
+    try:
+        check_watch_output_dir(directories, args.output_dir)
+    except ValueError as e:
+        print(e, file=sys.stderr)
+        return 2
+    os.makedirs(args.output_dir, exist_ok=True)
+    journal = BatchJournal(args.journal_dir, args.job_id) if args.job_id else None
+    print(f"Watching {', '.join(directories)} (Ctrl-C to stop)")
+    success_count = error_count = 0
+    results = watch_and_convert(
+        directories,
+        args.output_dir,
+        output_format,
+        workers=args.workers,
+        poll_interval=args.poll_interval,
+        settle_seconds=args.settle,
+        recursive=args.recursive,
+        journal=journal,
+        **options,
+    )
+    try:
+        for result in results:
+            if result.error is None:
+                success_count += 1
+                if not args.quiet:
+                    outputs = result.output_path
+                    if isinstance(outputs, tuple):
+                        outputs = ", ".join(outputs)
+                    print(f"{result.input_path} -> {outputs}", flush=True)
+            else:
+                error_count += 1
+                print(f"ERROR {result.input_path}: {result.error}", file=sys.stderr, flush=True)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        results.close()
+        if journal is not None:
+            journal.close()
+    print(f"Stopped watching: converted {success_count} image(s), {error_count} error(s)")
+    return 0
+
+
+def main(argv=None):
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    if not (args.output_dir or args.bench_encoders or args.probe or args.explain):
+        parser.error("the following arguments are required: -o/--output-dir")
+
+    config = load_yaml(args.config) if os.path.isfile(args.config) else {}
+    options = options_from_config(config)
+    if args.quality is not None:
+        options['quality'] = args.quality
+    if args.full_decode:
+        options['fast_decode'] = False
+    if args.no_tiles:
+        options['tiled'] = False
+    if args.variants:
+        options['variants'] = args.variants
+    if args.gif_frames:
+        options['gif_frames'] = args.gif_frames
+    if args.encoder_profile:
+        options['encoder_profile'] = args.encoder_profile
+    if args.passthrough:
+        options['passthrough'] = args.passthrough
+    if options.get('variants') and options.get('gif_frames') is not None:
+        parser.error("variants and --gif-frames cannot be combined (check the config file too)")
+    output_format = (args.output_format or config.get('output_format', 'png')).lower()
+
+    if args.watch and args.output_dir:
+        return _watch(args, output_format, options)
+
+    # Paths stream from the walker straight into the bounded batch queue
+    input_paths = iter_image_paths(args.inputs, recursive=args.recursive)
+    if args.probe:
+        return _probe(input_paths, args)
+    if args.explain:
+        return _explain(input_paths, output_format, options)
+    if args.bench_encoders:
+        return _bench_encoders(input_paths, args, options)
+    os.makedirs(args.output_dir, exist_ok=True)
+    cache_dir = args.cache_dir or config.get('cache_dir')
+    cache = OutputCache(cache_dir, max_entries=args.cache_max_entries) if cache_dir else None
+    if cache is not None and (options.get('variants') or options.get('gif_frames')):
+        print("The output cache is not used with variants or GIF frame selections", file=sys.stderr)
+        cache = None
+
+    memory_budget = args.memory_budget
+    if memory_budget is None and config.get('memory_budget'):
+        memory_budget = parse_byte_size(config['memory_budget'])
+    multi_output = options.get('variants') or options.get('gif_frames')
+    if args.io_depth and (cache is not None or args.job_id or memory_budget or multi_output):
+        print(
+            "--io-depth cannot be combined with a cache, job id, memory budget, variants or GIF frames",
+            file=sys.stderr,
+        )
+        return 2
+
+    journal = BatchJournal(args.journal_dir, args.job_id) if args.job_id else None
+
+    profiling = args.profile or bool(args.profile_json)
+    profiles = []
+
+    start = time.perf_counter()
+    success_count = 0
+    error_count = 0
+    passthrough_count = 0
+    input_bytes = 0
+    if args.io_depth:
+        results = convert_pipelined(
+            input_paths,
+            args.output_dir,
+            output_format,
+            io_depth=args.io_depth,
+            workers=args.workers,
+            profile=profiling,
+            **options,
+        )
+    else:
+        results = convert_batch(
+            input_paths,
+            args.output_dir,
+            output_format,
+            workers=args.workers,
+            memory_budget=memory_budget,
+            cache=cache,
+            journal=journal,
+            profile=profiling,
+            **options,
+        )
+    for result in results:
+        if result.profile is not None:
+            profiles.append(result.profile)
+        if result.error is None:
+            success_count += 1
+            passthrough_count += result.passthrough
+            input_bytes += os.path.getsize(result.input_path)
+            if not args.quiet:
+                outputs = result.output_path
+                if isinstance(outputs, tuple):
+                    outputs = ", ".join(outputs)
+                print(f"{result.input_path} -> {outputs}")
+        else:
+            error_count += 1
+            print(f"ERROR {result.input_path}: {result.error}", file=sys.stderr)
+    elapsed = max(time.perf_counter() - start, 1e-9)
+
+    total = success_count + error_count
+    if total == 0:
+        if journal is not None:
+            journal.close()
+        print("No input images found", file=sys.stderr)
+        return 2
+    print(
+        f"Converted {success_count}/{total} image(s) in {elapsed:.2f}s "
+        f"({success_count / elapsed:.1f} images/s, {input_bytes / elapsed / 1e6:.1f} MB/s read), "
+        f"{error_count} error(s)"
+    )
+    if passthrough_count:
+        print(f"Passthrough: {passthrough_count} file(s) needed no changes and were stored as is")
+    if cache is not None:
+        print(f"Cache: {cache.hits} hit(s), {cache.misses} miss(es)")
+    if journal is not None:
+        journal.close()
+        print(f"Job {journal.job_id}: {journal.skipped} file(s) already done, journal {journal.path}")
+    if profiling:
+        summary = summarize_profiles(profiles)
+        if args.profile:
+            print(format_profile_summary(summary))
+        if args.profile_json:
+            with open(args.profile_json, 'w') as f:
+                json.dump(summary, f, indent=2)
+    return 1 if error_count else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,20 +1,32 @@
 import tkinter as tk
 from tkinter import filedialog, messagebox, ttk
-from PIL import Image, ImageTk
+from PIL import ImageTk
 import os
+import queue
 import subprocess
 import platform
+import threading
 
 from image_ops import (
+    DEFAULT_ENCODER_PROFILE,
+    DEFAULT_PASSTHROUGH,
+    ENCODER_OVERRIDE_KEYS,
+    ENCODER_PROFILES,
     load_yaml,
     is_positive_int_or_empty,
     is_valid_quality,
-    extract_gif_frame,
-    count_gif_frames,
-    apply_transforms,
-    convert_single_image,
+    convert_batch,
+    iter_image_paths,
+    format_profile_summary,
+    options_from_config,
+    probe_image,
     save_config_file,
+    summarize_profiles,
 )
+from image_preview import PreviewWorker
+
+# Wait this long after the last settings change before re-rendering the preview
+PREVIEW_DEBOUNCE_MS = 150
 
 
 class ImageConverterApp:
@@ -31,6 +43,7 @@ class ImageConverterApp:
         self.default_config = self.config.copy()
         
         self.input_paths = []
+        self._input_path_set = set()  # O(1) duplicate check when adding files
         self.output_dir = tk.StringVar()
         self.output_format = tk.StringVar(value=self.config.get('output_format', 'png'))
         self.resize_width = tk.IntVar(value=self.config.get('resize_width', 800))
@@ -41,13 +54,20 @@ class ImageConverterApp:
         self.grayscale = tk.BooleanVar(value=self.config.get('grayscale', False))
         self.quality = tk.IntVar(value=self.config.get('quality', 85))
         self.gif_frame = tk.IntVar(value=self.config.get('gif_frame', 0))
+        self.encoder_profile = tk.StringVar(value=self.config.get('encoder_profile', DEFAULT_ENCODER_PROFILE))
+        self.profile_stages = tk.BooleanVar(value=False)
         
         # Traces for live preview updates when transformations change
         for var in [self.enable_resize, self.resize_width, self.resize_height, self.maintain_aspect,
                     self.rotate_degrees, self.grayscale, self.quality, self.gif_frame]:
             var.trace('w', self._update_preview_if_image_selected)
         
+        # Previews render on a background thread; only the newest result is drawn
+        self.preview_worker = PreviewWorker()
+        self._preview_after_id = None
+        
         self.create_widgets()
+        self.root.after(50, self._poll_preview)
     
     def validate_positive_int(self, P):
         """Validate positive int or empty for entries."""
@@ -83,6 +103,7 @@ class ImageConverterApp:
         input_btn_frame = tk.Frame(left_frame)
         input_btn_frame.pack(fill="x")
         tk.Button(input_btn_frame, text="Browse Images", command=self.browse_input).pack(side=tk.LEFT, padx=5)
+        tk.Button(input_btn_frame, text="Add Folder", command=self.browse_input_folder).pack(side=tk.LEFT, padx=5)
         tk.Button(input_btn_frame, text="Clear List", command=self.clear_inputs).pack(side=tk.LEFT, padx=5)
         
         # Format selection
@@ -92,6 +113,10 @@ class ImageConverterApp:
         formats = ['jpg', 'jpeg', 'png', 'webp']
         format_combo = ttk.Combobox(format_frame, textvariable=self.output_format, values=formats, state="readonly")
         format_combo.pack(side=tk.LEFT, padx=10)
+        tk.Label(format_frame, text="Encoder:", anchor="w").pack(side=tk.LEFT)
+        ttk.Combobox(
+            format_frame, textvariable=self.encoder_profile, values=list(ENCODER_PROFILES), state="readonly", width=10
+        ).pack(side=tk.LEFT, padx=10)
         
         # Resize
         resize_frame = tk.LabelFrame(left_frame, text="Resize")
@@ -115,6 +140,7 @@ class ImageConverterApp:
         options_frame = tk.Frame(left_frame)
         options_frame.pack(pady=10, fill="x")
         tk.Checkbutton(options_frame, text="Grayscale (Remove Colors)", variable=self.grayscale).pack(side=tk.LEFT, padx=10)
+        tk.Checkbutton(options_frame, text="Show Stage Timings", variable=self.profile_stages).pack(side=tk.LEFT, padx=10)
         
         quality_frame = tk.Frame(left_frame)
         quality_frame.pack(pady=5, fill="x")
@@ -141,8 +167,12 @@ class ImageConverterApp:
         # Buttons
         btn_frame = tk.Frame(left_frame)
         btn_frame.pack(pady=20, fill="x")
-        tk.Button(btn_frame, text="Convert Batch", command=self.convert_images, bg="green", fg="white", width=15).pack(side=tk.LEFT, padx=10)
+        self.convert_button = tk.Button(btn_frame, text="Convert Batch", command=self.convert_images, bg="green", fg="white", width=15)
+        self.convert_button.pack(side=tk.LEFT, padx=10)
         tk.Button(btn_frame, text="Reset", command=self.reset_settings, bg="gray", fg="white", width=15).pack(side=tk.LEFT, padx=10)
+        # Batch progress (conversion runs in the background)
+        self.status_label = tk.Label(left_frame, text="", anchor="w")
+        self.status_label.pack(fill="x")
         
         # Right: preview
         right_frame = tk.Frame(main_frame, width=450)
@@ -161,15 +191,29 @@ class ImageConverterApp:
             filetypes=[("Image files", "*.jpg *.jpeg *.png *.webp *.gif")]
         )
         if file_paths:
-            for path in file_paths:
-                if path not in self.input_paths:
-                    self.input_paths.append(path)
-                    self.input_listbox.insert(tk.END, os.path.basename(path))
-            if self.input_paths:
-                self.show_preview(self.input_paths[0])
+            self._add_input_paths(file_paths)
+    
+    def browse_input_folder(self):
+        dir_path = filedialog.askdirectory()
+        if dir_path:
+            # Walk lazily; supported image files anywhere below the folder are added
+            self._add_input_paths(iter_image_paths([dir_path]))
+    
+    def _add_input_paths(self, paths):
+        new_names = []
+        for path in paths:
+            if path not in self._input_path_set:
+                self._input_path_set.add(path)
+                self.input_paths.append(path)
+                new_names.append(os.path.basename(path))
+        if new_names:
+            self.input_listbox.insert(tk.END, *new_names)
+        if self.input_paths:
+            self.show_preview(self.input_paths[0])
     
     def clear_inputs(self):
         self.input_paths = []
+        self._input_path_set = set()
         self.input_listbox.delete(0, tk.END)
     
     def browse_config(self):
@@ -182,17 +226,19 @@ class ImageConverterApp:
             self.config_path.set(file_path)
     
     def _update_preview_if_image_selected(self, *args):
-        """Live update preview when transformation settings change."""
+        """Live update preview when transformation settings change (debounced)."""
+        if self._preview_after_id is not None:
+            self.root.after_cancel(self._preview_after_id)
+        self._preview_after_id = self.root.after(PREVIEW_DEBOUNCE_MS, self._refresh_selected_preview)
+    
+    def _refresh_selected_preview(self):
+        self._preview_after_id = None
         if self.input_paths:
             # Use first selected or current list selection
             selection = self.input_listbox.curselection()
             idx = selection[0] if selection else 0
             if idx < len(self.input_paths):
-                try:
-                    self.show_preview(self.input_paths[idx])
-                except:
-                    # Ignore temp invalid during typing
-                    pass
+                self.show_preview(self.input_paths[idx])
     
     def open_output_folder(self, folder_path):
         """Open output folder in file explorer (cross-platform)."""
@@ -216,11 +262,13 @@ class ImageConverterApp:
                 self.show_preview(path)
                 # Update GIF slider range if GIF
                 if path.lower().endswith('.gif'):
-                    try:
-                        frame_count = count_gif_frames(path)
+                    # Header-only and memoized, so re-selecting a file is free
+                    probe = probe_image(path)
+                    if probe.status != 'corrupt':
+                        frame_count = probe.n_frames
                         self.gif_slider.config(to=max(0, frame_count - 1))
                         self.gif_max_label.config(text=f"(max: {frame_count-1})")
-                    except Exception:
+                    else:
                         self.gif_slider.config(to=100)
                         self.gif_max_label.config(text="(max: 100)")
                 else:
@@ -233,50 +281,53 @@ class ImageConverterApp:
             self.output_dir.set(dir_path)
     
     def show_preview(self, file_path):
+        """Queue a background render of file_path with the current settings."""
         try:
-            img = Image.open(file_path)
-
-            # Apply current transformations for live preview (same as convert logic)
-            if file_path.lower().endswith('.gif'):
-                frame_count = count_gif_frames(file_path)
-                img = extract_gif_frame(img, self.gif_frame.get())
-            else:
-                frame_count = None
-
-            img = apply_transforms(
-                img,
+            options = dict(
                 enable_resize=self.enable_resize.get(),
                 resize_width=self.resize_width.get(),
                 resize_height=self.resize_height.get(),
                 maintain_aspect=self.maintain_aspect.get(),
                 rotate_degrees=self.rotate_degrees.get(),
                 grayscale=self.grayscale.get(),
+                gif_frame=self.gif_frame.get(),
             )
+        except tk.TclError:
+            # Entry temporarily empty/invalid while typing
+            self.frame_info_label.config(text="Preview unavailable (check inputs)")
+            return
+        self.preview_worker.submit(file_path, **options)
+    
+    def _poll_preview(self):
+        """Draw the newest finished preview render, if any, then keep polling."""
+        result = self.preview_worker.poll()
+        if result is not None:
+            _, value, error = result
+            if error is None:
+                self._draw_preview(*value)
+            else:
+                # Silent fail for temp invalid states during typing; do not show popup
+                self.frame_info_label.config(text="Preview unavailable (check inputs)")
+        self.root.after(50, self._poll_preview)
+    
+    def _draw_preview(self, display_img, frame_count):
+        photo = ImageTk.PhotoImage(display_img)
 
-            # Generate thumbnail for display
-            display_img = img.copy()
-            display_img.thumbnail((400, 400), Image.Resampling.LANCZOS)
-            photo = ImageTk.PhotoImage(display_img)
-
-            # Clear and draw on canvas
-            self.preview_canvas.delete("all")
-            canvas_w = self.preview_canvas.winfo_width() or 400
-            canvas_h = self.preview_canvas.winfo_height() or 400
-            x = (canvas_w - photo.width()) // 2
-            y = (canvas_h - photo.height()) // 2
-            self.preview_canvas.create_image(x, y, anchor=tk.NW, image=photo)
-            self.preview_canvas.image = photo  # keep reference
+        # Clear and draw on canvas
+        self.preview_canvas.delete("all")
+        canvas_w = self.preview_canvas.winfo_width() or 400
+        canvas_h = self.preview_canvas.winfo_height() or 400
+        x = (canvas_w - photo.width()) // 2
+        y = (canvas_h - photo.height()) // 2
+        self.preview_canvas.create_image(x, y, anchor=tk.NW, image=photo)
+        self.preview_canvas.image = photo  # keep reference
 
-            if frame_count is not None:
-                self.frame_info_label.config(
-                    text=f"GIF Frames: {frame_count} (use 0-{frame_count-1} in GIF Frame field)"
-                )
-            else:
-                self.frame_info_label.config(text="")
-        except Exception:
-            # Silent fail for temp invalid states during typing; real errors logged internally
-            self.frame_info_label.config(text="Preview unavailable (check inputs)")
-            # Do not show popup for transient errors
+        if frame_count is not None:
+            self.frame_info_label.config(
+                text=f"GIF Frames: {frame_count} (use 0-{frame_count-1} in GIF Frame field)"
+            )
+        else:
+            self.frame_info_label.config(text="")
     
     def convert_images(self):
         if not self.input_paths:
@@ -294,32 +345,92 @@ class ImageConverterApp:
                 return
         
         output_format = self.output_format.get().lower()
-        success_count = 0
-        errors = []
-        
-        for input_path in self.input_paths:
+        try:
+            # Settings without widgets (variants, gif_frames, ...) come from the loaded config
+            config_options = options_from_config(self.config)
+        except ValueError as e:
+            messagebox.showerror("Error", f"Invalid config: {e}")
+            return
+        options = dict(
+            enable_resize=self.enable_resize.get(),
+            resize_width=self.resize_width.get(),
+            resize_height=self.resize_height.get(),
+            maintain_aspect=self.maintain_aspect.get(),
+            rotate_degrees=self.rotate_degrees.get(),
+            grayscale=self.grayscale.get(),
+            quality=self.quality.get(),
+            gif_frame=self.gif_frame.get(),
+            encoder_profile=self.encoder_profile.get(),
+            encoder_overrides={key: self.config[key] for key in ENCODER_OVERRIDE_KEYS if key in self.config},
+            fast_decode=config_options['fast_decode'],
+            tiled=config_options['tiled'],
+            passthrough=config_options['passthrough'],
+            profile=self.profile_stages.get(),
+        )
+        for key in ('variants', 'gif_frames'):
+            if key in config_options:
+                options[key] = config_options[key]
+        input_paths = list(self.input_paths)
+
+        # Run the batch off the Tk thread; results come back through a queue
+        self.convert_button.config(state=tk.DISABLED)
+        self.status_label.config(text=f"Converting 0/{len(input_paths)}...")
+        results = queue.Queue()
+        threading.Thread(
+            target=self._run_batch,
+            args=(results, input_paths, output_dir, output_format, options),
+            daemon=True,
+        ).start()
+        self.root.after(100, self._poll_batch, results, output_dir, len(input_paths), 0, 0, [], [])
+
+    def _run_batch(self, results, input_paths, output_dir, output_format, options):
+        """Worker thread: stream batch results into the queue, then a None sentinel."""
+        try:
+            for result in convert_batch(input_paths, output_dir, output_format, **options):
+                results.put(result)
+        except Exception as e:
+            results.put(e)
+        results.put(None)
+
+    def _poll_batch(self, results, output_dir, total, success_count, passthrough_count, errors, profiles):
+        """Drain finished results on the Tk thread and report when the batch is done."""
+        done = False
+        while True:
             try:
-                convert_single_image(
-                    input_path,
-                    output_dir,
-                    output_format,
-                    enable_resize=self.enable_resize.get(),
-                    resize_width=self.resize_width.get(),
-                    resize_height=self.resize_height.get(),
-                    maintain_aspect=self.maintain_aspect.get(),
-                    rotate_degrees=self.rotate_degrees.get(),
-                    grayscale=self.grayscale.get(),
-                    quality=self.quality.get(),
-                    gif_frame=self.gif_frame.get(),
-                )
+                result = results.get_nowait()
+            except queue.Empty:
+                break
+            if result is None:
+                done = True
+                break
+            if isinstance(result, Exception):
+                errors.append(str(result))
+                continue
+            if result.profile is not None:
+                profiles.append(result.profile)
+            if result.error is None:
                 success_count += 1
-            except Exception as e:
-                errors.append(f"{os.path.basename(input_path)}: {str(e)}")
-        
+                passthrough_count += result.passthrough
+            else:
+                errors.append(f"{os.path.basename(result.input_path)}: {result.error}")
+
+        self.status_label.config(text=f"Converting {success_count + len(errors)}/{total}...")
+        if not done:
+            self.root.after(
+                100, self._poll_batch, results, output_dir, total, success_count, passthrough_count, errors, profiles
+            )
+            return
+
+        self.convert_button.config(state=tk.NORMAL)
+        self.status_label.config(text=f"Converted {success_count}/{total}")
         if success_count > 0:
             msg = f"Successfully converted {success_count} image(s) to {output_dir}"
+            if passthrough_count:
+                msg += f"\n{passthrough_count} needed no changes and were copied as is"
             if errors:
                 msg += f"\n\nErrors: {len(errors)}"
+            if profiles:
+                msg += "\n\n" + format_profile_summary(summarize_profiles(profiles))
             messagebox.showinfo("Batch Success", msg)
             # Open output folder for user to see results
             self.open_output_folder(output_dir)
@@ -340,7 +451,16 @@ class ImageConverterApp:
                 'grayscale': self.grayscale.get(),
                 'quality': self.quality.get(),
                 'gif_frame': self.gif_frame.get(),
+                'encoder_profile': self.encoder_profile.get(),
             }
+            # Settings without widgets (encoder overrides, variants, ...); keep the loaded ones
+            settings.update({key: self.config[key] for key in ENCODER_OVERRIDE_KEYS if key in self.config})
+            settings['fast_decode'] = self.config.get('fast_decode', True)
+            settings['tiled'] = self.config.get('tiled', True)
+            settings['passthrough'] = self.config.get('passthrough', DEFAULT_PASSTHROUGH)
+            for key in ('variants', 'gif_frames'):
+                if self.config.get(key) not in (None, ''):
+                    settings[key] = self.config[key]
             save_config_file(config_file, settings, input_format=input_format)
             messagebox.showinfo("Success", f"Config saved to {config_file}")
         except Exception as e:
@@ -359,6 +479,7 @@ class ImageConverterApp:
             self.grayscale.set(self.config.get('grayscale', False))
             self.quality.set(self.config.get('quality', 85))
             self.gif_frame.set(self.config.get('gif_frame', 0))
+            self.encoder_profile.set(self.config.get('encoder_profile', DEFAULT_ENCODER_PROFILE))
             messagebox.showinfo("Success", f"Config loaded from {config_file}")
             # Update default_config for reset
             self.default_config = self.config.copy()
@@ -375,6 +496,7 @@ class ImageConverterApp:
         self.grayscale.set(self.default_config.get('grayscale', False))
         self.quality.set(self.default_config.get('quality', 85))
         self.gif_frame.set(self.default_config.get('gif_frame', 0))
+        self.encoder_profile.set(self.default_config.get('encoder_profile', DEFAULT_ENCODER_PROFILE))
         messagebox.showinfo("Reset", "Settings reset to defaults")
 
 if __name__ == "__main__":
@@ -0,0 +1,93 @@
+"""Append-only progress journal that lets a long batch resume after a crash.
+
+A journal is ``<journal_dir>/<job_id>.jsonl``, one JSON line per finished
+file: input path, settings digest, output path(s), status and error.
+"""
+import json
+import os
+
+JOURNAL_SUFFIX = '.jsonl'
+
+
+class BatchJournal:
+    """Record finished conversions and report which ones a rerun can skip.
+
+    A file is skipped when its last entry succeeded with the same settings
+    digest and every output it wrote still exists; failed, missing and
+    re-configured files are converted again. Entries are flushed as they are
+    written, so a crash loses at most the line being written; a torn last
+    line is cut off on load so new entries start on a line of their own.
+    Output paths are recorded as absolute paths. Use as a context manager
+    or call close().
+    """
+
+    def __init__(self, journal_dir, job_id):
+        if not job_id or os.sep in job_id or (os.altsep and os.altsep in job_id):
+            raise ValueError(f"Invalid job id {job_id!r}")
+        self.job_id = job_id
+        self.path = os.path.join(journal_dir, job_id + JOURNAL_SUFFIX)
+        self.skipped = 0
+        os.makedirs(journal_dir, exist_ok=True)
+        self._entries = self._load()
+        self._file = open(self.path, 'a', encoding='utf-8')
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def _load(self):
+        entries = {}
+        try:
+            with open(self.path, 'rb') as f:
+                data = f.read()
+        except OSError:
+            return entries
+        complete = data.rfind(b'\n') + 1
+        if complete < len(data):
+            # Torn write from a crash: drop it so the next entry is not glued onto it
+            with open(self.path, 'r+b') as f:
+                f.truncate(complete)
+        for line in data[:complete].splitlines():
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                continue
+            entries[entry['input']] = entry
+        return entries
+
+    def completed_output(self, input_path, digest):
+        """Return the recorded output of a finished input_path, or None if it must run."""
+        entry = self._entries.get(os.path.abspath(input_path))
+        if entry is None or entry.get('status') != 'done' or entry.get('settings') != digest:
+            return None
+        output = entry.get('output')
+        outputs = output if isinstance(output, list) else [output]
+        if not all(isinstance(path, str) and os.path.isfile(path) for path in outputs):
+            return None
+        self.skipped += 1
+        return tuple(output) if isinstance(output, list) else output
+
+    def record(self, result, digest):
+        """Append the outcome of a BatchResult converted with settings digest."""
+        output = result.output_path
+        if isinstance(output, (tuple, list)):
+            output = [os.path.abspath(path) for path in output]
+        elif output is not None:
+            output = os.path.abspath(output)
+        entry = {
+            'input': os.path.abspath(result.input_path),
+            'settings': digest,
+            'output': output,
+            'status': 'done' if result.error is None else 'failed',
+            'error': result.error,
+        }
+        self._entries[entry['input']] = entry
+        self._file.write(json.dumps(entry) + '\n')
+        self._file.flush()
+
+    def close(self):
+        if not self._file.closed:
+            self._file.close()
+
@@ -1,7 +1,29 @@
 """Pure image/config helpers used by the GUI and tests (no Tkinter)."""
+import glob
+import hashlib
+import inspect
+import io
+import json
+import math
 import os
+import shutil
+import sys
+import threading
+import time
+from collections import namedtuple
+from concurrent.futures import (
+    FIRST_COMPLETED,
+    ProcessPoolExecutor,
+    ThreadPoolExecutor,
+    wait,
+)
+from contextlib import contextmanager, nullcontext
+from functools import lru_cache, partial
 
-from PIL import Image, ImageOps, ImageSequence
+from PIL import Image, ImageOps
+
+# Extensions accepted as conversion inputs (matches the GUI file dialog)
+SUPPORTED_INPUT_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.webp', '.gif')
 
 
 def load_yaml(file_path):
@@ -31,6 +53,107 @@ def load_yaml(file_path):
     return config
 
 
+def options_from_config(config):
+    """Map config.yaml keys to convert_single_image keyword options.
+
+    Configured ``variants`` and ``gif_frames`` are included for convert_batch.
+    """
+    options = {
+        'enable_resize': bool(config.get('enable_resize', False)),
+        'resize_width': config.get('resize_width', 800),
+        'resize_height': config.get('resize_height', 600),
+        'maintain_aspect': bool(config.get('maintain_aspect_ratio', True)),
+        'rotate_degrees': config.get('rotate_degrees', 0),
+        'grayscale': bool(config.get('grayscale', False)),
+        'quality': config.get('quality', 85),
+        'gif_frame': config.get('gif_frame', 0),
+        'fast_decode': bool(config.get('fast_decode', True)),
+        'tiled': bool(config.get('tiled', True)),
+        'encoder_profile': config.get('encoder_profile', DEFAULT_ENCODER_PROFILE),
+        'passthrough': config.get('passthrough', DEFAULT_PASSTHROUGH),
+    }
+    # 'passthrough: false' (or a bare yes/no) reads as a boolean
+    if isinstance(options['passthrough'], bool):
+        options['passthrough'] = DEFAULT_PASSTHROUGH if options['passthrough'] else 'off'
+    overrides = {key: config[key] for key in ENCODER_OVERRIDE_KEYS if key in config}
+    if overrides:
+        options['encoder_overrides'] = overrides
+    if config.get('variants'):
+        options['variants'] = parse_variants(config['variants'])
+    if config.get('gif_frames') not in (None, ''):
+        parse_frame_spec(config['gif_frames'])  # fail early on a bad spec
+        options['gif_frames'] = str(config['gif_frames'])
+    return options
+
+
+def _walk_files(directory, recursive):
+    """Yield file paths under directory as they are listed (no full tree in memory)."""
+    stack = [directory]
+    while stack:
+        current = stack.pop()
+        try:
+            with os.scandir(current) as entries:
+                for entry in entries:
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            if recursive:
+                                stack.append(entry.path)
+                        elif entry.is_file():
+                            yield entry.path
+                    except OSError:
+                        continue
+        except OSError:
+            continue
+
+
+def _read_path_list(lines):
+    for line in lines:
+        line = line.strip()
+        if line and not line.startswith('#'):
+            yield line
+
+
+def _read_path_file(file_path):
+    with open(file_path, 'r') as f:
+        yield from _read_path_list(f)
+
+
+def iter_image_paths(sources, recursive=True, extensions=SUPPORTED_INPUT_EXTENSIONS):
+    """Lazily yield unique image paths from files, directories, globs and path lists.
+
+    Each source may be a directory (walked, recursively by default), a glob
+    pattern, ``-`` to read one path per line from stdin, ``@list.txt`` to
+    read one path per line from a file, or a file path (always yielded).
+    Directory, glob and list entries are filtered by ``extensions``.
+    """
+    seen = set()
+    for source in sources:
+        if source == '-':
+            candidates = _read_path_list(sys.stdin)
+        elif source.startswith('@'):
+            candidates = _read_path_file(source[1:])
+        elif os.path.isdir(source):
+            candidates = _walk_files(source, recursive)
+        elif glob.has_magic(source):
+            candidates = glob.iglob(source, recursive=True)
+        else:
+            # Explicit file paths are passed through even with unusual extensions
+            candidates = None
+
+        if candidates is None:
+            paths = [source]
+        else:
+            paths = (
+                path for path in candidates
+                if path.lower().endswith(extensions) and os.path.isfile(path)
+            )
+        for path in paths:
+            key = os.path.abspath(path)
+            if key not in seen:
+                seen.add(key)
+                yield path
+
+
 def is_positive_int_or_empty(value):
     """Return True if value is '' or an int >= 0 (for entry validation)."""
     if value == "":
@@ -52,25 +175,539 @@ def is_valid_quality(value):
 
 
 def extract_gif_frame(img, frame_index=0):
-    """Return a single frame from an animated image; falls back to first frame."""
-    frames = [frame.copy() for frame in ImageSequence.Iterator(img)]
-    if not frames:
-        return img
+    """Return a single frame from an animated image; falls back to first frame.
+
+    Seeks straight to the frame (Pillow composites disposal along the way)
+    and copies only the frame that is returned.
+    """
     index = max(0, frame_index)
-    if index < len(frames):
-        return frames[index]
-    return frames[0]
+    if index >= getattr(img, 'n_frames', 1):
+        index = 0
+    img.seek(index)
+    return img.copy()
 
 
 def count_gif_frames(file_path):
     """Return number of frames in a GIF (or multi-frame) image file."""
     with Image.open(file_path) as img:
-        return sum(1 for _ in ImageSequence.Iterator(img))
+        return getattr(img, 'n_frames', 1)
 
 
-def apply_transforms(
-    img,
+ImageProbe = namedtuple('ImageProbe', 'path format size mode n_frames animated status error')
+
+PROBE_CACHE_SIZE = 4096
+
+# Bytes every complete file of these formats ends with
+_TRAILERS = {
+    'PNG': b'\x00\x00\x00\x00IEND\xaeB`\x82',
+    'GIF': b'\x3b',
+}
+# Trailing bytes searched for a JPEG end-of-image marker (cameras may pad after it)
+_JPEG_TAIL_BYTES = 1024
+
+
+def _is_truncated(f, fmt, file_size):
+    """Check a file's tail (not its pixel data) for signs it was cut short."""
+    if fmt == 'WEBP':
+        f.seek(4)
+        riff_size = int.from_bytes(f.read(4), 'little')
+        return riff_size + 8 > file_size
+    if fmt == 'JPEG':
+        f.seek(max(0, file_size - _JPEG_TAIL_BYTES))
+        return b'\xff\xd9' not in f.read()
+    trailer = _TRAILERS.get(fmt)
+    if trailer is None:
+        return False
+    f.seek(max(0, file_size - len(trailer)))
+    return f.read() != trailer
+
+
+@lru_cache(maxsize=PROBE_CACHE_SIZE)
+def _probe_cached(path, mtime_ns, file_size):
+    try:
+        # Opened by path so Pillow's error messages name the file
+        with Image.open(path) as img:
+            fmt = img.format
+            size, mode = img.size, img.mode
+            # GIF frame counting skips image data without decoding it
+            n_frames = getattr(img, 'n_frames', 1)
+            animated = bool(getattr(img, 'is_animated', n_frames > 1))
+        with open(path, 'rb') as f:
+            truncated = _is_truncated(f, fmt, file_size)
+    except Exception as e:
+        return ImageProbe(path, None, None, None, 0, False, 'corrupt', str(e))
+    status = 'truncated' if truncated else 'ok'
+    return ImageProbe(path, fmt, size, mode, n_frames, animated, status, None)
+
+
+def probe_image(path):
+    """Read an image's headers without decoding its pixels.
+
+    Returns an ImageProbe with the format, size, mode, frame count, animation
+    flag and a status of 'ok', 'truncated' (the file ends early) or
+    'corrupt' (unreadable or not an image; ``error`` says why). Results are
+    memoized by path, modification time and size.
+    """
+    try:
+        stat = os.stat(path)
+    except OSError as e:
+        return ImageProbe(path, None, None, None, 0, False, 'corrupt', str(e))
+    probe = _probe_cached(os.path.abspath(path), stat.st_mtime_ns, stat.st_size)
+    return probe._replace(path=path)
+
+
+def probe_images(paths, workers=None):
+    """Probe many files with a thread pool; returns ImageProbes in input order."""
+    paths = list(paths)
+    if workers == 1 or len(paths) < 2:
+        return [probe_image(path) for path in paths]
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(probe_image, paths))
+
+
+clear_probe_cache = _probe_cached.cache_clear
+
+
+def resize_target_size(src_size, width, height, maintain_aspect=True):
+    """Return the size apply_transforms resizes src_size to for a width x height request."""
+    width = max(1, int(width))
+    height = max(1, int(height))
+    if not maintain_aspect:
+        return width, height
+
+    # Same rounding as Image.thumbnail: fit inside the box, never upscale
+    src_width, src_height = src_size
+    if width >= src_width and height >= src_height:
+        return src_width, src_height
+
+    def round_aspect(number, key):
+        return max(min(math.floor(number), math.ceil(number), key=key), 1)
+
+    aspect = src_width / src_height
+    if width / height >= aspect:
+        width = round_aspect(height * aspect, key=lambda n: abs(aspect - n / height))
+    else:
+        height = round_aspect(width / aspect, key=lambda n: 0 if n == 0 else abs(aspect - width / n))
+    return width, height
+
+
+def reduce_for_resize(img, target_size, reducing_gap=2.0):
+    """Cheaply shrink img towards target_size ahead of the final high-quality resample.
+
+    The result stays at least ``reducing_gap`` times larger than target_size.
+    Images not yet loaded are asked for a reduced-scale decode with
+    Image.draft (JPEG DCT scaling); otherwise the pixels are shrunk by an
+    integer factor with Image.reduce. Returns img itself when nothing changes,
+    including for modes Image.reduce does not support (P, 1, I;16).
+    """
+    factor, draft_size = _reduction(img.size, target_size, reducing_gap)
+    if factor < 2:
+        return img
+    if getattr(img, 'tile', None) and img.draft(None, draft_size) is not None:
+        return img
+    if not _can_reduce(img.mode):
+        return img
+    return img.reduce(int(factor))
+
+
+def _can_reduce(mode):
+    return mode not in ('P', '1') and not mode.startswith('I;16')
+
+
+def _reduction(size, target_size, reducing_gap):
+    """Return (reduction factor, draft size) used by reduce_for_resize."""
+    target_width, target_height = target_size
+    factor = min(
+        size[0] / (target_width * reducing_gap),
+        size[1] / (target_height * reducing_gap),
+    )
+    draft_size = (
+        math.ceil(target_width * reducing_gap),
+        math.ceil(target_height * reducing_gap),
+    )
+    return factor, draft_size
+
+
+def image_nbytes(img):
+    """Return the size of img's pixel buffer as Pillow stores it in memory."""
+    if img.mode in ('1', 'L', 'P'):
+        bytes_per_pixel = 1
+    elif img.mode.startswith('I;16'):
+        bytes_per_pixel = 2
+    else:
+        # RGB, RGBA, LA, CMYK, I, F, ... use 32-bit pixels
+        bytes_per_pixel = 4
+    return img.width * img.height * bytes_per_pixel
+
+
+_BYTE_UNITS = {'': 1, 'K': 1 << 10, 'M': 1 << 20, 'G': 1 << 30, 'T': 1 << 40}
+
+
+def parse_byte_size(value):
+    """Parse a byte count like ``2048``, ``512M`` or ``4G`` (binary units)."""
+    text = str(value).strip().upper().removesuffix('B').removesuffix('I')
+    number, unit = text, ''
+    if text and text[-1] in _BYTE_UNITS:
+        number, unit = text[:-1], text[-1]
+    try:
+        size = int(float(number) * _BYTE_UNITS[unit])
+    except ValueError:
+        raise ValueError(f"Invalid byte size {value!r}") from None
+    if size <= 0:
+        raise ValueError(f"Byte size must be positive: {value!r}")
+    return size
+
+
+# Strips' worth of rows convert_tiled holds at once (measured peak RSS, 36 MP RGB)
+_TILED_STRIPS_HELD = 8
+
+
+def estimate_decoded_bytes(
+    input_path,
     *,
+    enable_resize=False,
+    resize_width=800,
+    resize_height=600,
+    maintain_aspect=True,
+    fast_decode=True,
+    variants=None,
+    tiled=True,
+    output_format=None,
+    **_options,
+):
+    """Estimate the peak pixel memory of converting input_path, from its header only.
+
+    Counts the decoded source (after any JPEG draft reduction that
+    fast_decode would request), the working copy made while transforming
+    (two compositing buffers for animated images) and the resized output.
+    PNGs that convert_single_image would convert strip by strip count a few
+    strips plus the output canvas and its encoding copy, which a PNG
+    ``output_format`` does not need. Other convert_single_image options are accepted and ignored.
+    Unreadable files are estimated at 0 bytes; their conversion reports the
+    error.
+    """
+    try:
+        with Image.open(input_path) as img:
+            src_size = img.size
+            frames = getattr(img, 'n_frames', 1)
+            if variants:
+                sizes = [(v.width, v.height) for v in parse_variants(variants)]
+            elif enable_resize:
+                sizes = [(resize_width, resize_height)]
+            else:
+                sizes = []
+            targets = [resize_target_size(src_size, w, h, maintain_aspect) for w, h in sizes]
+            output = sum(width * height * 4 for width, height in targets)
+            if tiled and not variants and img.format == 'PNG':
+                from image_tiles import DEFAULT_STRIP_ROWS, TILED_MIN_PIXELS, should_convert_tiled
+
+                if src_size[0] * src_size[1] >= TILED_MIN_PIXELS and should_convert_tiled(
+                    input_path, **_options
+                ):
+                    # Inflated rows, the strips decoded from them and the resize window
+                    strip_rows = min(src_size[1], DEFAULT_STRIP_ROWS)
+                    strips = image_nbytes(img) // src_size[1] * strip_rows * _TILED_STRIPS_HELD
+                    if output_format is not None and output_format.lower() == 'png':
+                        return strips  # streamed to disk
+                    width, height = targets[0] if targets else src_size
+                    return strips + width * height * 4 * 2
+            if targets and fast_decode and frames == 1:
+                largest = max(targets, key=lambda size: size[0] * size[1])
+                # Same request reduce_for_resize makes; draft() only rewrites the header
+                img.draft(None, (math.ceil(largest[0] * 2.0), math.ceil(largest[1] * 2.0)))
+            decoded = image_nbytes(img)
+    except Exception:
+        return 0
+    if frames > 1:
+        # Frames are composited at 32 bits per pixel next to the previous frame
+        return src_size[0] * src_size[1] * 4 * 3 + output
+    return decoded * 2 + output
+
+
+StageRecord = namedtuple('StageRecord', ['stage', 'wall', 'cpu', 'peak_bytes'])
+
+
+class _StageTracker:
+    """Tracks the largest set of pixel buffers alive during one stage."""
+
+    __slots__ = ('peak_bytes',)
+
+    def __init__(self):
+        self.peak_bytes = 0
+
+    def track(self, *imgs):
+        """Record that imgs are alive at the same time."""
+        self.track_bytes(sum(image_nbytes(img) for img in imgs))
+
+    def track_bytes(self, nbytes):
+        self.peak_bytes = max(self.peak_bytes, nbytes)
+
+
+class _NullTracker:
+    __slots__ = ()
+
+    def track(self, *imgs):
+        pass
+
+    def track_bytes(self, nbytes):
+        pass
+
+
+_NULL_STAGE = nullcontext(_NullTracker())
+
+
+class ConversionProfile:
+    """Per-stage wall time, CPU time and peak pixel-buffer bytes for one file.
+
+    Pass one to convert_single_image / apply_transforms as ``profile``; each
+    stage (decode, gif_frame, resize, rotate, grayscale, encode) appends a
+    StageRecord. Peak bytes count the decoded images held during the stage,
+    since Pillow's pixel buffers are invisible to tracemalloc.
+    """
+
+    def __init__(self, input_path=None):
+        self.input_path = input_path
+        self.stages = []
+
+    @property
+    def total_wall(self):
+        return sum(record.wall for record in self.stages)
+
+    @contextmanager
+    def stage(self, name):
+        tracker = _StageTracker()
+        wall_start = time.perf_counter()
+        cpu_start = time.thread_time()
+        try:
+            yield tracker
+        finally:
+            self.stages.append(StageRecord(
+                name,
+                time.perf_counter() - wall_start,
+                time.thread_time() - cpu_start,
+                tracker.peak_bytes,
+            ))
+
+
+def _stage(profile, name):
+    """Return profile.stage(name), or a shared no-op context when not profiling."""
+    if profile is None:
+        return _NULL_STAGE
+    return profile.stage(name)
+
+
+def _percentile(sorted_values, fraction):
+    """Nearest-rank percentile of an already sorted, non-empty list."""
+    index = max(0, math.ceil(fraction * len(sorted_values)) - 1)
+    return sorted_values[index]
+
+
+def summarize_profiles(profiles, slowest=5):
+    """Aggregate ConversionProfiles into per-stage p50/p95/max and the slowest files."""
+    profiles = list(profiles)
+    by_stage = {}
+    for profile in profiles:
+        for record in profile.stages:
+            by_stage.setdefault(record.stage, []).append(record)
+
+    stages = {}
+    for name, records in by_stage.items():
+        walls = sorted(r.wall for r in records)
+        cpus = sorted(r.cpu for r in records)
+        stages[name] = {
+            'count': len(records),
+            'wall_total': sum(walls),
+            'wall_p50': _percentile(walls, 0.50),
+            'wall_p95': _percentile(walls, 0.95),
+            'wall_max': walls[-1],
+            'cpu_p50': _percentile(cpus, 0.50),
+            'cpu_p95': _percentile(cpus, 0.95),
+            'cpu_max': cpus[-1],
+            'peak_bytes_max': max(r.peak_bytes for r in records),
+        }
+
+    ranked = sorted(profiles, key=lambda p: p.total_wall, reverse=True)[:slowest]
+    return {
+        'files': len(profiles),
+        'stages': stages,
+        'slowest_files': [
+            {'input_path': p.input_path, 'wall': p.total_wall} for p in ranked
+        ],
+    }
+
+
+def format_profile_summary(summary):
+    """Render summarize_profiles output as a short text table."""
+    width = max([len('stage')] + [len(name) for name in summary['stages']])
+    lines = [f"{'stage':<{width}} {'p50 ms':>8} {'p95 ms':>8} {'max ms':>8} {'total s':>8} {'peak MB':>8}"]
+    for name, stats in sorted(summary['stages'].items(), key=lambda item: -item[1]['wall_total']):
+        lines.append(
+            f"{name:<{width}} {stats['wall_p50'] * 1e3:8.1f} {stats['wall_p95'] * 1e3:8.1f} "
+            f"{stats['wall_max'] * 1e3:8.1f} {stats['wall_total']:8.2f} {stats['peak_bytes_max'] / 1e6:8.1f}"
+        )
+    if summary['slowest_files']:
+        lines.append("slowest files:")
+        for entry in summary['slowest_files']:
+            lines.append(f"  {entry['wall'] * 1e3:8.1f} ms  {entry['input_path']}")
+    return "\n".join(lines)
+
+
+# Rotations that are exact pixel transposes (counter-clockwise, like Image.rotate)
+_TRANSPOSE_FOR_DEGREES = {
+    90: Image.Transpose.ROTATE_90,
+    180: Image.Transpose.ROTATE_180,
+    270: Image.Transpose.ROTATE_270,
+}
+
+
+def _resize_rotate(img, size, degrees):
+    """Resize img up to size and rotate it by degrees (expand=True) in one resample.
+
+    Builds the same expanded-canvas affine matrix as Image.rotate for an image
+    of the target size, then scales it back onto the source so a single
+    bicubic pass does both. Only for sizes at least as large as img: the
+    transform point-samples, so a fused downscale would alias.
+    """
+    width, height = size
+    angle = -math.radians(degrees)
+    cos_a = round(math.cos(angle), 15)
+    sin_a = round(math.sin(angle), 15)
+    matrix = [cos_a, sin_a, 0.0, -sin_a, cos_a, 0.0]
+
+    def transform(x, y):
+        a, b, c, d, e, f = matrix
+        return a * x + b * y + c, d * x + e * y + f
+
+    # Rotate about the centre of the target-size image
+    matrix[2], matrix[5] = transform(-width / 2.0, -height / 2.0)
+    matrix[2] += width / 2.0
+    matrix[5] += height / 2.0
+
+    corners = [transform(x, y) for x, y in ((0, 0), (width, 0), (width, height), (0, height))]
+    xs = [x for x, _ in corners]
+    ys = [y for _, y in corners]
+    out_width = math.ceil(max(xs)) - math.floor(min(xs))
+    out_height = math.ceil(max(ys)) - math.floor(min(ys))
+    matrix[2], matrix[5] = transform(-(out_width - width) / 2.0, -(out_height - height) / 2.0)
+
+    # Target-size coordinates -> source coordinates
+    scale_x = img.width / width
+    scale_y = img.height / height
+    matrix = [value * scale_x for value in matrix[:3]] + [value * scale_y for value in matrix[3:]]
+    return img.transform(
+        (out_width, out_height), Image.Transform.AFFINE, matrix, Image.Resampling.BICUBIC
+    )
+
+
+PlanStep = namedtuple('PlanStep', ['op', 'size', 'degrees'])
+
+
+class TransformPlan(namedtuple('TransformPlan', ['resize_box', 'maintain_aspect', 'degrees', 'grayscale'])):
+    """Transform settings parsed and clamped once (see compile_transforms).
+
+    ``resize_box`` is (width, height) or None and ``degrees`` is 0-359.
+    specialize() turns the plan into the steps that actually change an
+    image of a given size and mode; apply() runs them.
+    """
+    __slots__ = ()
+
+    def specialize(self, size, mode):
+        """Return the PlanSteps for a size/mode source, with no-op steps dropped.
+
+        Grayscale is dropped for L images, a resize that keeps the size and a
+        0 degree rotation are dropped. Grayscale runs first so the geometry
+        touches one band instead of three. An upscale with a non-right-angle
+        rotation becomes one resample; a downscale is filtered (Lanczos)
+        before rotating, since the fused resample would alias.
+        """
+        steps = []
+        if self.grayscale and mode != 'L':
+            steps.append(PlanStep('grayscale', None, 0))
+
+        target_size = None
+        if self.resize_box is not None:
+            target_size = resize_target_size(size, *self.resize_box, self.maintain_aspect)
+            if target_size == size:
+                target_size = None
+
+        degrees = self.degrees
+        if target_size is None:
+            if degrees:
+                op = 'transpose' if degrees in _TRANSPOSE_FOR_DEGREES else 'rotate'
+                steps.append(PlanStep(op, None, degrees))
+        elif not degrees:
+            steps.append(PlanStep('resize', target_size, 0))
+        elif degrees not in _TRANSPOSE_FOR_DEGREES:
+            if target_size[0] >= size[0] and target_size[1] >= size[1]:
+                steps.append(PlanStep('resize+rotate', target_size, degrees))
+            else:
+                steps.append(PlanStep('resize', target_size, 0))
+                steps.append(PlanStep('rotate', None, degrees))
+        else:
+            steps.append(PlanStep('resize', target_size, 0))
+            steps.append(PlanStep('transpose', None, degrees))
+        return tuple(steps)
+
+    def apply(self, img, profile=None):
+        """Run the steps specialized for img and return the result (img itself if none)."""
+        for op, size, degrees in self.specialize(img.size, img.mode):
+            if op == 'grayscale':
+                with _stage(profile, 'grayscale') as stage:
+                    result = ImageOps.grayscale(img)
+                    stage.track(img, result)
+            elif op == 'resize':
+                with _stage(profile, 'resize') as stage:
+                    result = img.resize(size, Image.Resampling.LANCZOS, reducing_gap=2.0)
+                    stage.track(img, result)
+            elif op == 'resize+rotate':
+                with _stage(profile, 'resize+rotate') as stage:
+                    result = _resize_rotate(img, size, degrees)
+                    stage.track(img, result)
+            else:
+                with _stage(profile, 'rotate') as stage:
+                    if op == 'transpose':
+                        result = img.transpose(_TRANSPOSE_FOR_DEGREES[degrees])
+                    else:
+                        result = img.rotate(degrees, Image.Resampling.BICUBIC, expand=True)
+                    stage.track(img, result)
+            img = result
+        return img
+
+    def explain(self, size, mode):
+        """Describe, one line per step, what apply() does to a size/mode source."""
+        lines = []
+        steps = self.specialize(size, mode)
+        ops = [step.op for step in steps]
+        if self.grayscale and 'grayscale' not in ops:
+            lines.append("skip grayscale: already L")
+        if self.resize_box is not None and not any(step.size for step in steps):
+            box_width, box_height = self.resize_box
+            lines.append(f"skip resize: {size[0]}x{size[1]} already fits {box_width}x{box_height}")
+        for op, target_size, degrees in steps:
+            if op == 'grayscale':
+                lines.append(f"grayscale {mode} -> L")
+                mode = 'L'
+            elif op == 'resize':
+                lines.append(f"resize {size[0]}x{size[1]} -> {target_size[0]}x{target_size[1]} (Lanczos)")
+                size = target_size
+            elif op == 'resize+rotate':
+                lines.append(
+                    f"resize {size[0]}x{size[1]} -> {target_size[0]}x{target_size[1]} "
+                    f"and rotate {degrees} in one bicubic pass"
+                )
+            elif op == 'transpose':
+                lines.append(f"rotate {degrees} (exact transpose)")
+                if degrees != 180:
+                    size = size[::-1]
+            else:
+                lines.append(f"rotate {degrees} (bicubic, expanded canvas)")
+        if not lines:
+            lines.append("no transforms")
+        return lines
+
+
+@lru_cache(maxsize=64)
+def compile_transforms(
     enable_resize=False,
     resize_width=800,
     resize_height=600,
@@ -78,49 +715,360 @@ def apply_transforms(
     rotate_degrees=0,
     grayscale=False,
 ):
-    """Apply resize / rotate / grayscale transforms and return the result."""
+    """Parse and clamp apply_transforms settings into a TransformPlan.
+
+    Memoized, so a batch compiles its settings once per process.
+    """
+    resize_box = None
     if enable_resize:
-        width = max(1, int(resize_width))
-        height = max(1, int(resize_height))
-        if maintain_aspect:
-            img.thumbnail((width, height), Image.Resampling.LANCZOS)
-        else:
-            img = img.resize((width, height), Image.Resampling.LANCZOS)
+        resize_box = (max(1, int(resize_width)), max(1, int(resize_height)))
+    degrees = max(0, min(360, int(rotate_degrees))) % 360
+    return TransformPlan(resize_box, bool(maintain_aspect), degrees, bool(grayscale))
 
-    degrees = max(0, min(360, int(rotate_degrees)))
-    if degrees != 0:
-        img = img.rotate(degrees, expand=True)
 
-    if grayscale:
-        img = ImageOps.grayscale(img)
+def apply_transforms(
+    img,
+    *,
+    enable_resize=False,
+    resize_width=800,
+    resize_height=600,
+    maintain_aspect=True,
+    rotate_degrees=0,
+    grayscale=False,
+    profile=None,
+):
+    """Apply resize / rotate / grayscale transforms and return the result.
 
-    return img
+    Runs the compiled TransformPlan for these settings (see
+    TransformPlan.specialize for the step order and what is skipped).
+    Multiples of 90 degrees are exact transposes; any other angle combined
+    with an upscale is a single affine resample.
+    """
+    plan = compile_transforms(
+        enable_resize, resize_width, resize_height, maintain_aspect, rotate_degrees, grayscale
+    )
+    return plan.apply(img, profile)
 
 
-def build_output_path(input_path, output_dir, output_format):
-    """Build output path: <output_dir>/<basename>.<format>."""
+def build_output_path(input_path, output_dir, output_format, suffix=''):
+    """Build output path: <output_dir>/<basename><suffix>.<format>."""
     base_name = os.path.splitext(os.path.basename(input_path))[0]
-    return os.path.join(output_dir, f"{base_name}.{output_format}")
+    return os.path.join(output_dir, f"{base_name}{suffix}.{output_format}")
+
+
+# Named encoder speed/size trade-offs: save() options per output format
+ENCODER_PROFILES = {
+    'fastest': {
+        'jpeg': {'optimize': False, 'progressive': False},
+        'png': {'compress_level': 1},
+        'webp': {'method': 0},
+    },
+    'balanced': {
+        'jpeg': {'optimize': True, 'progressive': False},
+        'png': {'compress_level': 6},
+        'webp': {'method': 4},
+    },
+    'smallest': {
+        'jpeg': {'optimize': True, 'progressive': True},
+        'png': {'compress_level': 9, 'optimize': True},
+        'webp': {'method': 6},
+    },
+}
+DEFAULT_ENCODER_PROFILE = 'balanced'
 
+# Config keys that override a single encoder option: key -> (format, save() option)
+ENCODER_OVERRIDE_KEYS = {
+    'jpeg_optimize': ('jpeg', 'optimize'),
+    'jpeg_progressive': ('jpeg', 'progressive'),
+    'jpeg_subsampling': ('jpeg', 'subsampling'),
+    'png_compress_level': ('png', 'compress_level'),
+    'png_optimize': ('png', 'optimize'),
+    'webp_method': ('webp', 'method'),
+}
 
-def save_image(img, output_path, output_format, quality=85):
-    """Save image with format-appropriate options. Returns the path written."""
+
+def encoder_options(output_format, encoder_profile=DEFAULT_ENCODER_PROFILE, encoder_overrides=None):
+    """Return the save() options for output_format under a profile plus overrides.
+
+    ``encoder_overrides`` maps ENCODER_OVERRIDE_KEYS names (as used in the
+    config file) to values; overrides for other formats are ignored.
+    """
+    output_format = output_format.lower()
+    output_format = 'jpeg' if output_format == 'jpg' else output_format
+    try:
+        options = dict(ENCODER_PROFILES[encoder_profile or DEFAULT_ENCODER_PROFILE].get(output_format, {}))
+    except KeyError:
+        raise ValueError(
+            f"Unknown encoder profile {encoder_profile!r} (choose from {', '.join(ENCODER_PROFILES)})"
+        ) from None
+    for key, value in (encoder_overrides or {}).items():
+        if key not in ENCODER_OVERRIDE_KEYS:
+            raise ValueError(f"Unknown encoder option {key!r}")
+        key_format, option = ENCODER_OVERRIDE_KEYS[key]
+        if key_format == output_format:
+            options[option] = value
+    return options
+
+
+def _prepare_save(img, output_format, quality, encoder_profile, encoder_overrides):
+    """Return (image, Pillow format name, save kwargs) for saving img as output_format."""
     output_format = output_format.lower()
-    save_kwargs = {}
+    save_kwargs = encoder_options(output_format, encoder_profile, encoder_overrides)
     quality = max(1, min(100, int(quality)))
     if output_format in ('jpg', 'jpeg', 'webp'):
         save_kwargs['quality'] = quality
-    if output_format == 'webp':
-        save_kwargs['method'] = 6
 
     pil_format = 'JPEG' if output_format == 'jpg' else output_format.upper()
     # JPEG cannot save palette/RGBA modes without conversion
     if pil_format == 'JPEG' and img.mode in ('RGBA', 'P', 'LA'):
         img = img.convert('RGB')
-    img.save(output_path, format=pil_format, **save_kwargs)
+    return img, pil_format, save_kwargs
+
+
+def _temp_output_path(output_path):
+    """Hidden sibling of output_path, unique per process and thread."""
+    directory, name = os.path.split(output_path)
+    return os.path.join(directory, f".{name}.tmp-{os.getpid()}-{threading.get_ident()}")
+
+
+def save_image(
+    img,
+    output_path,
+    output_format,
+    quality=85,
+    encoder_profile=DEFAULT_ENCODER_PROFILE,
+    encoder_overrides=None,
+):
+    """Save image with format-appropriate options. Returns the path written.
+
+    ``encoder_profile`` names an entry of ENCODER_PROFILES and
+    ``encoder_overrides`` adjusts single options (see encoder_options).
+    """
+    img, pil_format, save_kwargs = _prepare_save(
+        img, output_format, quality, encoder_profile, encoder_overrides
+    )
+    # Write a temp file and rename it into place: a crash never leaves a
+    # half-written output, and a hard-linked output (e.g. shared with
+    # OutputCache) is replaced rather than written through
+    tmp_path = _temp_output_path(output_path)
+    try:
+        img.save(tmp_path, format=pil_format, **save_kwargs)
+        os.replace(tmp_path, output_path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+    return output_path
+
+
+def encode_image(
+    img,
+    output_format,
+    quality=85,
+    encoder_profile=DEFAULT_ENCODER_PROFILE,
+    encoder_overrides=None,
+):
+    """Like save_image, but return the encoded file as bytes."""
+    img, pil_format, save_kwargs = _prepare_save(
+        img, output_format, quality, encoder_profile, encoder_overrides
+    )
+    buffer = io.BytesIO()
+    img.save(buffer, format=pil_format, **save_kwargs)
+    return buffer.getvalue()
+
+
+def write_file_atomic(output_path, data):
+    """Write bytes to output_path through a temp file and rename (see save_image)."""
+    tmp_path = _temp_output_path(output_path)
+    try:
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, output_path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
     return output_path
 
 
+def link_or_copy(src, dst, link=True):
+    """Hard-link src to dst, copying instead when link is False or linking fails."""
+    if link:
+        try:
+            os.link(src, dst)
+            return
+        except OSError:
+            pass  # cross-device, unsupported filesystem, ...
+    shutil.copyfile(src, dst)
+
+
+# apply_transforms keywords, in compile_transforms order
+_TRANSFORM_OPTIONS = (
+    'enable_resize', 'resize_width', 'resize_height', 'maintain_aspect', 'rotate_degrees', 'grayscale'
+)
+
+# How convert_single_image stores a file that needs no pixel work
+PASSTHROUGH_MODES = ('copy', 'link', 'off')
+DEFAULT_PASSTHROUGH = 'copy'
+
+
+def _pil_format(output_format):
+    output_format = output_format.lower()
+    return 'JPEG' if output_format == 'jpg' else output_format.upper()
+
+
+def _settings_keep_pixels(*, rotate_degrees, grayscale, passthrough, **_options):
+    """The checks of _is_noop that need no file header."""
+    if passthrough not in PASSTHROUGH_MODES:
+        raise ValueError(f"Unknown passthrough mode {passthrough!r}; choose from {', '.join(PASSTHROUGH_MODES)}")
+    return passthrough != 'off' and not grayscale and not max(0, min(360, int(rotate_degrees))) % 360
+
+
+def _is_noop(source_format, size, n_frames, output_format, *, enable_resize, resize_width,
+             resize_height, maintain_aspect, **options):
+    if not _settings_keep_pixels(**options):
+        return False
+    if n_frames != 1 or source_format != _pil_format(output_format):
+        return False
+    return not enable_resize or resize_target_size(size, resize_width, resize_height, maintain_aspect) == size
+
+
+def can_pass_through(input_path, output_format, **options):
+    """True when converting input_path with options would only re-encode it unchanged.
+
+    That is: the source is a single, intact image already in output_format
+    and the settings ask for no grayscale, rotation or effective resize.
+    Decided from the file header (probe_image) and the convert_single_image
+    options; quality and encoder settings do not count, since re-encoding
+    would only add generation loss. A ``passthrough`` option of 'off'
+    always returns False. The file is only opened when the settings and its
+    extension allow a passthrough.
+    """
+    options.setdefault('passthrough', DEFAULT_PASSTHROUGH)
+    for name in _TRANSFORM_OPTIONS:
+        options.setdefault(name, _CONVERT_DEFAULTS[name])
+    if not _settings_keep_pixels(**options):
+        return False
+    extension = os.path.splitext(input_path)[1].lower()
+    if Image.registered_extensions().get(extension) != _pil_format(output_format):
+        return False
+    probe = probe_image(input_path)
+    if probe.status != 'ok':
+        return False
+    return _is_noop(probe.format, probe.size, probe.n_frames, output_format, **options)
+
+
+def pass_through(input_path, output_path, link=False):
+    """Store input_path's bytes unchanged at output_path (atomically, like save_image).
+
+    Hard-links when ``link`` is True and the filesystem allows it, otherwise
+    copies. Returns output_path.
+    """
+    if os.path.exists(output_path) and os.path.samefile(input_path, output_path):
+        return output_path
+    tmp_path = _temp_output_path(output_path)
+    try:
+        link_or_copy(input_path, tmp_path, link)
+        os.replace(tmp_path, output_path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+    return output_path
+
+
+def benchmark_encoder_profiles(
+    input_paths,
+    output_formats=('jpeg', 'png', 'webp'),
+    profiles=None,
+    quality=85,
+    encoder_overrides=None,
+):
+    """Time every encoder profile on the given images, encoding in memory.
+
+    Each source is decoded once. Returns one dict per (profile, format) with
+    the total encode ``seconds`` and output ``bytes`` over all images.
+    """
+    images = []
+    for path in input_paths:
+        with Image.open(path) as img:
+            images.append(img.copy())
+    results = []
+    for profile_name in profiles or list(ENCODER_PROFILES):
+        for output_format in output_formats:
+            seconds = 0.0
+            nbytes = 0
+            for img in images:
+                prepared, pil_format, save_kwargs = _prepare_save(
+                    img, output_format, quality, profile_name, encoder_overrides
+                )
+                buffer = io.BytesIO()
+                start = time.perf_counter()
+                prepared.save(buffer, format=pil_format, **save_kwargs)
+                seconds += time.perf_counter() - start
+                nbytes += buffer.tell()
+            results.append({
+                'profile': profile_name,
+                'format': output_format,
+                'images': len(images),
+                'seconds': seconds,
+                'bytes': nbytes,
+            })
+    return results
+
+
+def format_encoder_benchmark(results):
+    """Render benchmark_encoder_profiles results as a plain-text table."""
+    lines = [f"{'profile':10} {'format':6} {'images':>6} {'encode s':>9} {'ms/img':>8} {'output KB':>10}"]
+    for r in results:
+        per_image = r['seconds'] / r['images'] * 1000 if r['images'] else 0.0
+        lines.append(
+            f"{r['profile']:10} {r['format']:6} {r['images']:6d} {r['seconds']:9.3f} "
+            f"{per_image:8.1f} {r['bytes'] / 1024:10.1f}"
+        )
+    return "\n".join(lines)
+
+
+def _decode_and_transform(
+    opened,
+    is_gif,
+    *,
+    enable_resize,
+    resize_width,
+    resize_height,
+    maintain_aspect,
+    rotate_degrees,
+    grayscale,
+    gif_frame,
+    fast_decode,
+    profile,
+):
+    """Decode an opened image and apply the transforms; use before closing it."""
+    # Extract GIF frame while the file handle is still open (multi-frame)
+    if is_gif:
+        with _stage(profile, 'gif_frame') as stage:
+            img = extract_gif_frame(opened, gif_frame)
+            stage.track(img)
+    else:
+        with _stage(profile, 'decode') as stage:
+            img = opened
+            if enable_resize and fast_decode:
+                target_size = resize_target_size(
+                    opened.size, resize_width, resize_height, maintain_aspect
+                )
+                img = reduce_for_resize(opened, target_size)
+            img.load()
+            stage.track(img)
+
+    return apply_transforms(
+        img,
+        enable_resize=enable_resize,
+        resize_width=resize_width,
+        resize_height=resize_height,
+        maintain_aspect=maintain_aspect,
+        rotate_degrees=rotate_degrees,
+        grayscale=grayscale,
+        profile=profile,
+    )
+
+
 def convert_single_image(
     input_path,
     output_dir,
@@ -134,27 +1082,741 @@ def convert_single_image(
     grayscale=False,
     quality=85,
     gif_frame=0,
+    fast_decode=True,
+    encoder_profile=DEFAULT_ENCODER_PROFILE,
+    encoder_overrides=None,
+    tiled=True,
+    passthrough=DEFAULT_PASSTHROUGH,
+    profile=None,
 ):
-    """Open, transform, and save one image. Returns output path."""
-    with Image.open(input_path) as opened:
-        # Extract GIF frame while the file handle is still open (multi-frame)
-        if input_path.lower().endswith('.gif'):
-            img = extract_gif_frame(opened, gif_frame)
-        else:
-            img = opened.copy()
+    """Open, transform, and save one image. Returns output path.
 
-    img = apply_transforms(
-        img,
+    With ``fast_decode`` (the default) a resize to a much smaller size decodes
+    the source at reduced scale first; pass False to force a full decode.
+    With ``tiled`` (the default) very large PNGs are converted strip by strip
+    (see image_tiles) when no rotation is requested.
+    A source that needs no pixel work (see can_pass_through) is copied as is,
+    or hard-linked with ``passthrough='link'``; 'off' always re-encodes.
+    Pass a ConversionProfile as ``profile`` to record per-stage timings.
+    """
+    if can_pass_through(
+        input_path,
+        output_format,
         enable_resize=enable_resize,
         resize_width=resize_width,
         resize_height=resize_height,
         maintain_aspect=maintain_aspect,
         rotate_degrees=rotate_degrees,
         grayscale=grayscale,
+        passthrough=passthrough,
+    ):
+        output_path = build_output_path(input_path, output_dir, output_format.lower())
+        with _stage(profile, 'passthrough'):
+            return pass_through(input_path, output_path, link=passthrough == 'link')
+
+    # Everything happens while the file is open: the decoded pixels are used
+    # in place instead of being copied out before Image.close() drops them
+    with Image.open(input_path) as opened:
+        if tiled and opened.format == 'PNG':
+            # image_tiles builds on this module, so import it on first use
+            from image_tiles import TILED_MIN_PIXELS, convert_tiled, should_convert_tiled
+
+            if opened.width * opened.height >= TILED_MIN_PIXELS and should_convert_tiled(
+                input_path, rotate_degrees=rotate_degrees
+            ):
+                return convert_tiled(
+                    input_path,
+                    output_dir,
+                    output_format,
+                    enable_resize=enable_resize,
+                    resize_width=resize_width,
+                    resize_height=resize_height,
+                    maintain_aspect=maintain_aspect,
+                    grayscale=grayscale,
+                    quality=quality,
+                    encoder_profile=encoder_profile,
+                    encoder_overrides=encoder_overrides,
+                    fast_decode=fast_decode,
+                    profile=profile,
+                )
+
+        img = _decode_and_transform(
+            opened,
+            input_path.lower().endswith('.gif'),
+            enable_resize=enable_resize,
+            resize_width=resize_width,
+            resize_height=resize_height,
+            maintain_aspect=maintain_aspect,
+            rotate_degrees=rotate_degrees,
+            grayscale=grayscale,
+            gif_frame=gif_frame,
+            fast_decode=fast_decode,
+            profile=profile,
+        )
+
+        output_path = build_output_path(input_path, output_dir, output_format.lower())
+        with _stage(profile, 'encode') as stage:
+            stage.track(img)
+            return save_image(
+                img,
+                output_path,
+                output_format,
+                quality=quality,
+                encoder_profile=encoder_profile,
+                encoder_overrides=encoder_overrides,
+            )
+
+
+def convert_image_data(
+    data,
+    output_format,
+    *,
+    enable_resize=False,
+    resize_width=800,
+    resize_height=600,
+    maintain_aspect=True,
+    rotate_degrees=0,
+    grayscale=False,
+    quality=85,
+    gif_frame=0,
+    fast_decode=True,
+    encoder_profile=DEFAULT_ENCODER_PROFILE,
+    encoder_overrides=None,
+    tiled=True,
+    passthrough=DEFAULT_PASSTHROUGH,
+    profile=None,
+):
+    """convert_single_image for an in-memory file: encoded bytes in, encoded bytes out.
+
+    Takes the same options; ``tiled`` is accepted and ignored since the whole
+    source is already in memory, and an intact source needing no pixel work
+    is returned as is (the same object) unless ``passthrough`` is 'off'.
+    """
+    with Image.open(io.BytesIO(data)) as opened:
+        if _is_noop(
+            opened.format,
+            opened.size,
+            getattr(opened, 'n_frames', 1),
+            output_format,
+            enable_resize=enable_resize,
+            resize_width=resize_width,
+            resize_height=resize_height,
+            maintain_aspect=maintain_aspect,
+            rotate_degrees=rotate_degrees,
+            grayscale=grayscale,
+            passthrough=passthrough,
+        ) and not _is_truncated(io.BytesIO(data), opened.format, len(data)):
+            return data
+        img = _decode_and_transform(
+            opened,
+            opened.format == 'GIF',
+            enable_resize=enable_resize,
+            resize_width=resize_width,
+            resize_height=resize_height,
+            maintain_aspect=maintain_aspect,
+            rotate_degrees=rotate_degrees,
+            grayscale=grayscale,
+            gif_frame=gif_frame,
+            fast_decode=fast_decode,
+            profile=profile,
+        )
+        with _stage(profile, 'encode') as stage:
+            stage.track(img)
+            return encode_image(
+                img,
+                output_format,
+                quality=quality,
+                encoder_profile=encoder_profile,
+                encoder_overrides=encoder_overrides,
+            )
+
+
+def explain_conversion(input_path, output_format, **options):
+    """Describe how convert_single_image would process input_path, one line per stage.
+
+    Reads only the file header: covers passthrough, tiling, reduced-scale
+    decoding, the specialized transform steps (TransformPlan.explain) and
+    the encoder settings.
+    """
+    settings = dict(_CONVERT_DEFAULTS)
+    settings.update(options)
+    output_format = output_format.lower()
+    probe = probe_image(input_path)
+    if probe.status == 'corrupt':
+        return [f"unreadable: {probe.error}"]
+    if can_pass_through(input_path, output_format, **settings):
+        how = 'hard-link' if settings['passthrough'] == 'link' else 'copy'
+        return [f"passthrough: {how} the {probe.format} file unchanged (no pixel work)"]
+
+    plan = compile_transforms(*(settings[name] for name in _TRANSFORM_OPTIONS))
+    lines = []
+    with Image.open(input_path) as opened:
+        size, mode = opened.size, opened.mode
+        tiled = False
+        if settings['tiled'] and opened.format == 'PNG':
+            from image_tiles import TILED_MIN_PIXELS, should_convert_tiled
+
+            tiled = size[0] * size[1] >= TILED_MIN_PIXELS and should_convert_tiled(input_path, **settings)
+        if tiled:
+            lines.append(f"convert {size[0]}x{size[1]} {mode} strip by strip (tiled PNG)")
+        elif input_path.lower().endswith('.gif'):
+            lines.append(f"extract GIF frame {settings['gif_frame']} of {probe.n_frames}")
+        elif plan.resize_box is not None and settings['fast_decode']:
+            target_size = resize_target_size(size, *plan.resize_box, plan.maintain_aspect)
+            factor, draft_size = _reduction(size, target_size, 2.0)
+            if factor >= 2 and opened.tile and opened.draft(None, draft_size) is not None:
+                lines.append(f"decode {mode} at reduced scale: {size[0]}x{size[1]} -> "
+                             f"{opened.width}x{opened.height} (JPEG DCT scaling)")
+                size = opened.size
+            elif factor >= 2 and _can_reduce(mode):
+                reduced = (math.ceil(size[0] / int(factor)), math.ceil(size[1] / int(factor)))
+                lines.append(f"decode {size[0]}x{size[1]} {mode}, reduce {int(factor)}x to "
+                             f"{reduced[0]}x{reduced[1]}")
+                size = reduced
+            else:
+                lines.append(f"decode {size[0]}x{size[1]} {mode}")
+        else:
+            lines.append(f"decode {size[0]}x{size[1]} {mode}")
+    if not tiled:
+        lines.extend(plan.explain(size, mode))
+
+    pil_format = _pil_format(output_format)
+    encoder = encoder_options(output_format, settings['encoder_profile'], settings['encoder_overrides'])
+    if output_format in ('jpg', 'jpeg', 'webp'):
+        encoder['quality'] = max(1, min(100, int(settings['quality'])))
+    described = ', '.join(f"{key}={value}" for key, value in sorted(encoder.items()))
+    lines.append(f"encode {pil_format}" + (f" ({described})" if described else ""))
+    return lines
+
+
+Variant = namedtuple('Variant', ['width', 'height', 'output_format'])
+
+
+def parse_variants(spec):
+    """Parse a variants spec like ``1600:webp, 800x600:jpg, 320`` into Variants.
+
+    Each entry is WIDTH or WIDTHxHEIGHT (a WIDTH-only entry is a square box,
+    i.e. the longest side with aspect kept), optionally followed by
+    ``:format`` (default: png). Duplicate entries are dropped.
+    """
+    if isinstance(spec, (list, tuple)):
+        return list(spec)
+    variants = []
+    for item in str(spec).split(','):
+        item = item.strip()
+        if not item:
+            continue
+        size, _, output_format = item.partition(':')
+        width, _, height = size.lower().partition('x')
+        try:
+            width = max(1, int(width))
+            height = max(1, int(height)) if height else width
+        except ValueError:
+            raise ValueError(f"Invalid variant {item!r}") from None
+        variant = Variant(width, height, (output_format.strip() or 'png').lower())
+        if variant not in variants:
+            variants.append(variant)
+    if not variants:
+        raise ValueError(f"No variants in {spec!r}")
+    return variants
+
+
+def format_variants(variants):
+    """Inverse of parse_variants: render Variants as a config value."""
+    return ", ".join(
+        f"{v.width}:{v.output_format}" if v.width == v.height else f"{v.width}x{v.height}:{v.output_format}"
+        for v in variants
     )
 
-    output_path = build_output_path(input_path, output_dir, output_format.lower())
-    return save_image(img, output_path, output_format, quality=quality)
+
+def variant_suffix(variant):
+    """Filename suffix for a variant output, e.g. ``_1600`` or ``_800x600``."""
+    if variant.width == variant.height:
+        return f"_{variant.width}"
+    return f"_{variant.width}x{variant.height}"
+
+
+def convert_variants(
+    input_path,
+    output_dir,
+    variants,
+    *,
+    maintain_aspect=True,
+    rotate_degrees=0,
+    grayscale=False,
+    quality=85,
+    gif_frame=0,
+    fast_decode=True,
+    encoder_profile=DEFAULT_ENCODER_PROFILE,
+    encoder_overrides=None,
+    workers=1,
+    profile=None,
+):
+    """Decode input_path once and save it at every size/format in variants.
+
+    Each size is resampled from the next larger one that covers it (a
+    downscale cascade) rather than from the full source, and grayscale runs
+    once before any resize. Outputs are named <basename>_<size>.<format>; the
+    encodes run on ``workers`` threads. Returns the output paths in the order
+    of ``variants``.
+    """
+    variants = parse_variants(variants)
+    with Image.open(input_path) as opened:
+        src_size = opened.size
+        targets = [
+            resize_target_size(src_size, v.width, v.height, maintain_aspect) for v in variants
+        ]
+        if input_path.lower().endswith('.gif'):
+            with _stage(profile, 'gif_frame') as stage:
+                base = extract_gif_frame(opened, gif_frame)
+                stage.track(base)
+        else:
+            with _stage(profile, 'decode') as stage:
+                base = opened
+                if fast_decode:
+                    largest = max(targets, key=lambda size: size[0] * size[1])
+                    base = reduce_for_resize(opened, largest)
+                base.load()
+                stage.track(base)
+
+        if grayscale:
+            base = apply_transforms(base, grayscale=True, profile=profile)
+
+        # Largest first; each level is resampled from the smallest level covering it
+        levels = []
+        images = [None] * len(variants)
+        for index in sorted(range(len(variants)), key=lambda i: -targets[i][0] * targets[i][1]):
+            target = targets[index]
+            source = base
+            for level in levels:
+                if level.width >= target[0] and level.height >= target[1]:
+                    source = level
+            if source.size == target:
+                img = source
+            else:
+                with _stage(profile, 'resize') as stage:
+                    img = source.resize(target, Image.Resampling.LANCZOS, reducing_gap=2.0)
+                    stage.track(source, img)
+            levels.append(img)
+            images[index] = apply_transforms(img, rotate_degrees=rotate_degrees, profile=profile)
+
+        output_paths = [
+            build_output_path(input_path, output_dir, v.output_format, variant_suffix(v))
+            for v in variants
+        ]
+        jobs = list(zip(images, output_paths, (v.output_format for v in variants)))
+        encode = partial(
+            save_image, quality=quality, encoder_profile=encoder_profile, encoder_overrides=encoder_overrides
+        )
+        with _stage(profile, 'encode') as stage:
+            stage.track(*images)
+            if workers > 1 and len(jobs) > 1:
+                with ThreadPoolExecutor(max_workers=min(workers, len(jobs))) as pool:
+                    list(pool.map(lambda job: encode(*job), jobs))
+            else:
+                for job in jobs:
+                    encode(*job)
+    return output_paths
+
+
+def parse_frame_spec(spec):
+    """Parse a GIF frame selection into a list of (start, stop, step) ranges.
+
+    Comma-separated items: ``N`` (one frame), ``A-B`` (inclusive range),
+    ``A-`` (A to the last frame), ``all``, each optionally followed by
+    ``:STEP``; e.g. ``0,5,9``, ``10-20``, ``all:10`` (every 10th frame).
+    ``stop`` is None for open-ended ranges.
+    """
+    ranges = []
+    for item in str(spec).lower().split(','):
+        item = item.strip()
+        if not item:
+            continue
+        bounds, _, step = item.partition(':')
+        try:
+            step = int(step) if step else 1
+            if bounds in ('all', '*'):
+                start, stop = 0, None
+            elif '-' in bounds:
+                first, last = bounds.split('-', 1)
+                start = int(first) if first else 0
+                stop = int(last) + 1 if last else None
+            else:
+                start = int(bounds)
+                stop = start + 1
+        except ValueError:
+            raise ValueError(f"Invalid frame selection {item!r}") from None
+        if start < 0 or step < 1 or (stop is not None and stop <= start):
+            raise ValueError(f"Invalid frame selection {item!r}")
+        ranges.append((start, stop, step))
+    if not ranges:
+        raise ValueError(f"No frames in {spec!r}")
+    return ranges
+
+
+def select_frames(spec, n_frames):
+    """Return the sorted frame indices of spec that exist in an n_frames animation."""
+    ranges = parse_frame_spec(spec) if not isinstance(spec, list) else spec
+    selected = set()
+    for start, stop, step in ranges:
+        stop = n_frames if stop is None else min(stop, n_frames)
+        selected.update(range(start, stop, step))
+    return sorted(selected)
+
+
+def convert_gif_frames(
+    input_path,
+    output_dir,
+    output_format,
+    frames,
+    *,
+    enable_resize=False,
+    resize_width=800,
+    resize_height=600,
+    maintain_aspect=True,
+    rotate_degrees=0,
+    grayscale=False,
+    quality=85,
+    encoder_profile=DEFAULT_ENCODER_PROFILE,
+    encoder_overrides=None,
+    profile=None,
+):
+    """Save several frames of an animated image in one sequential decode pass.
+
+    ``frames`` is a frame spec (see parse_frame_spec). Frames are composited
+    in order and each selected one is transformed and encoded as soon as it
+    is reached, so N outputs cost one decode. Outputs are named
+    <basename>_frame<N>.<format>; returns their paths in frame order.
+    """
+    output_format = output_format.lower()
+    output_paths = []
+    with Image.open(input_path) as opened:
+        indices = select_frames(frames, getattr(opened, 'n_frames', 1))
+        if not indices:
+            raise ValueError(f"Frame selection {frames!r} matches none of the frames")
+        for index in indices:
+            with _stage(profile, 'gif_frame') as stage:
+                # Seeking forward one frame at a time only composites the new frame
+                for position in range(opened.tell() + 1, index + 1):
+                    opened.seek(position)
+                if opened.tell() != index:
+                    opened.seek(index)
+                frame = opened.copy()
+                stage.track(frame)
+            img = apply_transforms(
+                frame,
+                enable_resize=enable_resize,
+                resize_width=resize_width,
+                resize_height=resize_height,
+                maintain_aspect=maintain_aspect,
+                rotate_degrees=rotate_degrees,
+                grayscale=grayscale,
+                profile=profile,
+            )
+            output_path = build_output_path(input_path, output_dir, output_format, f"_frame{index}")
+            with _stage(profile, 'encode') as stage:
+                stage.track(img)
+                save_image(
+                    img,
+                    output_path,
+                    output_format,
+                    quality=quality,
+                    encoder_profile=encoder_profile,
+                    encoder_overrides=encoder_overrides,
+                )
+            output_paths.append(output_path)
+    return output_paths
+
+
+_CONVERT_DEFAULTS = {
+    name: param.default
+    for name, param in inspect.signature(convert_single_image).parameters.items()
+    if param.kind is param.KEYWORD_ONLY
+}
+
+# convert_single_image keywords that never change the output bytes
+_NON_OUTPUT_OPTIONS = ('profile',)
+
+
+def normalize_settings(output_format, **options):
+    """Return every setting that affects convert_single_image's output, canonicalized.
+
+    Defaults are filled in from convert_single_image, values are clamped the
+    way the conversion clamps them, and settings that cannot change the output
+    (e.g. resize dimensions while resize is disabled) are dropped.
+    """
+    settings = dict(_CONVERT_DEFAULTS)
+    settings.update(options)
+    for name in _NON_OUTPUT_OPTIONS:
+        settings.pop(name, None)
+
+    output_format = output_format.lower()
+    settings['output_format'] = 'jpeg' if output_format == 'jpg' else output_format
+    settings['enable_resize'] = bool(settings['enable_resize'])
+    if settings['enable_resize']:
+        settings['resize_width'] = max(1, int(settings['resize_width']))
+        settings['resize_height'] = max(1, int(settings['resize_height']))
+        settings['maintain_aspect'] = bool(settings['maintain_aspect'])
+        settings['fast_decode'] = bool(settings['fast_decode'])
+    else:
+        for name in ('resize_width', 'resize_height', 'maintain_aspect', 'fast_decode'):
+            settings.pop(name, None)
+    settings['rotate_degrees'] = max(0, min(360, int(settings['rotate_degrees']))) % 360
+    settings['grayscale'] = bool(settings['grayscale'])
+    if settings['output_format'] in ('jpeg', 'webp'):
+        settings['quality'] = max(1, min(100, int(settings['quality'])))
+    else:
+        settings.pop('quality', None)
+    settings['gif_frame'] = max(0, int(settings['gif_frame']))
+    # Copying and hard-linking produce the same bytes
+    settings['passthrough'] = settings['passthrough'] != 'off'
+    # Profile and overrides matter only through the save() options they resolve to
+    settings['encoder'] = encoder_options(
+        settings['output_format'], settings.pop('encoder_profile'), settings.pop('encoder_overrides')
+    )
+    return settings
+
+
+def settings_digest(output_format, **options):
+    """Return a stable hex digest of normalize_settings(output_format, **options)."""
+    text = json.dumps(normalize_settings(output_format, **options), sort_keys=True, default=str)
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+
+def job_digest(output_dir, output_format, **options):
+    """settings_digest plus the absolute output directory, for batch journals."""
+    text = f"{settings_digest(output_format, **options)}:{os.path.abspath(output_dir)}"
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+
+BatchResult = namedtuple(
+    'BatchResult', ['input_path', 'output_path', 'error', 'profile', 'passthrough'], defaults=(None, False)
+)
+
+
+# Options that only apply to single-size conversions
+_SINGLE_OUTPUT_OPTIONS = ('enable_resize', 'resize_width', 'resize_height', 'tiled', 'passthrough')
+
+
+def _convert_job(input_path, output_dir, output_format, options, profile=False):
+    """Convert one image for a batch, capturing any error as a message.
+
+    With a ``variants`` option, or a ``gif_frames`` spec for a GIF, the
+    result's output_path is a tuple of paths.
+    """
+    file_profile = ConversionProfile(input_path) if profile else None
+    options = dict(options)
+    variants = options.pop('variants', None)
+    gif_frames = options.pop('gif_frames', None)
+    try:
+        if gif_frames is not None and input_path.lower().endswith('.gif'):
+            for name in ('gif_frame', 'fast_decode', 'tiled', 'passthrough'):
+                options.pop(name, None)
+            output_path = tuple(convert_gif_frames(
+                input_path, output_dir, output_format, gif_frames, profile=file_profile, **options
+            ))
+        elif variants:
+            for name in _SINGLE_OUTPUT_OPTIONS:
+                options.pop(name, None)
+            output_path = tuple(convert_variants(
+                input_path, output_dir, variants, profile=file_profile, **options
+            ))
+        elif can_pass_through(input_path, output_format, **options):
+            output_path = build_output_path(input_path, output_dir, output_format.lower())
+            with _stage(file_profile, 'passthrough'):
+                pass_through(input_path, output_path, link=options.get('passthrough') == 'link')
+            return BatchResult(input_path, output_path, None, file_profile, True)
+        else:
+            options['passthrough'] = 'off'  # already ruled out
+            output_path = convert_single_image(
+                input_path, output_dir, output_format, profile=file_profile, **options
+            )
+    except Exception as e:
+        return BatchResult(input_path, None, str(e), file_profile)
+    return BatchResult(input_path, output_path, None, file_profile)
+
+
+def _convert_chunk(input_paths, output_dir, output_format, options, profile=False):
+    """Convert several images in one worker task; returns their BatchResults."""
+    return [_convert_job(path, output_dir, output_format, options, profile) for path in input_paths]
+
+
+# Files up to this size are grouped into chunks so they share one worker task
+SMALL_IMAGE_BYTES = 256 * 1024
+
+
+def _is_small_file(input_path):
+    try:
+        return os.stat(input_path).st_size <= SMALL_IMAGE_BYTES
+    except OSError:
+        return False
+
+
+def convert_batch(
+    input_paths,
+    output_dir,
+    output_format,
+    *,
+    workers=None,
+    max_pending=None,
+    chunk_size=None,
+    memory_budget=None,
+    cache=None,
+    journal=None,
+    profile=False,
+    **options,
+):
+    """Convert many images, yielding a BatchResult per file as each finishes.
+
+    ``options`` are the keyword settings of convert_single_image, or of
+    convert_variants when a ``variants`` list is given; a ``gif_frames`` spec
+    sends GIFs through convert_gif_frames. Work fans out
+    to a process pool of ``workers`` processes (default: CPU count); with a
+    single worker the images are converted in-process, in order. Errors are
+    reported in ``BatchResult.error`` instead of aborting the batch.
+
+    ``input_paths`` may be any iterable (e.g. iter_image_paths); it is consumed
+    lazily and at most ``max_pending`` (default: 2 per worker) tasks are
+    queued at once, so memory stays flat and results stream out while the
+    input is still being produced. Small files (up to SMALL_IMAGE_BYTES) are
+    sent to the workers ``chunk_size`` (default 32) at a time, so thumbnails
+    and icons do not pay a round trip to the pool each.
+
+    With a ``memory_budget`` in bytes, each file's footprint is estimated from
+    its header (estimate_decoded_bytes) and files are only queued while the
+    estimates of the queued files fit in the budget. Files that do not fit
+    wait while smaller ones behind them go ahead; a file larger than the
+    whole budget runs alone once everything else has finished.
+
+    With an image_cache.OutputCache as ``cache``, files whose source and
+    settings match a cached output are served from the cache without being
+    converted, and new outputs are added to it.
+
+    With an image_journal.BatchJournal as ``journal``, every finished file is
+    recorded, and files the journal already lists as converted with the same
+    settings into the same output directory (outputs still present) are
+    skipped, so a rerun of a crashed job only converts what is pending or
+    failed.
+
+    With ``profile`` each converted file's BatchResult carries a
+    ConversionProfile; aggregate them with summarize_profiles.
+    """
+    if options.get('variants') and options.get('gif_frames') is not None:
+        raise ValueError("variants and gif_frames cannot be combined")
+    if cache is not None and (options.get('variants') or options.get('gif_frames') is not None):
+        raise ValueError("The output cache does not support multi-output conversions")
+    if workers is None:
+        workers = os.cpu_count() or 1
+    workers = max(1, int(workers))
+    if max_pending is None:
+        max_pending = 2 * workers
+    max_pending = max(1, int(max_pending))
+    chunk_size = max(1, int(32 if chunk_size is None else chunk_size))
+
+    digest = job_digest(output_dir, output_format, **options) if journal is not None else None
+
+    def finish(result, key):
+        if key is not None and result.error is None:
+            cache.store(key, result.output_path)
+        if journal is not None:
+            journal.record(result, digest)
+        return result
+
+    pool = None
+    pending = {}  # future -> (cache keys, estimated bytes)
+    waiting = []  # [input paths, cache keys, estimated bytes, times passed over]
+    chunk = [[], [], 0, 0]  # small files collecting into one task
+
+    def fits(estimate):
+        if memory_budget is None:
+            return True
+        in_use = [queued for _, queued in pending.values()]
+        if estimate > memory_budget:
+            return not in_use  # oversized: alone
+        if any(queued > memory_budget for queued in in_use):
+            return False
+        return sum(in_use) + estimate <= memory_budget
+
+    def submit_waiting():
+        nonlocal pool
+        for item in list(waiting):
+            if len(pending) >= max_pending:
+                break
+            paths, keys, estimate, passed_over = item
+            if not fits(estimate):
+                # Oversized files, or files skipped too often, hold back the rest
+                if estimate > memory_budget or passed_over >= max_pending:
+                    break
+                item[3] += 1
+                continue
+            if pool is None:
+                pool = ProcessPoolExecutor(max_workers=workers)
+            future = pool.submit(_convert_chunk, paths, output_dir, output_format, options, profile)
+            pending[future] = (keys, estimate)
+            waiting.remove(item)
+
+    def collect():
+        done, _ = wait(pending, return_when=FIRST_COMPLETED)
+        for future in done:
+            keys = pending.pop(future)[0]
+            for result, key in zip(future.result(), keys):
+                yield finish(result, key)
+        submit_waiting()
+
+    def queue(item):
+        waiting.append(item)
+        submit_waiting()
+        while (waiting and len(pending) >= max_pending) or len(waiting) >= max_pending:
+            yield from collect()
+
+    try:
+        for input_path in input_paths:
+            if journal is not None:
+                output_path = journal.completed_output(input_path, digest)
+                if output_path is not None:
+                    yield BatchResult(input_path, output_path, None)
+                    continue
+
+            key = None
+            if cache is not None:
+                output_path = build_output_path(input_path, output_dir, output_format.lower())
+                try:
+                    key = cache.key_for(input_path, output_format, options)
+                except OSError:
+                    key = None  # unreadable source; the conversion reports the error
+                if key is not None and cache.fetch(key, output_path):
+                    yield finish(BatchResult(input_path, output_path, None), None)
+                    continue
+
+            if workers == 1:
+                result = _convert_job(input_path, output_dir, output_format, options, profile)
+                yield finish(result, key)
+                continue
+
+            estimate = 0
+            if memory_budget is not None:
+                estimate = estimate_decoded_bytes(input_path, output_format=output_format, **options)
+            if chunk_size > 1 and _is_small_file(input_path):
+                chunk[0].append(input_path)
+                chunk[1].append(key)
+                # A chunk's files run one after another, so its peak is the largest
+                chunk[2] = max(chunk[2], estimate)
+                if len(chunk[0]) >= chunk_size:
+                    yield from queue(chunk)
+                    chunk = [[], [], 0, 0]
+            else:
+                yield from queue([[input_path], [key], estimate, 0])
+
+        if chunk[0]:
+            yield from queue(chunk)
+        while pending:
+            yield from collect()
+    finally:
+        if pool is not None:
+            # Closing the generator early drops work that has not started yet
+            pool.shutdown(wait=True, cancel_futures=True)
+        if cache is not None:
+            cache.save()
 
 
 def config_to_yaml_text(settings, input_format='jpg'):
@@ -171,8 +1833,20 @@ def config_to_yaml_text(settings, input_format='jpg'):
         f"grayscale: {str(settings.get('grayscale', False)).lower()}",
         f"quality: {settings.get('quality', 85)}",
         f"gif_frame: {settings.get('gif_frame', 0)}",
-        "",
+        f"fast_decode: {str(settings.get('fast_decode', True)).lower()}",
+        f"tiled: {str(settings.get('tiled', True)).lower()}",
+        f"encoder_profile: {settings.get('encoder_profile', DEFAULT_ENCODER_PROFILE)}",
+        f"passthrough: {settings.get('passthrough', DEFAULT_PASSTHROUGH)}",
     ]
+    for key in ENCODER_OVERRIDE_KEYS:
+        if key in settings:
+            value = settings[key]
+            lines.append(f"{key}: {str(value).lower() if isinstance(value, bool) else value}")
+    if settings.get('variants'):
+        lines.append(f"variants: {format_variants(parse_variants(settings['variants']))}")
+    if settings.get('gif_frames') not in (None, ''):
+        lines.append(f"gif_frames: {settings['gif_frames']}")
+    lines.append("")
     return "\n".join(lines)
 
 
@@ -0,0 +1,126 @@
+"""Pipelined batch conversion that overlaps file reads and writes with CPU work.
+
+Reader threads prefetch source files into memory, worker processes decode,
+transform and encode from those buffers (convert_image_data), and writer
+threads store the encoded bytes. On slow network or FUSE mounts this keeps
+the CPUs busy while files are in transit.
+"""
+import os
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
+
+from image_ops import (
+    BatchResult,
+    ConversionProfile,
+    build_output_path,
+    convert_image_data,
+    pass_through,
+    write_file_atomic,
+)
+
+# Minimum files in flight; the default also keeps two per worker queued
+DEFAULT_IO_DEPTH = 8
+
+
+def _read_file(input_path):
+    with open(input_path, 'rb') as f:
+        return f.read()
+
+
+def _convert_data_job(input_path, data, output_format, options, profile=False):
+    """Worker: convert one file's bytes. Returns (encoded bytes, error, profile, passthrough)."""
+    file_profile = ConversionProfile(input_path) if profile else None
+    try:
+        encoded = convert_image_data(data, output_format, profile=file_profile, **options)
+    except Exception as e:
+        return None, str(e), file_profile, False
+    # convert_image_data hands back the source object itself when it needs no work
+    return encoded, None, file_profile, encoded is data
+
+
+def convert_pipelined(
+    input_paths,
+    output_dir,
+    output_format,
+    *,
+    io_depth=None,
+    workers=None,
+    readers=None,
+    writers=None,
+    profile=False,
+    **options,
+):
+    """Convert many images with reads, conversions and writes overlapping.
+
+    Yields a BatchResult per file as its output is written (in completion
+    order). At most ``io_depth`` files (default: the larger of
+    DEFAULT_IO_DEPTH and two per worker) are in the pipeline at once, whether
+    being read, converted or written, which bounds the memory held in file
+    buffers. ``workers`` processes convert (default: CPU count; with 1 a
+    single thread converts); ``readers`` and ``writers`` threads
+    (default: io_depth // 2, at least 1) do the I/O. ``options`` are the
+    keyword settings of convert_single_image; with ``passthrough='link'``
+    sources that need no changes are hard-linked rather than rewritten.
+    """
+    if options.get('variants') or options.get('gif_frames') is not None:
+        raise ValueError("Pipelined conversion does not support multi-output conversions")
+    workers = max(1, int(workers or os.cpu_count() or 1))
+    io_depth = max(1, int(io_depth or max(DEFAULT_IO_DEPTH, 2 * workers)))
+    readers = max(1, int(readers or io_depth // 2))
+    writers = max(1, int(writers or io_depth // 2))
+    output_format = output_format.lower()
+
+    read_pool = ThreadPoolExecutor(max_workers=readers, thread_name_prefix='image-read')
+    write_pool = ThreadPoolExecutor(max_workers=writers, thread_name_prefix='image-write')
+    if workers > 1:
+        cpu_pool = ProcessPoolExecutor(max_workers=workers)
+    else:
+        # Pillow releases the GIL while decoding and encoding
+        cpu_pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix='image-convert')
+    in_flight = {}  # future -> (stage, input path, output path, profile, passthrough)
+    input_paths = iter(input_paths)
+    exhausted = False
+
+    try:
+        while True:
+            while not exhausted and len(in_flight) < io_depth:
+                input_path = next(input_paths, None)
+                if input_path is None:
+                    exhausted = True
+                    break
+                in_flight[read_pool.submit(_read_file, input_path)] = ('read', input_path, None, None, False)
+            if not in_flight:
+                return
+
+            done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in done:
+                stage, input_path, output_path, file_profile, passthrough = in_flight.pop(future)
+                if stage == 'read':
+                    try:
+                        data = future.result()
+                    except OSError as e:
+                        yield BatchResult(input_path, None, str(e))
+                        continue
+                    job = cpu_pool.submit(_convert_data_job, input_path, data, output_format, options, profile)
+                    in_flight[job] = ('convert', input_path, None, None, False)
+                elif stage == 'convert':
+                    encoded, error, file_profile, passthrough = future.result()
+                    if error is not None:
+                        yield BatchResult(input_path, None, error, file_profile)
+                        continue
+                    output_path = build_output_path(input_path, output_dir, output_format)
+                    if passthrough and options.get('passthrough') == 'link':
+                        write = write_pool.submit(pass_through, input_path, output_path, True)
+                    else:
+                        write = write_pool.submit(write_file_atomic, output_path, encoded)
+                    in_flight[write] = ('write', input_path, output_path, file_profile, passthrough)
+                else:
+                    try:
+                        future.result()
+                    except OSError as e:
+                        yield BatchResult(input_path, None, str(e), file_profile)
+                        continue
+                    yield BatchResult(input_path, output_path, None, file_profile, passthrough)
+    finally:
+        # Closing the generator early drops work that has not started yet
+        for pool in (read_pool, cpu_pool, write_pool):
+            pool.shutdown(wait=True, cancel_futures=True)
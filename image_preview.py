@@ -0,0 +1,168 @@
+"""Background preview rendering for the GUI (no Tkinter)."""
+import functools
+import os
+import threading
+
+from PIL import Image
+
+from image_ops import apply_transforms, extract_gif_frame, probe_image, reduce_for_resize, resize_target_size
+
+PREVIEW_BOX = (400, 400)
+# Previews are rendered from a downscaled proxy of the source at most this big
+PROXY_SIZE = (1024, 1024)
+PROXY_CACHE_SIZE = 16
+
+
+class PreviewCancelled(Exception):
+    """Raised inside a render that a newer preview request has superseded."""
+
+
+def load_proxy(file_path, gif_frame=0, proxy_size=PROXY_SIZE):
+    """Return (proxy image, scale, GIF frame count or None) for file_path.
+
+    The proxy is the source (or selected GIF frame) decoded at reduced size
+    so it fits proxy_size; ``scale`` is proxy width / source width. Results
+    are cached by path, mtime, file size and frame, and must not be mutated.
+    """
+    stat = os.stat(file_path)
+    if not file_path.lower().endswith('.gif'):
+        gif_frame = 0
+    return _load_proxy_cached(file_path, stat.st_mtime_ns, stat.st_size, gif_frame, proxy_size)
+
+
+@functools.lru_cache(maxsize=PROXY_CACHE_SIZE)
+def _load_proxy_cached(file_path, mtime_ns, file_size, gif_frame, proxy_size):
+    with Image.open(file_path) as opened:
+        src_width = opened.width
+        if file_path.lower().endswith('.gif'):
+            # Memoized, so scrubbing through frames counts them once
+            frame_count = probe_image(file_path).n_frames
+            img = extract_gif_frame(opened, gif_frame)
+        else:
+            frame_count = None
+            img = reduce_for_resize(opened, resize_target_size(opened.size, *proxy_size))
+            if img is opened:
+                img = opened.copy()
+    img.thumbnail(proxy_size, Image.Resampling.LANCZOS)
+    return img, img.width / src_width, frame_count
+
+
+clear_proxy_cache = _load_proxy_cached.cache_clear
+
+
+def render_preview(
+    file_path,
+    *,
+    box=PREVIEW_BOX,
+    gif_frame=0,
+    is_cancelled=None,
+    enable_resize=False,
+    resize_width=800,
+    resize_height=600,
+    maintain_aspect=True,
+    **transform_options,
+):
+    """Return (display image, GIF frame count or None) for file_path.
+
+    Transforms run on the cached proxy with resize parameters scaled to
+    proxy space, and the result is sized to what the full-resolution output
+    would look like inside ``box``. ``is_cancelled`` is checked between stages
+    so a stale render stops early.
+    """
+    def checkpoint():
+        if is_cancelled is not None and is_cancelled():
+            raise PreviewCancelled()
+
+    proxy, scale, frame_count = load_proxy(file_path, gif_frame)
+    checkpoint()
+
+    # Proxy pixels per output pixel; a resize that fits the proxy yields true-size output
+    local_scale = scale
+    if enable_resize:
+        src_size = (round(proxy.width / scale), round(proxy.height / scale))
+        target = resize_target_size(src_size, resize_width, resize_height, maintain_aspect)
+        if target[0] <= proxy.width and target[1] <= proxy.height:
+            local_scale = 1.0
+        else:
+            resize_width = max(1, round(int(resize_width) * scale))
+            resize_height = max(1, round(int(resize_height) * scale))
+
+    img = apply_transforms(
+        proxy.copy(),
+        enable_resize=enable_resize,
+        resize_width=resize_width,
+        resize_height=resize_height,
+        maintain_aspect=maintain_aspect,
+        **transform_options,
+    )
+    checkpoint()
+
+    output_size = (round(img.width / local_scale), round(img.height / local_scale))
+    display_size = resize_target_size(output_size, *box)
+    if img.size != display_size:
+        img = img.resize(display_size, Image.Resampling.LANCZOS)
+    return img, frame_count
+
+
+class PreviewWorker:
+    """Render previews on one background thread, keeping only the newest request.
+
+    submit() replaces any request that has not started yet and marks a
+    running render as stale; stale results are dropped. The GUI calls poll()
+    from its event loop to pick up the newest finished result.
+    """
+
+    def __init__(self, render=render_preview):
+        self._render = render
+        self._cond = threading.Condition()
+        self._generation = 0
+        self._pending = None
+        self._result = None
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name="preview-worker", daemon=True)
+        self._thread.start()
+
+    def submit(self, *args, **kwargs):
+        """Queue a render of render(*args, **kwargs); returns its generation number."""
+        with self._cond:
+            self._generation += 1
+            self._pending = (self._generation, args, kwargs)
+            self._cond.notify()
+            return self._generation
+
+    def poll(self):
+        """Return and clear the newest (generation, value, error) result, or None."""
+        with self._cond:
+            result, self._result = self._result, None
+            return result
+
+    def close(self):
+        with self._cond:
+            self._closed = True
+            self._cond.notify()
+        self._thread.join()
+
+    def _is_stale(self, generation):
+        return generation != self._generation or self._closed
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while self._pending is None and not self._closed:
+                    self._cond.wait()
+                if self._closed:
+                    return
+                generation, args, kwargs = self._pending
+                self._pending = None
+
+            value = error = None
+            try:
+                value = self._render(*args, is_cancelled=lambda: self._is_stale(generation), **kwargs)
+            except PreviewCancelled:
+                continue
+            except Exception as e:
+                error = e
+
+            with self._cond:
+                if not self._is_stale(generation):
+                    self._result = (generation, value, error)
@@ -0,0 +1,320 @@
+"""Local HTTP conversion service backed by a warm worker pool (no Tkinter).
+
+POST an image to /convert and get the converted image back:
+
+    curl --data-binary @cat.jpg "http://127.0.0.1:8765/convert?format=webp&width=800&height=600" -o cat.webp
+
+Query parameters (defaults come from the config file): format, quality,
+width and height (enable the resize), keep_aspect, rotate, grayscale,
+gif_frame, encoder_profile. GET /stats reports cache and queue counters.
+
+Usage:
+    python image_service.py --port 8765 --config config.yaml -j 4
+"""
+import argparse
+import hashlib
+import json
+import os
+import sys
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future, ProcessPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+from PIL import Image
+
+from image_ops import convert_image_data, encoder_options, load_yaml, options_from_config, settings_digest
+
+DEFAULT_PORT = 8765
+DEFAULT_MAX_QUEUE = 64
+DEFAULT_CACHE_ENTRIES = 256
+DEFAULT_CACHE_BYTES = 64 * 1024 * 1024
+MAX_REQUEST_BYTES = 256 * 1024 * 1024
+# Seconds a request waits for its conversion before giving up with 504
+REQUEST_TIMEOUT = 300
+
+MEDIA_TYPES = {'jpg': 'image/jpeg', 'jpeg': 'image/jpeg', 'png': 'image/png', 'webp': 'image/webp'}
+
+# Settings that need a file on disk or produce several outputs
+_SERVICE_IGNORED_OPTIONS = ('variants', 'gif_frames', 'tiled', 'passthrough')
+
+
+class ServiceBusy(Exception):
+    """Raised when the conversion queue is full; the HTTP layer answers 429."""
+
+
+def _warm_up():
+    # Load every Pillow plugin now instead of on a worker's first request
+    Image.init()
+    return os.getpid()
+
+
+def _parse_bool(value):
+    value = value.strip().lower()
+    if value in ('1', 'true', 'yes', 'on'):
+        return True
+    if value in ('0', 'false', 'no', 'off'):
+        return False
+    raise ValueError(f"Expected a boolean, got {value!r}")
+
+
+def options_from_query(query, defaults):
+    """Return (output format, convert_image_data options) for a /convert query string.
+
+    ``defaults`` holds options_from_config options plus 'output_format'.
+    Raises ValueError for unknown parameters or bad values.
+    """
+    params = {key: values[-1] for key, values in parse_qs(query, keep_blank_values=True).items()}
+    options = {key: value for key, value in defaults.items() if key not in _SERVICE_IGNORED_OPTIONS}
+    output_format = params.pop('format', options.pop('output_format', 'png')).lower()
+    options.pop('output_format', None)
+    if output_format not in MEDIA_TYPES:
+        raise ValueError(f"Unsupported output format {output_format!r}")
+    if 'width' in params or 'height' in params:
+        options['enable_resize'] = True
+    for name, option, parse in (
+        ('quality', 'quality', int),
+        ('width', 'resize_width', int),
+        ('height', 'resize_height', int),
+        ('keep_aspect', 'maintain_aspect', _parse_bool),
+        ('rotate', 'rotate_degrees', int),
+        ('grayscale', 'grayscale', _parse_bool),
+        ('gif_frame', 'gif_frame', int),
+        ('encoder_profile', 'encoder_profile', str),
+    ):
+        if name in params:
+            options[option] = parse(params.pop(name))
+    if params:
+        raise ValueError(f"Unknown parameter(s): {', '.join(sorted(params))}")
+    encoder_options(output_format, options.get('encoder_profile'), options.get('encoder_overrides'))
+    return output_format, options
+
+
+class ConversionService:
+    """Convert in-memory images on a warm process pool, sharing work between callers.
+
+    Identical requests (same source bytes and settings) that arrive while
+    one is being converted wait for that conversion instead of starting
+    another, and recent results are kept in an LRU bounded by
+    ``cache_entries`` and ``cache_bytes``. At most ``max_queue`` distinct
+    conversions are in flight; beyond that submit() raises ServiceBusy.
+    Thread-safe; call close() when done.
+    """
+
+    def __init__(
+        self,
+        workers=None,
+        *,
+        max_queue=DEFAULT_MAX_QUEUE,
+        cache_entries=DEFAULT_CACHE_ENTRIES,
+        cache_bytes=DEFAULT_CACHE_BYTES,
+    ):
+        self.workers = max(1, int(workers or os.cpu_count() or 1))
+        self.max_queue = max(1, int(max_queue))
+        self.cache_entries = cache_entries
+        self.cache_bytes = cache_bytes
+        self.stats = {'hits': 0, 'misses': 0, 'coalesced': 0, 'rejected': 0, 'errors': 0}
+        self._lock = threading.Lock()
+        self._cache = OrderedDict()  # key -> encoded bytes, least recently used first
+        self._cached_bytes = 0
+        self._in_flight = {}  # key -> Future
+        self._pool = ProcessPoolExecutor(max_workers=self.workers)
+        # Start every worker up front so no request pays process startup
+        for future in [self._pool.submit(_warm_up) for _ in range(self.workers)]:
+            future.result()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def submit(self, data, output_format, **options):
+        """Return (Future of the encoded bytes, 'hit' | 'miss' | 'coalesced')."""
+        key = hashlib.sha256(data).hexdigest() + settings_digest(output_format, **options)
+        with self._lock:
+            cached = self._cache.get(key)
+            if cached is not None:
+                self._cache.move_to_end(key)
+                self.stats['hits'] += 1
+                return _done(cached), 'hit'
+            future = self._in_flight.get(key)
+            if future is not None:
+                self.stats['coalesced'] += 1
+                return future, 'coalesced'
+            if len(self._in_flight) >= self.max_queue:
+                self.stats['rejected'] += 1
+                raise ServiceBusy(f"{len(self._in_flight)} conversions already queued")
+            self.stats['misses'] += 1
+            future = self._pool.submit(convert_image_data, data, output_format, **options)
+            self._in_flight[key] = future
+        future.add_done_callback(lambda done: self._finish(key, done))
+        return future, 'miss'
+
+    def _finish(self, key, future):
+        with self._lock:
+            self._in_flight.pop(key, None)
+            if future.cancelled() or future.exception() is not None:
+                self.stats['errors'] += 1
+                return
+            result = future.result()
+            if len(result) > self.cache_bytes or not self.cache_entries:
+                return
+            self._cache[key] = result
+            self._cached_bytes += len(result)
+            while len(self._cache) > self.cache_entries or self._cached_bytes > self.cache_bytes:
+                _, evicted = self._cache.popitem(last=False)
+                self._cached_bytes -= len(evicted)
+
+    def snapshot(self):
+        """Counters plus current queue and cache sizes."""
+        with self._lock:
+            return dict(
+                self.stats,
+                in_flight=len(self._in_flight),
+                max_queue=self.max_queue,
+                cached=len(self._cache),
+                cached_bytes=self._cached_bytes,
+                workers=self.workers,
+            )
+
+    def close(self):
+        self._pool.shutdown(wait=True, cancel_futures=True)
+
+
+def _done(value):
+    future = Future()
+    future.set_result(value)
+    return future
+
+
+class ConversionHandler(BaseHTTPRequestHandler):
+    """HTTP front end; the server carries ``service`` and ``defaults`` attributes."""
+
+    protocol_version = 'HTTP/1.1'
+
+    def _send(self, status, body, content_type='application/json', headers=()):
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        for name, value in headers:
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _send_error(self, status, message, headers=()):
+        self._send(status, json.dumps({'error': message}).encode(), headers=headers)
+
+    def do_GET(self):
+        if urlsplit(self.path).path != '/stats':
+            self._send_error(404, "Not found")
+            return
+        self._send(200, json.dumps(self.server.service.snapshot()).encode())
+
+    def do_POST(self):
+        url = urlsplit(self.path)
+        if url.path != '/convert':
+            self._send_error(404, "Not found")
+            return
+        try:
+            length = int(self.headers.get('Content-Length', ''))
+        except ValueError:
+            self._send_error(411, "Content-Length required")
+            return
+        if length < 0:
+            # read(-1) would wait for the client to close the connection
+            self.close_connection = True
+            self._send_error(400, "Invalid Content-Length")
+            return
+        if length > MAX_REQUEST_BYTES:
+            self.close_connection = True
+            self._send_error(413, f"Request body over {MAX_REQUEST_BYTES} bytes")
+            return
+        data = self.rfile.read(length)
+        try:
+            output_format, options = options_from_query(url.query, self.server.defaults)
+        except ValueError as e:
+            self._send_error(400, str(e))
+            return
+
+        try:
+            future, source = self.server.service.submit(data, output_format, **options)
+        except ServiceBusy as e:
+            self._send_error(429, str(e), headers=[('Retry-After', '1')])
+            return
+        try:
+            result = future.result(timeout=REQUEST_TIMEOUT)
+        except TimeoutError:
+            self._send_error(504, "Conversion timed out")
+            return
+        except Exception as e:
+            # Unreadable or unsupported image
+            self._send_error(422, str(e) or type(e).__name__)
+            return
+        self._send(200, result, MEDIA_TYPES[output_format], headers=[('X-Cache', source)])
+
+    def log_message(self, format, *args):
+        if not self.server.quiet:
+            super().log_message(format, *args)
+
+
+def make_server(
+    host='127.0.0.1', port=DEFAULT_PORT, *, service=None, defaults=None, quiet=False, **service_options
+):
+    """Return a ThreadingHTTPServer for ConversionHandler (port 0 picks a free port).
+
+    ``defaults`` are the options requests start from (options_from_config
+    plus 'output_format'); a ConversionService is created from
+    ``service_options`` unless one is passed. Run it with serve_forever().
+    """
+    server = ThreadingHTTPServer((host, port), ConversionHandler)
+    server.daemon_threads = True
+    server.service = service if service is not None else ConversionService(**service_options)
+    server.defaults = dict(defaults or {})
+    server.quiet = quiet
+    return server
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve image conversions over HTTP on this machine.")
+    parser.add_argument('--host', default='127.0.0.1', help="address to listen on (default: 127.0.0.1)")
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT, help=f"port (default: {DEFAULT_PORT})")
+    parser.add_argument('-c', '--config', default='config.yaml', help="default settings (default: config.yaml)")
+    parser.add_argument('-j', '--workers', type=int, default=None, help="worker processes (default: CPU count)")
+    parser.add_argument(
+        '--max-queue', type=int, default=DEFAULT_MAX_QUEUE,
+        help=f"conversions in flight before new ones get 429 (default: {DEFAULT_MAX_QUEUE})",
+    )
+    parser.add_argument(
+        '--cache-entries', type=int, default=DEFAULT_CACHE_ENTRIES, help="recent results kept in memory"
+    )
+    parser.add_argument('--quiet', action='store_true', help="do not log requests")
+    args = parser.parse_args(argv)
+
+    config = load_yaml(args.config) if os.path.isfile(args.config) else {}
+    defaults = options_from_config(config)
+    defaults['output_format'] = config.get('output_format', 'png')
+    server = make_server(
+        args.host,
+        args.port,
+        defaults=defaults,
+        quiet=args.quiet,
+        workers=args.workers,
+        max_queue=args.max_queue,
+        cache_entries=args.cache_entries,
+    )
+    host, port = server.server_address[:2]
+    print(f"Serving conversions on http://{host}:{port}/convert (Ctrl-C to stop)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        server.service.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,368 @@
+"""Strip-wise conversion of very large PNGs with memory bounded by strip size.
+
+PNG sources are decoded a strip of rows at a time: each strip's filtered
+scanlines are wrapped in a small in-memory PNG (preceded by the previous,
+already decoded row, which the PNG filters refer to) and handed to Pillow.
+Grayscale runs per strip, resizing keeps a few rows of overlap so the
+Lanczos filter sees the same neighbours as a whole-image resize, and PNG
+outputs are written by a streaming encoder. Other outputs are assembled at
+their final size only. Anything else falls back to convert_single_image.
+"""
+import io
+import math
+import os
+import struct
+import zlib
+from collections import namedtuple
+
+from PIL import Image
+
+from image_ops import (
+    _stage,
+    _temp_output_path,
+    apply_transforms,
+    build_output_path,
+    encoder_options,
+    image_nbytes,
+    resize_target_size,
+    save_image,
+)
+
+PNG_SIGNATURE = b'\x89PNG\r\n\x1a\n'
+
+# Only sources at least this large are converted strip-wise
+TILED_MIN_PIXELS = 32 * 1024 * 1024
+DEFAULT_STRIP_ROWS = 256
+
+# 8-bit, non-palette PNG colour types -> (Pillow mode, bytes per pixel)
+_COLOR_TYPES = {0: ('L', 1), 2: ('RGB', 3), 4: ('LA', 2), 6: ('RGBA', 4)}
+_MODE_COLOR_TYPES = {mode: color_type for color_type, (mode, _) in _COLOR_TYPES.items()}
+
+# Lanczos kernel radius in source pixels at scale 1 (Pillow's filter support)
+_LANCZOS_SUPPORT = 3.0
+
+PngHeader = namedtuple('PngHeader', ['width', 'height', 'bit_depth', 'color_type', 'interlace', 'chunks'])
+
+
+def _iter_chunks(f):
+    """Yield (type, data) for each chunk of an open PNG file after the signature."""
+    while True:
+        head = f.read(8)
+        if len(head) < 8:
+            return
+        length, chunk_type = struct.unpack('>I4s', head)
+        data = f.read(length)
+        f.read(4)  # CRC
+        yield chunk_type, data
+        if chunk_type == b'IEND':
+            return
+
+
+def _chunk(chunk_type, data):
+    return (
+        struct.pack('>I', len(data)) + chunk_type + data
+        + struct.pack('>I', zlib.crc32(chunk_type + data) & 0xffffffff)
+    )
+
+
+def read_png_header(file_path):
+    """Return the PngHeader of a PNG file, or None if it is not a PNG.
+
+    ``chunks`` holds the (type, data) pairs that precede the image data.
+    """
+    with open(file_path, 'rb') as f:
+        if f.read(8) != PNG_SIGNATURE:
+            return None
+        chunks = []
+        header = None
+        for chunk_type, data in _iter_chunks(f):
+            if chunk_type == b'IHDR':
+                header = struct.unpack('>IIBBBBB', data)
+            elif chunk_type == b'IDAT':
+                break
+            else:
+                chunks.append((chunk_type, data))
+    if header is None:
+        return None
+    width, height, bit_depth, color_type, _, _, interlace = header
+    return PngHeader(width, height, bit_depth, color_type, interlace, tuple(chunks))
+
+
+def _strip_supported(header):
+    if header is None or header.bit_depth != 8 or header.interlace:
+        return False
+    if header.color_type not in _COLOR_TYPES:
+        return False
+    # Colour-key transparency would need per-strip handling; leave it to Pillow
+    return not any(chunk_type == b'tRNS' for chunk_type, _ in header.chunks)
+
+
+def iter_png_strips(file_path, strip_rows=DEFAULT_STRIP_ROWS):
+    """Decode an 8-bit non-interlaced PNG, yielding images of up to strip_rows rows."""
+    header = read_png_header(file_path)
+    if not _strip_supported(header):
+        raise ValueError(f"Cannot decode {file_path} in strips")
+    mode, channels = _COLOR_TYPES[header.color_type]
+    row_bytes = header.width * channels + 1  # filter byte + pixels
+    strip_rows = max(1, int(strip_rows))
+
+    decompressor = zlib.decompressobj()
+    filtered = bytearray()
+    previous_row = None
+    y = 0
+
+    def decode(rows):
+        nonlocal previous_row
+        data = bytes(filtered[:rows * row_bytes])
+        del filtered[:rows * row_bytes]
+        height = rows
+        if previous_row is not None:
+            # The previous row, unfiltered, lets Up/Average/Paeth rows decode
+            data = b'\x00' + previous_row + data
+            height += 1
+        ihdr = struct.pack('>IIBBBBB', header.width, height, 8, header.color_type, 0, 0, 0)
+        png = PNG_SIGNATURE + _chunk(b'IHDR', ihdr) + _chunk(b'IDAT', zlib.compress(data, 0)) + _chunk(b'IEND', b'')
+        with Image.open(io.BytesIO(png)) as mini:
+            mini.load()
+            strip = mini.crop((0, height - rows, header.width, height)) if previous_row is not None else mini.copy()
+        previous_row = strip.crop((0, rows - 1, header.width, rows)).tobytes()
+        return strip
+
+    strip_bytes = strip_rows * row_bytes
+    with open(file_path, 'rb') as f:
+        f.read(8)
+        for chunk_type, data in _iter_chunks(f):
+            if chunk_type != b'IDAT':
+                continue
+            # Inflate at most a strip at a time: a small chunk can expand hugely
+            while data:
+                filtered += decompressor.decompress(data, strip_bytes)
+                data = decompressor.unconsumed_tail
+                while len(filtered) >= strip_bytes and y + strip_rows <= header.height:
+                    yield y, decode(strip_rows)
+                    y += strip_rows
+    filtered += decompressor.flush()
+    while y < header.height:
+        rows = min(strip_rows, header.height - y)
+        if len(filtered) < rows * row_bytes:
+            raise ValueError(f"Truncated PNG data in {file_path}")
+        yield y, decode(rows)
+        y += rows
+
+
+class PngStripWriter:
+    """Write a PNG one strip at a time.
+
+    Each strip is filtered by Pillow (with the previous row prepended, so its
+    first row is filtered against the real image above it) and the filtered
+    rows are compressed into a single zlib stream.
+    """
+
+    def __init__(self, output_path, size, mode, compress_level=6, chunks=()):
+        if mode not in _MODE_COLOR_TYPES:
+            raise ValueError(f"Cannot stream PNG mode {mode}")
+        self.size = size
+        self.mode = mode
+        self.rows_written = 0
+        self._previous_row = None
+        self._compressor = zlib.compressobj(compress_level)
+        self._file = open(output_path, 'wb')
+        ihdr = struct.pack('>IIBBBBB', size[0], size[1], 8, _MODE_COLOR_TYPES[mode], 0, 0, 0)
+        self._file.write(PNG_SIGNATURE + _chunk(b'IHDR', ihdr))
+        for chunk_type, data in chunks:
+            self._file.write(_chunk(chunk_type, data))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, *exc_info):
+        if exc_type is None:
+            self.close()
+        else:
+            self._file.close()
+
+    def write(self, strip):
+        """Append strip (same mode and width as the image) below the rows written so far."""
+        rows = strip.height
+        if self._previous_row is not None:
+            padded = Image.new(self.mode, (self.size[0], rows + 1))
+            padded.paste(self._previous_row, (0, 0))
+            padded.paste(strip, (0, 1))
+        else:
+            padded = strip
+        buffer = io.BytesIO()
+        padded.save(buffer, format='PNG', compress_level=0)
+        buffer.seek(8)
+        filtered = zlib.decompress(b''.join(data for chunk_type, data in _iter_chunks(buffer) if chunk_type == b'IDAT'))
+        row_bytes = len(filtered) // padded.height
+        filtered = filtered[(padded.height - rows) * row_bytes:]
+        self._write_idat(self._compressor.compress(filtered))
+        self._previous_row = strip.crop((0, rows - 1, strip.width, rows))
+        self.rows_written += rows
+
+    def _write_idat(self, data):
+        if data:
+            self._file.write(_chunk(b'IDAT', data))
+
+    def close(self):
+        if self._file.closed:
+            return
+        if self.rows_written != self.size[1]:
+            self._file.close()
+            raise ValueError(f"Wrote {self.rows_written} of {self.size[1]} rows")
+        self._write_idat(self._compressor.flush())
+        self._file.write(_chunk(b'IEND', b''))
+        self._file.close()
+
+
+def _stack(top, bottom):
+    if top is None:
+        return bottom
+    stacked = Image.new(bottom.mode, (bottom.width, top.height + bottom.height))
+    stacked.paste(top, (0, 0))
+    stacked.paste(bottom, (0, top.height))
+    return stacked
+
+
+def _reduce_strips(strips, factor):
+    """Image.reduce(factor) over a stream of strips (row groups kept whole)."""
+    pending = None
+    for strip in strips:
+        pending = _stack(pending, strip)
+        rows = pending.height - pending.height % factor
+        if rows:
+            yield pending.crop((0, 0, pending.width, rows)).reduce(factor)
+            pending = pending.crop((0, rows, pending.width, pending.height)) if rows < pending.height else None
+    if pending is not None:
+        yield pending.reduce(factor)
+
+
+def iter_resized_strips(strips, src_size, target_size, out_rows=64, reducing_gap=2.0, fast_decode=True):
+    """Resize a stream of strips covering src_size to target_size with Lanczos.
+
+    Mirrors convert_single_image: with ``fast_decode`` an integer reduce while
+    the image stays ``reducing_gap`` times larger than the target, then
+    Lanczos; without it, Lanczos from the full-size rows. Each output strip is
+    resampled from the rows its filter reaches, so it matches a whole-image
+    resize to within one level of rounding.
+    """
+    factor = int(min(
+        src_size[0] / (target_size[0] * reducing_gap),
+        src_size[1] / (target_size[1] * reducing_gap),
+    ))
+    if fast_decode and factor >= 2:
+        strips = _reduce_strips(strips, factor)
+        src_size = (math.ceil(src_size[0] / factor), math.ceil(src_size[1] / factor))
+    scale = src_size[1] / target_size[1]
+    margin = _LANCZOS_SUPPORT * max(scale, 1.0) + 1
+
+    buffer = None
+    buffer_top = 0  # source row of buffer's first row
+    out_y = 0
+    strips = iter(strips)
+    exhausted = False
+    while out_y < target_size[1]:
+        out_end = min(out_y + out_rows, target_size[1])
+        need_top = max(0, int(out_y * scale - margin))
+        need_bottom = min(src_size[1], math.ceil(out_end * scale + margin))
+        while not exhausted and (buffer is None or buffer_top + buffer.height < need_bottom):
+            strip = next(strips, None)
+            if strip is None:
+                exhausted = True
+            else:
+                buffer = _stack(buffer, strip)
+        if buffer_top < need_top:
+            buffer = buffer.crop((0, need_top - buffer_top, buffer.width, buffer.height))
+            buffer_top = need_top
+        box = (0, out_y * scale - buffer_top, src_size[0], out_end * scale - buffer_top)
+        yield buffer.resize((target_size[0], out_end - out_y), Image.Resampling.LANCZOS, box=box)
+        out_y = out_end
+
+
+def should_convert_tiled(input_path, *, min_pixels=None, rotate_degrees=0, **_options):
+    """Return True if input_path is large (default: TILED_MIN_PIXELS) and simple enough for convert_tiled."""
+    if min_pixels is None:
+        min_pixels = TILED_MIN_PIXELS
+    if not input_path.lower().endswith('.png') or int(rotate_degrees) % 360:
+        return False
+    try:
+        header = read_png_header(input_path)
+    except OSError:
+        return False
+    return _strip_supported(header) and header.width * header.height >= min_pixels
+
+
+def convert_tiled(
+    input_path,
+    output_dir,
+    output_format,
+    *,
+    enable_resize=False,
+    resize_width=800,
+    resize_height=600,
+    maintain_aspect=True,
+    grayscale=False,
+    quality=85,
+    encoder_profile=None,
+    encoder_overrides=None,
+    strip_rows=DEFAULT_STRIP_ROWS,
+    fast_decode=True,
+    profile=None,
+):
+    """Convert a large PNG strip by strip. Returns the output path.
+
+    Supports grayscale, resize and format conversion (see should_convert_tiled).
+    PNG outputs are streamed; JPEG/WEBP outputs are assembled at their final
+    size, which is the only full-size buffer. With ``fast_decode`` False the
+    resize skips the integer reduce, like convert_single_image's full decode.
+    """
+    header = read_png_header(input_path)
+    src_size = (header.width, header.height)
+    mode = 'L' if grayscale else _COLOR_TYPES[header.color_type][0]
+    target = resize_target_size(src_size, resize_width, resize_height, maintain_aspect) if enable_resize else src_size
+    output_format = output_format.lower()
+    output_path = build_output_path(input_path, output_dir, output_format)
+
+    with _stage(profile, 'tiled') as stage:
+        strips = (strip for _, strip in iter_png_strips(input_path, strip_rows))
+        if grayscale:
+            strips = (apply_transforms(strip, grayscale=True) for strip in strips)
+        if target != src_size:
+            strips = iter_resized_strips(strips, src_size, target, fast_decode=fast_decode)
+
+        if output_format == 'png':
+            options = encoder_options('png', encoder_profile, encoder_overrides)
+            level = 9 if options.get('optimize') else options.get('compress_level', 6)
+            # Keep the colour profile unless the colour model changed
+            chunks = [c for c in header.chunks if c[0] == b'iCCP'] if not grayscale else []
+            # The source is still being read (it may be the output path itself),
+            # so write beside it and rename once complete
+            tmp_path = _temp_output_path(output_path)
+            try:
+                with PngStripWriter(tmp_path, target, mode, level, chunks) as writer:
+                    for strip in strips:
+                        stage.track(strip)
+                        writer.write(strip)
+                os.replace(tmp_path, output_path)
+            finally:
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+            return output_path
+
+        canvas = Image.new(mode, target)
+        y = 0
+        for strip in strips:
+            stage.track(canvas, strip)
+            canvas.paste(strip, (0, y))
+            y += strip.height
+        stage.track_bytes(image_nbytes(canvas))
+    with _stage(profile, 'encode') as stage:
+        stage.track(canvas)
+        return save_image(
+            canvas,
+            output_path,
+            output_format,
+            quality=quality,
+            encoder_profile=encoder_profile,
+            encoder_overrides=encoder_overrides,
+        )
@@ -0,0 +1,245 @@
+"""Watch-folder mode: convert images as they land in ingest directories.
+
+Works by polling, so it behaves the same on local disks and network mounts.
+Each tick stats the known directories and lists only those whose mtime
+changed; new files are converted once their size and mtime stop changing.
+A periodic full rescan catches what directory mtimes miss (files rewritten
+in place, filesystems that do not update directory mtimes).
+"""
+import os
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
+
+from image_ops import SUPPORTED_INPUT_EXTENSIONS, _convert_job, job_digest
+
+DEFAULT_POLL_INTERVAL = 0.5
+DEFAULT_SETTLE_SECONDS = 1.0
+DEFAULT_RESCAN_INTERVAL = 300.0
+
+
+def _signature(stat):
+    return stat.st_size, stat.st_mtime_ns
+
+
+class FolderWatcher:
+    """Track image files under some directories and report the ones ready to convert.
+
+    poll() returns paths that are new or changed since they were last
+    reported and have kept the same size and mtime for ``settle_seconds``
+    (so files still being copied in are left alone). Files present when
+    the watcher starts are reported too. Paths under ``exclude`` (e.g. the
+    output directory) and hidden files are ignored.
+    """
+
+    def __init__(
+        self,
+        directories,
+        *,
+        recursive=True,
+        settle_seconds=DEFAULT_SETTLE_SECONDS,
+        rescan_interval=DEFAULT_RESCAN_INTERVAL,
+        extensions=SUPPORTED_INPUT_EXTENSIONS,
+        exclude=(),
+    ):
+        self.roots = [os.path.abspath(directory) for directory in directories]
+        self.recursive = recursive
+        self.settle_seconds = settle_seconds
+        self.rescan_interval = rescan_interval
+        self.extensions = extensions
+        self.exclude = tuple(os.path.abspath(path) for path in exclude)
+        self.listings = 0  # directory listings done, for diagnostics
+        self._dir_mtimes = {}  # directory -> mtime_ns when it was last listed
+        self._files = {}  # directory -> {path: signature} seen in its last listing
+        self._reported = {}  # path -> signature when it was returned by poll()
+        self._pending = {}  # path -> (signature, time it was last seen changing)
+        self._last_rescan = None
+
+    def _excluded(self, path):
+        return any(path == root or path.startswith(root + os.sep) for root in self.exclude)
+
+    def _list(self, directory, now):
+        """List one directory, queueing new/changed files; returns its subdirectories."""
+        try:
+            mtime = os.stat(directory).st_mtime_ns
+            with os.scandir(directory) as entries:
+                entries = list(entries)
+        except OSError:
+            self._forget(directory)
+            return []
+        self.listings += 1
+        self._dir_mtimes[directory] = mtime
+        subdirectories = []
+        files = {}
+        for entry in entries:
+            if entry.name.startswith('.') or self._excluded(entry.path):
+                continue
+            try:
+                if entry.is_dir(follow_symlinks=False):
+                    if self.recursive:
+                        subdirectories.append(entry.path)
+                elif entry.name.lower().endswith(self.extensions) and entry.is_file():
+                    files[entry.path] = _signature(entry.stat())
+            except OSError:
+                continue
+        for path in self._files.get(directory, {}).keys() - files.keys():
+            self._reported.pop(path, None)
+            self._pending.pop(path, None)
+        self._files[directory] = files
+        for path, signature in files.items():
+            if self._reported.get(path) != signature and path not in self._pending:
+                self._pending[path] = (signature, now)
+        return subdirectories
+
+    def _forget(self, directory):
+        prefix = directory + os.sep
+        for known in [d for d in self._dir_mtimes if d == directory or d.startswith(prefix)]:
+            del self._dir_mtimes[known]
+            for path in self._files.pop(known, {}):
+                self._reported.pop(path, None)
+                self._pending.pop(path, None)
+
+    def _scan(self, directories, now, full=False):
+        stack = list(directories)
+        while stack:
+            directory = stack.pop()
+            for subdirectory in self._list(directory, now):
+                # New subdirectories are listed right away; known ones when they change
+                if full or subdirectory not in self._dir_mtimes:
+                    stack.append(subdirectory)
+
+    def _changed_directories(self):
+        changed = []
+        for directory in list(self._dir_mtimes):
+            try:
+                mtime = os.stat(directory).st_mtime_ns
+            except OSError:
+                self._forget(directory)
+                continue
+            if mtime != self._dir_mtimes[directory]:
+                changed.append(directory)
+        return changed
+
+    def poll(self, now=None):
+        """Scan what changed and return the paths that are ready to convert."""
+        now = time.monotonic() if now is None else now
+        if self._last_rescan is None or now - self._last_rescan >= self.rescan_interval:
+            self._last_rescan = now
+            self._scan([root for root in self.roots if os.path.isdir(root)], now, full=True)
+        else:
+            self._scan(self._changed_directories(), now)
+
+        ready = []
+        for path, (signature, changed_at) in list(self._pending.items()):
+            try:
+                current = _signature(os.stat(path))
+            except OSError:
+                del self._pending[path]
+                continue
+            if current != signature:
+                self._pending[path] = (current, now)
+            elif now - changed_at >= self.settle_seconds:
+                del self._pending[path]
+                self._reported[path] = signature
+                ready.append(path)
+        return sorted(ready)
+
+
+def check_watch_output_dir(directories, output_dir):
+    """Raise ValueError if output_dir is, or contains, one of the watched directories.
+
+    The watcher ignores everything under the output directory, so such a
+    setup would never convert anything.
+    """
+    output_dir = os.path.realpath(output_dir)
+    for directory in directories:
+        directory = os.path.realpath(directory)
+        if directory == output_dir or directory.startswith(output_dir.rstrip(os.sep) + os.sep):
+            raise ValueError(
+                f"The output directory {output_dir} contains the watched directory {directory}; "
+                "choose an output directory outside it"
+            )
+
+
+def watch_and_convert(
+    directories,
+    output_dir,
+    output_format,
+    *,
+    workers=None,
+    poll_interval=DEFAULT_POLL_INTERVAL,
+    settle_seconds=DEFAULT_SETTLE_SECONDS,
+    rescan_interval=DEFAULT_RESCAN_INTERVAL,
+    recursive=True,
+    journal=None,
+    stop=None,
+    profile=False,
+    **options,
+):
+    """Watch directories and yield a BatchResult for each image converted from them.
+
+    Runs until ``stop`` (a threading.Event or anything with is_set()) is set
+    or the generator is closed. Ready files (see FolderWatcher) are converted
+    like convert_batch converts them, on ``workers`` processes (default: CPU
+    count; with 1 a single thread converts). Polling continues while
+    conversions run, so a new file waits at most about ``poll_interval`` plus
+    ``settle_seconds`` before it starts. With an image_journal.BatchJournal
+    as ``journal``, files already converted with the same settings and not
+    modified since are skipped, so restarting the watcher does not redo
+    earlier work. Raises ValueError (see check_watch_output_dir) if the
+    output directory contains a watched directory.
+    """
+    check_watch_output_dir(directories, output_dir)
+    workers = max(1, int(workers or os.cpu_count() or 1))
+    watcher = FolderWatcher(
+        directories,
+        recursive=recursive,
+        settle_seconds=settle_seconds,
+        rescan_interval=rescan_interval,
+        exclude=[output_dir],
+    )
+    digest = job_digest(output_dir, output_format, **options) if journal is not None else None
+
+    def journal_digest(input_path):
+        # Settings plus the source's size and mtime, so edited sources convert again
+        try:
+            size, mtime_ns = _signature(os.stat(input_path))
+        except OSError:
+            return digest
+        return f"{digest}-{size}-{mtime_ns}"
+
+    if workers > 1:
+        pool = ProcessPoolExecutor(max_workers=workers)
+    else:
+        pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix='image-watch')
+    queued = deque()  # (input path, journal digest)
+    keys = {}  # future -> journal digest
+    next_poll = 0.0
+    try:
+        while stop is None or not stop.is_set():
+            now = time.monotonic()
+            if now >= next_poll:
+                next_poll = now + poll_interval
+                for input_path in watcher.poll(now):
+                    key = journal_digest(input_path) if journal is not None else None
+                    if journal is not None and journal.completed_output(input_path, key) is not None:
+                        continue
+                    queued.append((input_path, key))
+            while queued and len(keys) < 2 * workers:
+                input_path, key = queued.popleft()
+                job = pool.submit(_convert_job, input_path, output_dir, output_format, options, profile)
+                keys[job] = key
+
+            timeout = max(0.0, next_poll - time.monotonic())
+            if not keys:
+                time.sleep(timeout)
+                continue
+            done, _ = wait(keys, timeout=timeout, return_when=FIRST_COMPLETED)
+            for future in done:
+                key = keys.pop(future)
+                result = future.result()
+                if journal is not None:
+                    journal.record(result, key)
+                yield result
+    finally:
+        pool.shutdown(wait=True, cancel_futures=True)
@@ -0,0 +1,131 @@
+"""Tests for parallel batch conversion."""
+import os
+
+import pytest
+from PIL import Image
+
+import image_tiles
+from image_ops import convert_batch, estimate_decoded_bytes, parse_byte_size
+
+
+def _make_pngs(directory, count):
+    paths = []
+    for i in range(count):
+        path = directory / f"img{i}.png"
+        Image.new("RGB", (30 + i, 20), color=(i * 10, 0, 0)).save(path)
+        paths.append(str(path))
+    return paths
+
+
+def test_convert_batch_in_process(tmp_img_dir):
+    paths = _make_pngs(tmp_img_dir["input"], 3)
+    out_dir = str(tmp_img_dir["output"])
+    results = list(convert_batch(paths, out_dir, "jpg", workers=1))
+    # Single worker keeps input order
+    assert [r.input_path for r in results] == paths
+    assert all(r.error is None for r in results)
+    assert all(os.path.isfile(r.output_path) for r in results)
+
+
+def test_convert_batch_process_pool(tmp_img_dir):
+    paths = _make_pngs(tmp_img_dir["input"], 6)
+    out_dir = str(tmp_img_dir["output"])
+    results = list(
+        convert_batch(
+            paths,
+            out_dir,
+            "png",
+            workers=2,
+            enable_resize=True,
+            resize_width=10,
+            resize_height=10,
+        )
+    )
+    assert sorted(r.input_path for r in results) == sorted(paths)
+    for result in results:
+        assert result.error is None
+        with Image.open(result.output_path) as img:
+            assert max(img.size) == 10
+
+
+def test_convert_batch_reports_errors(rgb_png, tmp_img_dir):
+    out_dir = str(tmp_img_dir["output"])
+    missing = str(tmp_img_dir["input"] / "missing.png")
+    results = {r.input_path: r for r in convert_batch([rgb_png, missing], out_dir, "png", workers=2)}
+    assert results[rgb_png].error is None
+    assert results[missing].output_path is None
+    assert results[missing].error
+
+
+def test_convert_batch_empty():
+    assert list(convert_batch([], "/nonexistent", "png")) == []
+
+
+def test_estimate_decoded_bytes_from_header(tmp_img_dir, multi_frame_gif):
+    png = tmp_img_dir["input"] / "big.png"
+    Image.new("RGB", (400, 300)).save(png)
+    # Decoded source plus a working copy at 32 bits per pixel
+    assert estimate_decoded_bytes(str(png)) == 400 * 300 * 4 * 2
+    resized = estimate_decoded_bytes(str(png), enable_resize=True, resize_width=40, resize_height=40)
+    assert resized == 400 * 300 * 4 * 2 + 40 * 30 * 4
+
+    jpeg = tmp_img_dir["input"] / "big.jpg"
+    Image.new("RGB", (800, 800)).save(jpeg)
+    drafted = estimate_decoded_bytes(str(jpeg), enable_resize=True, resize_width=50, resize_height=50)
+    full = estimate_decoded_bytes(
+        str(jpeg), enable_resize=True, resize_width=50, resize_height=50, fast_decode=False
+    )
+    assert drafted < full / 4
+
+    assert estimate_decoded_bytes(multi_frame_gif) == 40 * 40 * 4 * 3
+    assert estimate_decoded_bytes(str(tmp_img_dir["input"] / "missing.png")) == 0
+
+
+def test_estimate_decoded_bytes_tiled(tmp_img_dir, monkeypatch):
+    monkeypatch.setattr(image_tiles, "TILED_MIN_PIXELS", 1000)
+    png = tmp_img_dir["input"] / "big.png"
+    Image.new("RGB", (400, 1000)).save(png)
+    whole = 400 * 1000 * 4 * 2
+    assert estimate_decoded_bytes(str(png), tiled=False) == whole
+    # A few strips of rows; a PNG output is streamed, others are assembled once
+    strips = estimate_decoded_bytes(str(png), output_format="png")
+    assert 0 < strips <= 400 * 256 * 4 * 8
+    assert estimate_decoded_bytes(str(png), output_format="jpg") == strips + 400 * 1000 * 4 * 2
+    resized = estimate_decoded_bytes(
+        str(png), output_format="jpg", enable_resize=True, resize_width=40, resize_height=100
+    )
+    assert resized == strips + 40 * 100 * 4 * 2
+    # Rotation is not done strip-wise
+    assert estimate_decoded_bytes(str(png), output_format="png", rotate_degrees=90) == whole
+
+
+def test_convert_batch_memory_budget(tmp_img_dir):
+    paths = _make_pngs(tmp_img_dir["input"], 5)
+    big = tmp_img_dir["input"] / "huge.png"
+    Image.new("RGB", (300, 300)).save(big)
+    paths.insert(2, str(big))
+    out_dir = str(tmp_img_dir["output"])
+    # Small files fit together; the big one exceeds the budget and runs alone
+    budget = 4 * estimate_decoded_bytes(paths[0])
+    results = list(convert_batch(paths, out_dir, "png", workers=3, memory_budget=budget))
+    assert sorted(r.input_path for r in results) == sorted(paths)
+    assert all(r.error is None for r in results)
+
+
+def test_parse_byte_size():
+    assert parse_byte_size("512M") == 512 << 20
+    assert parse_byte_size("4GiB") == 4 << 30
+    assert parse_byte_size(2048) == 2048
+    with pytest.raises(ValueError):
+        parse_byte_size("lots")
+
+
+def test_convert_batch_chunks_small_files(tmp_img_dir):
+    paths = _make_pngs(tmp_img_dir["input"], 7)
+    out_dir = str(tmp_img_dir["output"])
+    results = list(convert_batch(paths, out_dir, "png", workers=2, chunk_size=3, grayscale=True))
+    assert sorted(r.input_path for r in results) == sorted(paths)
+    for result in results:
+        assert result.error is None
+        with Image.open(result.output_path) as img:
+            assert img.mode == "L"
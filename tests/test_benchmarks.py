@@ -0,0 +1,33 @@
+"""Smoke tests for the benchmark suite (tiny corpus, no timing assertions)."""
+import os
+import sys
+
+from tests.conftest import ROOT
+
+sys.path.insert(0, os.path.join(ROOT, "benchmarks"))
+
+import bench_image_ops  # noqa: E402
+
+
+def test_suite_runs_on_tiny_corpus(tmp_path):
+    corpus = bench_image_ops.make_corpus(
+        str(tmp_path), megapixels=(0.05,), batch_size=2, gif_frames=4, batch_megapixels=0.05,
+        rgba_megapixels=0.05,
+    )
+    results = bench_image_ops.run_suite(corpus, repeat=1, workers=1, isolate=False)
+    names = set(results["benchmarks"])
+    assert "apply_transforms[0.05mp]" in names
+    assert {"save_image[jpg,0.05mp]", "save_image[png,0.05mp]", "save_image[webp,0.05mp]"} <= names
+    for record in results["benchmarks"].values():
+        assert record["seconds_min"] > 0
+        assert record["images_per_sec"] > 0
+
+
+def test_compare_to_baseline_flags_slowdowns():
+    def results(**seconds):
+        return {"benchmarks": {name: {"seconds_min": s} for name, s in seconds.items()}}
+
+    baseline = results(fast=1.0, steady=2.0, gone=1.0)
+    current = results(fast=1.3, steady=2.1, new=5.0)
+    assert bench_image_ops.compare_to_baseline(current, baseline, threshold=0.15) == [("fast", 1.0, 1.3)]
+    assert bench_image_ops.compare_to_baseline(current, baseline, threshold=0.5) == []
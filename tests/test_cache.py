@@ -0,0 +1,112 @@
+"""Tests for the content-addressed output cache."""
+import os
+
+from PIL import Image
+
+from image_cache import OutputCache
+from image_ops import convert_batch, normalize_settings, settings_digest
+
+
+def test_normalize_settings_drops_irrelevant_values():
+    base = normalize_settings("png", resize_width=10, quality=5)
+    assert base == normalize_settings("PNG", resize_width=999, quality=90)
+    assert "quality" not in base
+    assert normalize_settings("jpg", quality=500)["quality"] == 100
+    assert normalize_settings("jpg") == normalize_settings("jpeg")
+    assert settings_digest("png", rotate_degrees=360) == settings_digest("png")
+    assert settings_digest("png", grayscale=True) != settings_digest("png")
+
+
+def test_batch_serves_unchanged_files_from_cache(rgb_png, rgba_png, tmp_img_dir):
+    cache_dir = str(tmp_img_dir["root"] / "cache")
+    out_dir = str(tmp_img_dir["output"])
+
+    cache = OutputCache(cache_dir)
+    first = list(convert_batch([rgb_png, rgba_png], out_dir, "webp", workers=1, cache=cache))
+    assert all(r.error is None for r in first)
+    assert (cache.hits, cache.misses) == (0, 2)
+
+    # Outputs vanish; a fresh cache instance reloads the index from disk
+    for result in first:
+        os.remove(result.output_path)
+    cache = OutputCache(cache_dir)
+    second = list(convert_batch([rgb_png, rgba_png], out_dir, "webp", workers=1, cache=cache))
+    assert (cache.hits, cache.misses) == (2, 0)
+    assert all(os.path.isfile(r.output_path) for r in second)
+
+    # Different settings are a different key
+    cache = OutputCache(cache_dir)
+    list(convert_batch([rgb_png], out_dir, "webp", workers=1, cache=cache, quality=40))
+    assert (cache.hits, cache.misses) == (0, 1)
+
+
+def test_cache_rehashes_touched_source_and_detects_changes(rgb_png, tmp_img_dir):
+    cache = OutputCache(str(tmp_img_dir["root"] / "cache"))
+    out_dir = str(tmp_img_dir["output"])
+    list(convert_batch([rgb_png], out_dir, "png", workers=1, cache=cache))
+
+    # Same bytes, new mtime: full hash still matches
+    stat = os.stat(rgb_png)
+    os.utime(rgb_png, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    list(convert_batch([rgb_png], out_dir, "png", workers=1, cache=cache))
+    assert cache.hits == 1
+
+    Image.new("RGB", (100, 50), color=(0, 0, 255)).save(rgb_png)
+    [result] = convert_batch([rgb_png], out_dir, "png", workers=1, cache=cache)
+    assert cache.misses == 2
+    with Image.open(result.output_path) as img:
+        assert img.getpixel((0, 0)) == (0, 0, 255)
+
+
+def test_cache_evicts_least_recently_used(tmp_img_dir):
+    cache = OutputCache(str(tmp_img_dir["root"] / "cache"), max_entries=2)
+    out_dir = str(tmp_img_dir["output"])
+    paths = []
+    for i in range(3):
+        path = tmp_img_dir["input"] / f"p{i}.png"
+        Image.new("RGB", (5, 5), color=(i, 0, 0)).save(path)
+        paths.append(str(path))
+    list(convert_batch(paths, out_dir, "png", workers=1, cache=cache))
+    objects = [
+        name
+        for _, _, names in os.walk(os.path.join(cache.cache_dir, "objects"))
+        for name in names
+    ]
+    assert len(objects) == 2
+
+
+def test_reconverting_does_not_corrupt_linked_cache_object(rgb_png, tmp_img_dir):
+    cache = OutputCache(str(tmp_img_dir["root"] / "cache"))
+    out_dir = str(tmp_img_dir["output"])
+    [result] = convert_batch([rgb_png], out_dir, "png", workers=1, cache=cache)
+    # A later uncached run with other settings rewrites the (hard-linked) output
+    list(convert_batch([rgb_png], out_dir, "png", workers=1, grayscale=True))
+    os.remove(result.output_path)
+    [result] = convert_batch([rgb_png], out_dir, "png", workers=1, cache=cache)
+    with Image.open(result.output_path) as img:
+        assert img.mode == "RGB"
+
+
+def test_tree_larger_than_cap_keeps_hits(tmp_img_dir, monkeypatch):
+    import image_cache
+
+    cache_dir = str(tmp_img_dir["root"] / "cache")
+    out_dir = str(tmp_img_dir["output"])
+    paths = []
+    for i in range(30):
+        path = tmp_img_dir["input"] / f"p{i:02d}.png"
+        Image.new("RGB", (5, 5), color=(i, 0, 0)).save(path)
+        paths.append(str(path))
+    with OutputCache(cache_dir, max_entries=20) as cache:
+        list(convert_batch(paths, out_dir, "jpg", workers=1, cache=cache))
+    assert (cache.hits, cache.misses) == (0, 30)
+
+    hashed = []
+    digest = image_cache.file_digest
+    monkeypatch.setattr(image_cache, "file_digest", lambda path: hashed.append(path) or digest(path))
+    for _ in range(2):
+        with OutputCache(cache_dir, max_entries=20) as cache:
+            list(convert_batch(paths, out_dir, "jpg", workers=1, cache=cache))
+        assert (cache.hits, cache.misses) == (20, 10)
+    # Every source signature survived the cap, so nothing was re-hashed
+    assert hashed == []
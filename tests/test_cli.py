@@ -0,0 +1,62 @@
+"""Tests for the headless command-line entry point."""
+import os
+import subprocess
+import sys
+
+from PIL import Image
+
+from image_cli import main
+from tests.conftest import ROOT
+
+
+def test_main_converts_with_config(rgb_png, sample_config_path, tmp_img_dir, capsys):
+    out_dir = str(tmp_img_dir["output"] / "cli")
+    code = main([rgb_png, "-o", out_dir, "-c", sample_config_path, "-j", "1"])
+    assert code == 0
+    # sample config: webp, exact 320x240 resize, rotated 90, grayscale
+    with Image.open(os.path.join(out_dir, "sample.webp")) as img:
+        assert img.format == "WEBP"
+        assert img.size == (240, 320)
+    assert "Converted 1/1 image(s)" in capsys.readouterr().out
+
+
+def test_main_format_override_and_errors(rgb_png, tmp_img_dir, capsys):
+    out_dir = str(tmp_img_dir["output"])
+    broken = tmp_img_dir["input"] / "broken.png"
+    broken.write_bytes(b"not a png")
+    code = main([rgb_png, str(broken), "-o", out_dir, "-f", "jpg", "-c", "missing.yaml"])
+    assert code == 1
+    assert os.path.isfile(os.path.join(out_dir, "sample.jpg"))
+    assert "broken.png" in capsys.readouterr().err
+
+
+def test_main_reads_path_list(rgb_png, rgba_png, tmp_img_dir):
+    listing = tmp_img_dir["root"] / "paths.txt"
+    listing.write_text(f"{rgb_png}\n# skipped\n{rgba_png}\n")
+    out_dir = tmp_img_dir["output"]
+    assert main([f"@{listing}", "-o", str(out_dir), "-j", "2"]) == 0
+    assert sorted(os.listdir(out_dir)) == ["alpha.png", "sample.png"]
+
+
+def test_main_explain(rgb_png, tmp_img_dir, capsys):
+    code = main([rgb_png, "--explain", "-c", "missing.yaml", "-f", "webp"])
+    assert code == 0
+    assert capsys.readouterr().out.splitlines() == [
+        f"{rgb_png}:",
+        "  decode 100x50 RGB",
+        "  no transforms",
+        "  encode WEBP (method=4, quality=85)",
+    ]
+    assert os.listdir(tmp_img_dir["output"]) == []
+
+
+def test_main_no_inputs(tmp_img_dir):
+    assert main([str(tmp_img_dir["input"]), "-o", str(tmp_img_dir["output"])]) == 2
+
+
+def test_cli_does_not_import_tkinter():
+    code = "import sys, image_cli; print('tkinter' in sys.modules or 'PIL.ImageTk' in sys.modules)"
+    out = subprocess.run(
+        [sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True, check=True
+    )
+    assert out.stdout.strip() == "False"
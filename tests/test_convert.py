@@ -1,6 +1,7 @@
 """Tests for end-to-end single-image conversion and path building."""
 import os
 
+import pytest
 from PIL import Image
 
 from image_ops import build_output_path, convert_single_image, save_image
@@ -79,3 +80,25 @@ def test_save_image_quality_clamped(tmp_img_dir):
     # Extreme quality values should not raise
     save_image(img, path, "jpg", quality=999)
     assert os.path.isfile(path)
+
+
+def test_fast_decode_matches_full_decode_size(tmp_img_dir):
+    src = tmp_img_dir["input"] / "camera.jpg"
+    Image.new("RGB", (1200, 900), color=(200, 100, 50)).save(src)
+    sizes = []
+    for fast in (True, False):
+        out_dir = tmp_img_dir["output"] / f"fast_{fast}"
+        out_dir.mkdir()
+        result = convert_single_image(
+            str(src),
+            str(out_dir),
+            "png",
+            enable_resize=True,
+            resize_width=100,
+            resize_height=100,
+            fast_decode=fast,
+        )
+        with Image.open(result) as img:
+            sizes.append(img.size)
+            assert img.getpixel((50, 37))[:3] == pytest.approx((200, 100, 50), abs=3)
+    assert sizes == [(100, 75), (100, 75)]
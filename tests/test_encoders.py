@@ -0,0 +1,59 @@
+"""Tests for encoder speed/size profiles."""
+import os
+
+import pytest
+from PIL import Image
+
+from image_cli import main
+from image_ops import (
+    benchmark_encoder_profiles,
+    config_to_yaml_text,
+    encoder_options,
+    load_yaml,
+    normalize_settings,
+    options_from_config,
+    save_image,
+)
+
+
+def test_encoder_options_profiles_and_overrides():
+    assert encoder_options("webp") == {"method": 4}
+    assert encoder_options("webp", "smallest") == {"method": 6}
+    assert encoder_options("jpg", "fastest") == {"optimize": False, "progressive": False}
+    overrides = {"webp_method": 2, "jpeg_subsampling": "4:4:4"}
+    assert encoder_options("webp", "balanced", overrides) == {"method": 2}
+    assert encoder_options("jpeg", "balanced", overrides)["subsampling"] == "4:4:4"
+    with pytest.raises(ValueError):
+        encoder_options("png", "tiny")
+    with pytest.raises(ValueError):
+        encoder_options("png", "balanced", {"png_speed": 1})
+
+
+def test_smallest_png_is_not_larger_than_fastest(tmp_path):
+    img = Image.linear_gradient("L").resize((300, 200)).convert("RGB")
+    fast = save_image(img, str(tmp_path / "fast.png"), "png", encoder_profile="fastest")
+    small = save_image(img, str(tmp_path / "small.png"), "png", encoder_profile="smallest")
+    assert os.path.getsize(small) <= os.path.getsize(fast)
+    with Image.open(small) as out:
+        assert out.tobytes() == img.tobytes()
+
+
+def test_encoder_config_roundtrip(tmp_path):
+    path = tmp_path / "enc.yaml"
+    path.write_text(config_to_yaml_text({"encoder_profile": "smallest", "webp_method": 3, "png_optimize": False}))
+    config = load_yaml(str(path))
+    options = options_from_config(config)
+    assert options["encoder_profile"] == "smallest"
+    assert options["encoder_overrides"] == {"png_optimize": False, "webp_method": 3}
+    # Cache keys see the resolved save() options only
+    assert normalize_settings("webp", **options)["encoder"] == {"method": 3}
+    assert normalize_settings("png", encoder_profile="fastest") != normalize_settings("png")
+
+
+def test_benchmark_encoder_profiles(rgb_png, rgba_png, capsys):
+    results = benchmark_encoder_profiles([rgb_png, rgba_png], ["png", "jpeg"])
+    assert len(results) == 6
+    assert all(r["images"] == 2 and r["bytes"] > 0 for r in results)
+    assert main(["--bench-encoders", rgb_png, "-f", "webp"]) == 0
+    out = capsys.readouterr().out
+    assert "smallest" in out and "webp" in out
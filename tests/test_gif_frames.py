@@ -0,0 +1,74 @@
+"""Tests for multi-frame GIF extraction."""
+import os
+
+import pytest
+from PIL import Image
+
+from image_cli import main
+from image_ops import (
+    config_to_yaml_text,
+    convert_batch,
+    convert_gif_frames,
+    options_from_config,
+    parse_frame_spec,
+    select_frames,
+)
+
+
+def test_parse_and_select_frames():
+    assert parse_frame_spec("0, 5,9") == [(0, 1, 1), (5, 6, 1), (9, 10, 1)]
+    assert parse_frame_spec("10-20") == [(10, 21, 1)]
+    assert parse_frame_spec("all:10") == [(0, None, 10)]
+    assert select_frames("all:10", 25) == [0, 10, 20]
+    assert select_frames("3-:4, 2, 2", 12) == [2, 3, 7, 11]
+    assert select_frames("40-50", 12) == []
+    assert select_frames(7, 12) == [7]
+    for bad in ("", "x", "5-2", "0:0", "-3:2:1"):
+        with pytest.raises(ValueError):
+            parse_frame_spec(bad)
+
+
+def test_convert_gif_frames_one_pass(multi_frame_gif, tmp_img_dir):
+    out_dir = str(tmp_img_dir["output"])
+    outputs = convert_gif_frames(multi_frame_gif, out_dir, "png", "2, 0", enable_resize=True,
+                                 resize_width=20, resize_height=20)
+    assert [os.path.basename(p) for p in outputs] == ["anim_frame0.png", "anim_frame2.png"]
+    colors = []
+    for output in outputs:
+        with Image.open(output) as img:
+            assert img.size == (20, 20)
+            colors.append(img.convert("RGB").getpixel((10, 10)))
+    assert colors == [(255, 0, 0), (0, 0, 255)]
+    with pytest.raises(ValueError):
+        convert_gif_frames(multi_frame_gif, out_dir, "png", "5-9")
+
+
+def test_batch_and_config_gif_frames(multi_frame_gif, rgb_png, tmp_img_dir):
+    options = options_from_config({"gif_frames": "all:2"})
+    assert options["gif_frames"] == "all:2"
+    assert "gif_frames: all:2" in config_to_yaml_text(options)
+
+    out_dir = str(tmp_img_dir["output"])
+    results = convert_batch([multi_frame_gif, rgb_png], out_dir, "png", workers=1, **options)
+    outputs = {os.path.basename(r.input_path): r.output_path for r in results}
+    assert [os.path.basename(p) for p in outputs["anim.gif"]] == ["anim_frame0.png", "anim_frame2.png"]
+    # Non-GIF inputs convert as usual
+    assert os.path.basename(outputs["sample.png"]) == "sample.png"
+    with pytest.raises(ValueError):
+        list(convert_batch([multi_frame_gif], out_dir, "png", variants="20", **options))
+
+
+def test_cli_gif_frames(multi_frame_gif, tmp_img_dir, capsys):
+    out_dir = str(tmp_img_dir["output"])
+    code = main([multi_frame_gif, "-o", out_dir, "-c", "missing.yaml", "--gif-frames", "1-2", "-j", "1"])
+    assert code == 0
+    assert sorted(os.listdir(out_dir)) == ["anim_frame1.png", "anim_frame2.png"]
+    assert "anim_frame1.png, " in capsys.readouterr().out
+
+
+@pytest.mark.parametrize("extra", [["--gif-frames", "9-3"], ["--gif-frames", "0", "--variants", "100"]])
+def test_cli_rejects_bad_gif_frames(multi_frame_gif, tmp_img_dir, capsys, extra):
+    with pytest.raises(SystemExit) as exit_info:
+        main([multi_frame_gif, "-o", str(tmp_img_dir["output"]), "-c", "missing.yaml", *extra])
+    assert exit_info.value.code == 2
+    assert "gif-frames" in capsys.readouterr().err
@@ -0,0 +1,94 @@
+"""Tests for resumable batch jobs."""
+import json
+import os
+
+import pytest
+from PIL import Image
+
+from image_cli import main
+from image_journal import BatchJournal
+from image_ops import convert_batch, save_image
+
+
+def test_rerun_skips_finished_and_retries_failed(rgb_png, rgba_png, tmp_img_dir):
+    journal_dir = str(tmp_img_dir["root"] / "jobs")
+    out_dir = str(tmp_img_dir["output"])
+    broken = tmp_img_dir["input"] / "broken.png"
+    broken.write_bytes(b"not a png")
+    paths = [rgb_png, rgba_png, str(broken)]
+
+    with BatchJournal(journal_dir, "job1") as journal:
+        results = list(convert_batch(paths, out_dir, "png", workers=1, journal=journal))
+    assert [r.error is None for r in results] == [True, True, False]
+    with open(journal.path) as f:
+        entries = [json.loads(line) for line in f]
+    assert [e["status"] for e in entries] == ["done", "done", "failed"]
+
+    # Fix the broken file and lose one output; only those two run again
+    Image.new("RGB", (5, 5)).save(broken, format="PNG")
+    os.remove(results[1].output_path)
+    with BatchJournal(journal_dir, "job1") as journal:
+        results = list(convert_batch(paths, out_dir, "png", workers=1, journal=journal))
+        assert journal.skipped == 1
+    assert all(r.error is None for r in results)
+
+    # Other settings are not the same job result
+    with BatchJournal(journal_dir, "job1") as journal:
+        list(convert_batch(paths, out_dir, "png", workers=1, journal=journal, grayscale=True))
+        assert journal.skipped == 0
+
+
+def test_journal_repairs_torn_last_line(rgb_png, rgba_png, tmp_img_dir):
+    journal_dir = str(tmp_img_dir["root"] / "jobs")
+    out_dir = str(tmp_img_dir["output"])
+    with BatchJournal(journal_dir, "job") as journal:
+        list(convert_batch([rgb_png], out_dir, "png", workers=1, journal=journal))
+    with open(journal.path, "a") as f:
+        f.write('{"input": "/x.png", "sta')
+    with BatchJournal(journal_dir, "job") as journal:
+        list(convert_batch([rgb_png, rgba_png], out_dir, "png", workers=1, journal=journal))
+        assert journal.skipped == 1
+    # The entry written after the crash landed on a line of its own
+    with BatchJournal(journal_dir, "job") as journal:
+        list(convert_batch([rgb_png, rgba_png], out_dir, "png", workers=1, journal=journal))
+        assert journal.skipped == 2
+
+
+def test_journal_is_tied_to_output_dir(rgb_png, tmp_img_dir, monkeypatch):
+    journal_dir = str(tmp_img_dir["root"] / "jobs")
+    monkeypatch.chdir(tmp_img_dir["root"])
+    with BatchJournal(journal_dir, "job") as journal:
+        [result] = convert_batch([rgb_png], "outputs", "jpg", workers=1, journal=journal)
+    with open(journal.path) as f:
+        assert json.loads(f.readline())["output"] == os.path.abspath(result.output_path)
+
+    # Same job id, another output directory: convert again
+    (tmp_img_dir["root"] / "elsewhere").mkdir()
+    with BatchJournal(journal_dir, "job") as journal:
+        [result] = convert_batch([rgb_png], "elsewhere", "jpg", workers=1, journal=journal)
+        assert journal.skipped == 0
+    assert os.path.isfile(tmp_img_dir["root"] / "elsewhere" / "sample.jpg")
+
+    # Same directory reached from another working directory: skip
+    monkeypatch.chdir(tmp_img_dir["input"])
+    with BatchJournal(journal_dir, "job") as journal:
+        list(convert_batch([rgb_png], "../elsewhere", "jpg", workers=1, journal=journal))
+        assert journal.skipped == 1
+
+
+def test_save_image_leaves_no_partial_output(tmp_path):
+    output = tmp_path / "out.png"
+    output.write_bytes(b"previous")
+    # JPEG cannot store 32-bit integer pixels; the encoder fails mid-save
+    with pytest.raises(OSError):
+        save_image(Image.new("I", (4, 4)), str(output), "jpg")
+    assert output.read_bytes() == b"previous"
+    assert os.listdir(tmp_path) == ["out.png"]
+
+
+def test_cli_job_id(rgb_png, tmp_img_dir, capsys):
+    args = [rgb_png, "-o", str(tmp_img_dir["output"]), "-c", "missing.yaml"]
+    args += ["--job-id", "nightly", "--journal-dir", str(tmp_img_dir["root"] / "jobs")]
+    assert main(args) == 0
+    assert main(args) == 0
+    assert "Job nightly: 1 file(s) already done" in capsys.readouterr().out
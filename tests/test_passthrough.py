@@ -0,0 +1,102 @@
+"""Tests for the no-op passthrough fast path."""
+import os
+
+import pytest
+from PIL import Image
+
+import image_ops
+from image_cli import main
+from image_ops import (
+    can_pass_through,
+    convert_batch,
+    convert_image_data,
+    convert_single_image,
+    load_yaml,
+    options_from_config,
+    settings_digest,
+)
+from image_pipeline import convert_pipelined
+
+
+@pytest.fixture
+def photo_jpg(tmp_img_dir):
+    path = tmp_img_dir["input"] / "photo.jpg"
+    Image.linear_gradient("L").resize((64, 48)).convert("RGB").save(path, quality=70)
+    return str(path)
+
+
+def test_can_pass_through(rgb_png, photo_jpg, multi_frame_gif):
+    assert can_pass_through(rgb_png, "png")
+    assert can_pass_through(photo_jpg, "jpeg", quality=95)
+    # A resize box the image already fits in changes nothing
+    assert can_pass_through(rgb_png, "png", enable_resize=True, resize_width=500, resize_height=500)
+    assert can_pass_through(rgb_png, "png", rotate_degrees=360)
+    assert not can_pass_through(rgb_png, "webp")
+    assert not can_pass_through(rgb_png, "png", grayscale=True)
+    assert not can_pass_through(rgb_png, "png", rotate_degrees=90)
+    assert not can_pass_through(rgb_png, "png", enable_resize=True, resize_width=50, resize_height=50)
+    assert not can_pass_through(rgb_png, "png", passthrough="off")
+    assert not can_pass_through(multi_frame_gif, "gif")
+    with pytest.raises(ValueError):
+        can_pass_through(rgb_png, "png", passthrough="maybe")
+
+
+def test_can_pass_through_rules_out_before_probing(rgb_png, monkeypatch):
+    def probe_image(path):
+        raise AssertionError("probed")
+
+    monkeypatch.setattr(image_ops, "probe_image", probe_image)
+    assert not can_pass_through(rgb_png, "jpg")
+    assert not can_pass_through(rgb_png, "png", grayscale=True)
+    assert not can_pass_through(rgb_png, "png", rotate_degrees=90)
+    assert not can_pass_through(rgb_png, "png", passthrough="off")
+
+
+def test_convert_copies_bytes(photo_jpg, tmp_img_dir):
+    out_dir = str(tmp_img_dir["output"])
+    output = convert_single_image(photo_jpg, out_dir, "jpg", quality=95)
+    source = open(photo_jpg, "rb").read()
+    assert open(output, "rb").read() == source
+    assert not os.path.samefile(photo_jpg, output)
+
+    linked = convert_single_image(photo_jpg, out_dir, "jpg", passthrough="link")
+    assert os.path.samefile(photo_jpg, linked)
+    # In place: nothing to do
+    assert convert_single_image(photo_jpg, str(tmp_img_dir["input"]), "jpg") == photo_jpg
+    assert open(photo_jpg, "rb").read() == source
+
+    reencoded = convert_single_image(photo_jpg, out_dir, "jpg", quality=95, passthrough="off")
+    assert open(reencoded, "rb").read() != source
+    assert convert_image_data(source, "jpg") is source
+    # A cut-off source is decoded (and fails) rather than handed back
+    with pytest.raises(OSError):
+        convert_image_data(source[:-100], "jpg")
+
+
+def test_batch_reports_passthrough(rgb_png, photo_jpg, tmp_img_dir, capsys):
+    out_dir = str(tmp_img_dir["output"])
+    results = convert_batch([rgb_png, photo_jpg], out_dir, "png", workers=1)
+    results = {os.path.basename(r.input_path): r for r in results}
+    assert results["sample.png"].passthrough and not results["photo.jpg"].passthrough
+    assert settings_digest("png", passthrough="copy") == settings_digest("png", passthrough="link")
+    assert settings_digest("png", passthrough="copy") != settings_digest("png", passthrough="off")
+
+    code = main([rgb_png, photo_jpg, "-o", out_dir, "-c", "missing.yaml", "-f", "png", "-j", "1"])
+    assert code == 0
+    assert "Passthrough: 1 file(s)" in capsys.readouterr().out
+
+    results = convert_pipelined([rgb_png, photo_jpg], out_dir, "png", workers=1)
+    results = {os.path.basename(r.input_path): r for r in results}
+    assert results["sample.png"].passthrough and not results["photo.jpg"].passthrough
+    code = main([rgb_png, photo_jpg, "-o", out_dir, "-c", "missing.yaml", "-f", "png", "--io-depth", "2"])
+    assert code == 0
+    assert "Passthrough: 1 file(s)" in capsys.readouterr().out
+
+
+@pytest.mark.parametrize("value, mode", [("false", "off"), ("off", "off"), ("true", "copy"), ("link", "link")])
+def test_config_passthrough_values(tmp_path, rgb_png, value, mode):
+    config = tmp_path / "config.yaml"
+    config.write_text(f"passthrough: {value}\n")
+    options = options_from_config(load_yaml(str(config)))
+    assert options["passthrough"] == mode
+    assert can_pass_through(rgb_png, "png", **options) == (mode != "off")
@@ -0,0 +1,56 @@
+"""Tests for the pipelined (overlapped I/O) batch executor."""
+import io
+import os
+
+from PIL import Image
+
+from image_cli import main
+from image_ops import convert_image_data, convert_single_image
+from image_pipeline import convert_pipelined
+
+
+def test_convert_image_data_matches_file_conversion(rgb_png, multi_frame_gif, tmp_img_dir):
+    options = dict(enable_resize=True, resize_width=40, resize_height=40, rotate_degrees=90, grayscale=True)
+    with open(rgb_png, "rb") as f:
+        encoded = convert_image_data(f.read(), "png", **options)
+    path = convert_single_image(rgb_png, str(tmp_img_dir["output"]), "png", **options)
+    with Image.open(io.BytesIO(encoded)) as from_bytes, Image.open(path) as from_file:
+        assert from_bytes.size == (20, 40)
+        assert from_bytes.tobytes() == from_file.tobytes()
+
+    with open(multi_frame_gif, "rb") as f:
+        frame = convert_image_data(f.read(), "png", gif_frame=1)
+    with Image.open(io.BytesIO(frame)) as img:
+        assert img.convert("RGB").getpixel((0, 0)) == (0, 255, 0)
+
+
+def test_convert_pipelined(rgb_png, rgba_png, tmp_img_dir):
+    out_dir = str(tmp_img_dir["output"])
+    missing = str(tmp_img_dir["input"] / "missing.png")
+    broken = tmp_img_dir["input"] / "broken.png"
+    broken.write_bytes(b"not a png")
+    paths = [rgb_png, missing, rgba_png, str(broken)]
+    for workers in (1, 2):
+        results = {r.input_path: r for r in convert_pipelined(paths, out_dir, "jpg", workers=workers, io_depth=2)}
+        assert set(results) == set(paths)
+        assert results[missing].error and results[str(broken)].error
+        for path in (rgb_png, rgba_png):
+            with Image.open(results[path].output_path) as img:
+                assert img.format == "JPEG"
+    assert sorted(os.listdir(out_dir)) == ["alpha.jpg", "sample.jpg"]
+
+
+def test_cli_io_depth(rgb_png, tmp_img_dir, capsys):
+    out_dir = str(tmp_img_dir["output"])
+    assert main([rgb_png, "-o", out_dir, "-c", "missing.yaml", "--io-depth", "4", "-j", "1"]) == 0
+    assert os.path.isfile(os.path.join(out_dir, "sample.png"))
+    assert main([rgb_png, "-o", out_dir, "-c", "missing.yaml", "--io-depth", "4", "--job-id", "x"]) == 2
+
+
+def test_pipelined_passthrough_link(rgb_png, tmp_img_dir):
+    out_dir = str(tmp_img_dir["output"])
+    [linked] = convert_pipelined([rgb_png], out_dir, "png", workers=1, passthrough="link")
+    assert linked.passthrough and os.path.samefile(rgb_png, linked.output_path)
+    os.remove(linked.output_path)
+    [copied] = convert_pipelined([rgb_png], out_dir, "png", workers=1)
+    assert copied.passthrough and not os.path.samefile(rgb_png, copied.output_path)
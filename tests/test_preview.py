@@ -0,0 +1,132 @@
+"""Tests for background preview rendering."""
+import os
+import threading
+import time
+
+import pytest
+from PIL import Image
+
+from image_ops import apply_transforms
+from image_preview import (
+    PreviewCancelled,
+    PreviewWorker,
+    _load_proxy_cached,
+    clear_proxy_cache,
+    load_proxy,
+    render_preview,
+)
+
+
+def _wait_for_result(worker, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        result = worker.poll()
+        if result is not None:
+            return result
+        time.sleep(0.01)
+    raise AssertionError("preview worker produced no result")
+
+
+def test_render_preview_applies_transforms(rgb_png):
+    img, frame_count = render_preview(rgb_png, rotate_degrees=90, grayscale=True)
+    assert frame_count is None
+    assert img.size == (50, 100)
+    assert img.mode == "L"
+
+
+def test_render_preview_fits_box_and_reports_gif_frames(multi_frame_gif):
+    img, frame_count = render_preview(multi_frame_gif, box=(20, 20), gif_frame=2)
+    assert frame_count == 3
+    assert img.size == (20, 20)
+    assert img.convert("RGB").getpixel((0, 0)) == (0, 0, 255)
+
+
+def test_render_preview_cancelled(rgb_png):
+    with pytest.raises(PreviewCancelled):
+        render_preview(rgb_png, is_cancelled=lambda: True)
+
+
+@pytest.mark.parametrize(
+    "options",
+    [
+        {},
+        {"enable_resize": True, "resize_width": 300, "resize_height": 300},
+        {"enable_resize": True, "resize_width": 2000, "resize_height": 500, "maintain_aspect": False},
+        {"enable_resize": True, "resize_width": 150, "resize_height": 90, "rotate_degrees": 30},
+        {"rotate_degrees": 45, "grayscale": True},
+    ],
+)
+def test_proxy_preview_matches_full_resolution_size(tmp_path, options):
+    path = str(tmp_path / "large.jpg")
+    Image.new("RGB", (3000, 2000), color=(10, 200, 30)).save(path)
+    clear_proxy_cache()
+
+    preview, _ = render_preview(path, **options)
+
+    with Image.open(path) as img:
+        expected = apply_transforms(img.copy(), **options)
+    expected.thumbnail((400, 400))
+    assert abs(preview.width - expected.width) <= 2
+    assert abs(preview.height - expected.height) <= 2
+    assert preview.mode == expected.mode
+
+
+def test_proxy_cache_reuses_decode_until_file_changes(tmp_path):
+    path = str(tmp_path / "cached.png")
+    Image.new("RGB", (2048, 1024), color=(255, 0, 0)).save(path)
+    clear_proxy_cache()
+
+    proxy, scale, frame_count = load_proxy(path)
+    assert proxy.size == (1024, 512)
+    assert scale == 0.5
+    assert frame_count is None
+    render_preview(path, rotate_degrees=10)
+    render_preview(path, grayscale=True)
+    assert _load_proxy_cached.cache_info().misses == 1
+
+    Image.new("RGB", (100, 100), color=(0, 0, 255)).save(path)
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    proxy, scale, _ = load_proxy(path)
+    assert proxy.size == (100, 100)
+    assert _load_proxy_cached.cache_info().misses == 2
+
+
+def test_worker_keeps_only_newest_result():
+    started = threading.Event()
+    release = threading.Event()
+
+    def render(value, is_cancelled):
+        if value == "slow":
+            started.set()
+            release.wait(5)
+        return value
+
+    worker = PreviewWorker(render=render)
+    try:
+        worker.submit("slow")
+        assert started.wait(5)
+        # Both of these arrive while "slow" is rendering; only the last survives
+        worker.submit("middle")
+        newest = worker.submit("newest")
+        release.set()
+        generation, value, error = _wait_for_result(worker)
+        assert (generation, value, error) == (newest, "newest", None)
+        time.sleep(0.05)
+        assert worker.poll() is None
+    finally:
+        worker.close()
+
+
+def test_worker_reports_errors():
+    def render(is_cancelled):
+        raise ValueError("bad input")
+
+    worker = PreviewWorker(render=render)
+    try:
+        worker.submit()
+        _, value, error = _wait_for_result(worker)
+        assert value is None
+        assert isinstance(error, ValueError)
+    finally:
+        worker.close()
@@ -0,0 +1,53 @@
+"""Tests for header-only image probing."""
+import os
+
+from PIL import Image
+
+from image_cli import main
+from image_ops import probe_image, probe_images
+
+
+def test_probe_formats(rgb_png, multi_frame_gif, tmp_img_dir):
+    jpg = tmp_img_dir["input"] / "photo.jpg"
+    Image.new("RGB", (30, 20)).save(jpg)
+    png, gif, jpeg = probe_images([rgb_png, multi_frame_gif, str(jpg)], workers=2)
+    assert (png.format, png.size, png.mode, png.n_frames, png.animated, png.status) == (
+        "PNG", (100, 50), "RGB", 1, False, "ok"
+    )
+    assert (gif.format, gif.n_frames, gif.animated, gif.status) == ("GIF", 3, True, "ok")
+    assert (jpeg.format, jpeg.size, jpeg.status) == ("JPEG", (30, 20), "ok")
+    assert gif.path == multi_frame_gif
+
+
+def test_probe_damaged_files(rgb_png, tmp_img_dir):
+    data = open(rgb_png, "rb").read()
+    truncated = tmp_img_dir["input"] / "cut.png"
+    truncated.write_bytes(data[:-20])
+    junk = tmp_img_dir["input"] / "junk.jpg"
+    junk.write_bytes(b"not an image")
+    cut, bad, missing = probe_images([str(truncated), str(junk), str(tmp_img_dir["input"] / "gone.png")])
+    assert cut.status == "truncated" and cut.size == (100, 50)
+    assert bad.status == "corrupt" and bad.error
+    assert str(junk) in bad.error and "BufferedReader" not in bad.error
+    assert missing.status == "corrupt"
+
+
+def test_probe_memoized_until_file_changes(tmp_img_dir):
+    path = str(tmp_img_dir["input"] / "a.png")
+    Image.new("RGB", (10, 10)).save(path)
+    first = probe_image(path)
+    assert probe_image(path) == first
+    Image.new("RGB", (12, 10)).save(path)
+    os.utime(path, ns=(0, os.stat(path).st_mtime_ns + 1000))
+    assert probe_image(path).size == (12, 10)
+
+
+def test_cli_probe(rgb_png, tmp_img_dir, capsys):
+    junk = tmp_img_dir["input"] / "junk.png"
+    junk.write_bytes(b"\x89PNG broken")
+    code = main([str(tmp_img_dir["input"]), "--probe", "-c", "missing.yaml"])
+    out = capsys.readouterr().out
+    assert code == 1
+    assert "sample.png: PNG 100x50 RGB, 1 frame(s)" in out
+    assert "junk.png: corrupt" in out
+    assert "Probed 2 file(s), 1 damaged" in out
@@ -0,0 +1,94 @@
+"""Tests for per-stage conversion instrumentation."""
+import json
+
+import pytest
+
+from image_cli import main
+from image_ops import (
+    ConversionProfile,
+    StageRecord,
+    convert_batch,
+    convert_single_image,
+    format_profile_summary,
+    summarize_profiles,
+)
+
+
+def test_profile_records_each_stage(rgb_png, tmp_img_dir):
+    profile = ConversionProfile(rgb_png)
+    convert_single_image(
+        rgb_png,
+        str(tmp_img_dir["output"]),
+        "jpg",
+        enable_resize=True,
+        resize_width=50,
+        resize_height=50,
+        rotate_degrees=90,
+        grayscale=True,
+        profile=profile,
+    )
+    assert [r.stage for r in profile.stages] == ["decode", "grayscale", "resize", "rotate", "encode"]
+    for record in profile.stages:
+        assert record.wall >= 0 and record.cpu >= 0
+    decode = profile.stages[0]
+    # The decoded source only (no defensive copy), 4 bytes per RGB pixel
+    assert decode.peak_bytes == 100 * 50 * 4
+    assert profile.total_wall == pytest.approx(sum(r.wall for r in profile.stages))
+
+
+def test_profile_gif_frame_stage(multi_frame_gif, tmp_img_dir):
+    profile = ConversionProfile()
+    convert_single_image(multi_frame_gif, str(tmp_img_dir["output"]), "png", profile=profile)
+    assert [r.stage for r in profile.stages] == ["gif_frame", "encode"]
+
+
+def test_batch_profiles_and_summary(rgb_png, rgba_png, tmp_img_dir):
+    results = list(
+        convert_batch(
+            [rgb_png, rgba_png], str(tmp_img_dir["output"]), "png", workers=2, passthrough="off", profile=True
+        )
+    )
+    profiles = [r.profile for r in results]
+    assert all(isinstance(p, ConversionProfile) for p in profiles)
+    summary = summarize_profiles(profiles, slowest=1)
+    assert summary["files"] == 2
+    assert summary["stages"]["decode"]["count"] == 2
+    assert len(summary["slowest_files"]) == 1
+    assert "decode" in format_profile_summary(summary)
+
+
+def test_summary_columns_fit_long_stage_names(rgb_png, rgba_png, tmp_img_dir):
+    results = convert_batch([rgb_png, rgba_png], str(tmp_img_dir["output"]), "png", workers=1, profile=True)
+    summary = summarize_profiles([r.profile for r in results], slowest=0)
+    assert "passthrough" in summary["stages"]
+    table = format_profile_summary(summary).splitlines()
+    assert len({len(line) for line in table}) == 1
+
+
+def test_batch_without_profile_has_none(rgb_png, tmp_img_dir):
+    [result] = convert_batch([rgb_png], str(tmp_img_dir["output"]), "png", workers=1)
+    assert result.profile is None
+
+
+def test_summarize_percentiles():
+    profiles = []
+    for i in range(1, 21):
+        profile = ConversionProfile(f"f{i}")
+        profile.stages.append(StageRecord("encode", i / 100, i / 200, i))
+        profiles.append(profile)
+    stats = summarize_profiles(profiles)["stages"]["encode"]
+    assert stats["wall_p50"] == pytest.approx(0.10)
+    assert stats["wall_p95"] == pytest.approx(0.19)
+    assert stats["wall_max"] == pytest.approx(0.20)
+    assert stats["peak_bytes_max"] == 20
+
+
+def test_cli_profile_json(rgb_png, tmp_img_dir):
+    out_json = tmp_img_dir["root"] / "profile.json"
+    code = main([
+        rgb_png, "-o", str(tmp_img_dir["output"]), "-j", "1", "--passthrough", "off", "--profile-json", str(out_json)
+    ])
+    assert code == 0
+    summary = json.loads(out_json.read_text())
+    assert summary["files"] == 1
+    assert set(summary["stages"]) == {"decode", "encode"}
@@ -0,0 +1,112 @@
+"""Tests for the local HTTP conversion service."""
+import http.client
+import io
+import json
+import threading
+import urllib.error
+import urllib.request
+from concurrent.futures import Future
+
+import pytest
+from PIL import Image
+
+from image_service import ConversionService, ServiceBusy, make_server, options_from_query
+
+
+@pytest.fixture(scope="module")
+def service():
+    with ConversionService(workers=1, max_queue=4, cache_entries=2) as service:
+        yield service
+
+
+@pytest.fixture
+def server(service):
+    defaults = {"output_format": "png", "quality": 70}
+    server = make_server("127.0.0.1", 0, service=service, defaults=defaults, quiet=True)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield "http://%s:%d" % server.server_address[:2]
+    server.shutdown()
+    server.server_close()
+
+
+def _jpeg(color=(255, 0, 0), size=(40, 20)):
+    buffer = io.BytesIO()
+    Image.new("RGB", size, color).save(buffer, "JPEG")
+    return buffer.getvalue()
+
+
+def _post(url, data):
+    with urllib.request.urlopen(urllib.request.Request(url, data=data, method="POST")) as response:
+        return response.status, response.headers, response.read()
+
+
+def test_options_from_query():
+    fmt, options = options_from_query("format=WEBP&width=100&height=80&grayscale=yes", {"quality": 60})
+    assert fmt == "webp"
+    assert options == {
+        "quality": 60, "enable_resize": True, "resize_width": 100, "resize_height": 80, "grayscale": True
+    }
+    for bad in ("format=bmp", "rotate=x", "grayscale=maybe", "colour=red", "encoder_profile=huge"):
+        with pytest.raises(ValueError):
+            options_from_query(bad, {})
+
+
+def test_convert_over_http(server):
+    data = _jpeg()
+    status, headers, body = _post(server + "/convert?format=webp&width=20&height=20&rotate=90", data)
+    assert status == 200 and headers["Content-Type"] == "image/webp"
+    assert headers["X-Cache"] == "miss"
+    with Image.open(io.BytesIO(body)) as img:
+        assert (img.format, img.size) == ("WEBP", (10, 20))
+    _, headers, again = _post(server + "/convert?format=webp&width=20&height=20&rotate=90", data)
+    assert headers["X-Cache"] == "hit" and again == body
+    # Config default format
+    _, headers, _ = _post(server + "/convert", data)
+    assert headers["Content-Type"] == "image/png"
+
+    with pytest.raises(urllib.error.HTTPError) as error:
+        _post(server + "/convert?format=tiff", data)
+    assert error.value.code == 400
+    with pytest.raises(urllib.error.HTTPError) as error:
+        _post(server + "/convert", b"not an image")
+    assert error.value.code == 422
+    with urllib.request.urlopen(server + "/stats") as response:
+        stats = json.loads(response.read())
+    assert stats["hits"] >= 1 and stats["cached"] <= 2
+
+
+def test_negative_content_length_is_rejected(server):
+    host, port = server[len("http://"):].split(":")
+    connection = http.client.HTTPConnection(host, int(port), timeout=5)
+    connection.putrequest("POST", "/convert")
+    connection.putheader("Content-Length", "-1")
+    connection.endheaders()
+    response = connection.getresponse()
+    assert response.status == 400
+    connection.close()
+
+
+def test_coalescing_and_backpressure(monkeypatch):
+    service = ConversionService(workers=1, max_queue=4)
+    service.close()
+    gate = Future()
+    submitted = []
+
+    def fake_submit(fn, data, output_format, **options):
+        submitted.append(data)
+        return gate if data == b"slow" else Future()
+
+    monkeypatch.setattr(service._pool, "submit", fake_submit)
+    first, source = service.submit(b"slow", "png")
+    second, coalesced = service.submit(b"slow", "png")
+    assert (source, coalesced) == ("miss", "coalesced") and first is second
+    for n in range(3):
+        service.submit(b"other %d" % n, "png")
+    with pytest.raises(ServiceBusy):
+        service.submit(b"one too many", "png")
+    assert submitted == [b"slow", b"other 0", b"other 1", b"other 2"]
+
+    gate.set_result(b"done")
+    assert service.submit(b"slow", "png")[1] == "hit"
+    assert service.snapshot()["in_flight"] == 3
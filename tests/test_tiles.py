@@ -0,0 +1,99 @@
+"""Tests for strip-wise conversion of large PNGs."""
+import os
+
+import pytest
+from PIL import Image, ImageChops
+
+import image_tiles
+from image_ops import convert_single_image
+from image_tiles import PngStripWriter, iter_png_strips, iter_resized_strips, should_convert_tiled
+
+
+def _noise(size, mode):
+    bands = [Image.effect_noise(size, 80) for _ in mode]
+    return Image.merge(mode, bands) if len(bands) > 1 else bands[0]
+
+
+def _assemble(strips, size, mode):
+    canvas = Image.new(mode, size)
+    y = 0
+    for strip in strips:
+        canvas.paste(strip, (0, y))
+        y += strip.height
+    assert y == size[1]
+    return canvas
+
+
+def _max_difference(a, b):
+    return max(high for _, high in ImageChops.difference(a.convert("RGBA"), b.convert("RGBA")).getextrema())
+
+
+@pytest.mark.parametrize("mode", ["L", "LA", "RGB", "RGBA"])
+def test_strip_decode_and_encode_roundtrip(tmp_path, mode):
+    img = _noise((53, 41), mode)
+    source = tmp_path / "src.png"
+    img.save(source)
+    strips = [strip for _, strip in iter_png_strips(str(source), strip_rows=6)]
+    assert _assemble(strips, img.size, mode).tobytes() == img.tobytes()
+
+    output = tmp_path / "out.png"
+    with PngStripWriter(str(output), img.size, mode) as writer:
+        for strip in strips:
+            writer.write(strip)
+    with Image.open(output) as written:
+        assert written.mode == mode
+        assert written.tobytes() == img.tobytes()
+
+
+@pytest.mark.parametrize("target", [(40, 30), (17, 9)])
+def test_resized_strips_match_whole_image_resize(target):
+    img = _noise((160, 120), "RGB")
+    strips = [img.crop((0, y, 160, min(y + 13, 120))) for y in range(0, 120, 13)]
+    resized = _assemble(iter_resized_strips(strips, img.size, target, out_rows=4), target, "RGB")
+    factor = int(min(160 / (target[0] * 2), 120 / (target[1] * 2)))
+    expected = (img.reduce(factor) if factor >= 2 else img).resize(target, Image.Resampling.LANCZOS)
+    assert _max_difference(resized, expected) <= 1
+
+
+def test_resized_strips_without_fast_decode_skip_the_reduce():
+    img = _noise((160, 120), "RGB")
+    strips = [img.crop((0, y, 160, min(y + 13, 120))) for y in range(0, 120, 13)]
+    resized = iter_resized_strips(strips, img.size, (17, 9), out_rows=4, fast_decode=False)
+    resized = _assemble(resized, (17, 9), "RGB")
+    assert _max_difference(resized, img.resize((17, 9), Image.Resampling.LANCZOS)) <= 1
+
+
+def test_tiled_full_decode_resamples_full_size_rows(tmp_img_dir, monkeypatch):
+    monkeypatch.setattr(image_tiles, "TILED_MIN_PIXELS", 1000)
+    img = _noise((160, 120), "RGB")
+    source = tmp_img_dir["input"] / "scan.png"
+    img.save(source)
+    options = dict(enable_resize=True, resize_width=17, resize_height=17, fast_decode=False)
+    output = convert_single_image(str(source), str(tmp_img_dir["output"]), "png", **options)
+    with Image.open(output) as out:
+        assert out.size == (17, 13)
+        assert _max_difference(out, img.resize((17, 13), Image.Resampling.LANCZOS)) <= 1
+
+
+def test_large_png_is_converted_tiled(tmp_img_dir, monkeypatch):
+    monkeypatch.setattr(image_tiles, "TILED_MIN_PIXELS", 1000)
+    img = _noise((120, 90), "RGBA")
+    source = tmp_img_dir["input"] / "scan.png"
+    img.save(source)
+    assert should_convert_tiled(str(source))
+    assert not should_convert_tiled(str(source), rotate_degrees=90)
+
+    out_dir = str(tmp_img_dir["output"])
+    options = dict(enable_resize=True, resize_width=60, resize_height=60, grayscale=True)
+    tiled = convert_single_image(str(source), out_dir, "png", **options)
+    with Image.open(tiled) as out:
+        tiled_img = out.copy()
+    os.remove(tiled)
+    whole = convert_single_image(str(source), out_dir, "png", tiled=False, **options)
+    with Image.open(whole) as out:
+        assert (tiled_img.mode, tiled_img.size) == (out.mode, out.size) == ("L", (60, 45))
+        assert _max_difference(tiled_img, out) <= 1
+
+    jpeg = convert_single_image(str(source), out_dir, "jpg", **options)
+    with Image.open(jpeg) as out:
+        assert (out.format, out.size) == ("JPEG", (60, 45))
@@ -1,7 +1,20 @@
 """Tests for image transforms and GIF handling."""
-from PIL import Image
+import math
 
-from image_ops import apply_transforms, count_gif_frames, extract_gif_frame
+import pytest
+from PIL import Image, ImageChops, ImageSequence, ImageStat
+
+from image_ops import (
+    PlanStep,
+    apply_transforms,
+    compile_transforms,
+    convert_single_image,
+    count_gif_frames,
+    explain_conversion,
+    extract_gif_frame,
+    reduce_for_resize,
+    resize_target_size,
+)
 
 
 def test_resize_disabled_preserves_size():
@@ -82,3 +95,174 @@ def test_extract_gif_frame_out_of_range_falls_back_to_first(multi_frame_gif):
     with Image.open(multi_frame_gif) as img:
         frame = extract_gif_frame(img, 99).convert("RGB")
     assert frame.getpixel((0, 0)) == (255, 0, 0)
+
+
+def test_resize_target_size_matches_thumbnail():
+    for src, box in [((100, 50), (50, 50)), ((1600, 1200), (800, 600)), ((37, 91), (20, 20)), ((10, 10), (50, 50))]:
+        img = Image.new("RGB", src)
+        img.thumbnail(box)
+        assert resize_target_size(src, *box) == img.size
+    assert resize_target_size((100, 50), 30, 40, maintain_aspect=False) == (30, 40)
+
+
+def test_reduce_for_resize_drafts_jpeg(tmp_path):
+    path = tmp_path / "big.jpg"
+    Image.new("RGB", (1600, 1200), color=(0, 0, 255)).save(path)
+    with Image.open(path) as img:
+        reduced = reduce_for_resize(img, (100, 75))
+        # Draft picks the 1/8 DCT scale: still >= 2x the target
+        assert reduced is img
+        assert img.size == (200, 150)
+        img.load()
+
+
+def test_reduce_for_resize_reduces_loaded_image():
+    img = Image.new("RGB", (1600, 1200))
+    assert reduce_for_resize(img, (100, 75)).size == (200, 150)
+    # Not enough headroom for an integer reduction
+    assert reduce_for_resize(img, (700, 500)) is img
+
+
+@pytest.mark.parametrize("mode", ["P", "1"])
+def test_palette_and_bilevel_sources_resize_without_reduce(tmp_img_dir, mode):
+    # Image.reduce rejects these modes; the final resample does all the work
+    img = Image.new(mode, (800, 600))
+    assert reduce_for_resize(img, (100, 75)) is img
+    path = tmp_img_dir["input"] / f"{mode}.png"
+    img.save(path)
+    options = dict(enable_resize=True, resize_width=100, resize_height=100)
+    output = convert_single_image(str(path), str(tmp_img_dir["output"]), "png", **options)
+    with Image.open(output) as out:
+        assert out.size == (100, 75)
+    assert not any("reduce" in line for line in explain_conversion(str(path), "png", **options))
+
+
+def test_extract_gif_frame_composites_partial_frames(tmp_path):
+    """Seeking directly must match walking every frame (delta frames + disposal)."""
+    path = tmp_path / "delta.gif"
+    frames = []
+    for i in range(5):
+        frame = Image.new("RGB", (60, 40), color=(255, 255, 255))
+        frame.paste((i * 50, 0, 0), (i * 10, 5, i * 10 + 10, 20))
+        frames.append(frame)
+    frames[0].save(path, save_all=True, append_images=frames[1:], disposal=1, duration=50)
+
+    with Image.open(path) as img:
+        walked = [frame.copy().convert("RGB") for frame in ImageSequence.Iterator(img)]
+    for index, expected in enumerate(walked):
+        with Image.open(path) as img:
+            frame = extract_gif_frame(img, index).convert("RGB")
+        assert frame.tobytes() == expected.tobytes()
+
+
+def test_count_gif_frames_single_frame_image(rgb_png):
+    assert count_gif_frames(rgb_png) == 1
+
+
+def _two_pass(img, size, degrees):
+    img = img.resize(size, Image.Resampling.LANCZOS)
+    return img.rotate(degrees, Image.Resampling.BICUBIC, expand=True)
+
+
+def test_fused_resize_rotate_matches_two_pass():
+    img = Image.linear_gradient("L").resize((150, 100)).convert("RGB")
+    for degrees in (30, 137, 359):
+        out = apply_transforms(
+            img.copy(),
+            enable_resize=True,
+            resize_width=600,
+            resize_height=400,
+            maintain_aspect=False,
+            rotate_degrees=degrees,
+        )
+        expected = _two_pass(img, (600, 400), degrees)
+        assert out.size == expected.size
+        diff = ImageStat.Stat(ImageChops.difference(out, expected)).mean
+        assert max(diff) < 2
+
+
+def _zone_plate(size):
+    # Concentric rings whose frequency rises towards the edges
+    pixels = [
+        int(127.5 + 127.5 * math.cos(math.pi * ((x - size / 2) ** 2 + (y - size / 2) ** 2) / size))
+        for y in range(size)
+        for x in range(size)
+    ]
+    img = Image.new("L", (size, size))
+    img.putdata(pixels)
+    return img
+
+
+def test_downscale_with_rotation_does_not_alias():
+    img = _zone_plate(600)
+    out = apply_transforms(
+        img, enable_resize=True, resize_width=350, resize_height=350, rotate_degrees=30
+    )
+    expected = _two_pass(img, (350, 350), 30)
+    assert out.size == expected.size
+    # Near the source's left edge the rings are above the output's Nyquist
+    # limit: they must be filtered to flat grey, not folded into moire
+    edge = (91, 310, 111, 330)
+    assert ImageStat.Stat(out.crop(edge)).stddev[0] < 5
+    assert ImageStat.Stat(ImageChops.difference(out, expected)).mean[0] < 1
+
+
+def test_right_angle_rotation_is_exact_transpose():
+    img = Image.linear_gradient("L").resize((30, 20)).convert("RGB")
+    img.putpixel((0, 0), (255, 0, 0))
+    out = apply_transforms(img.copy(), rotate_degrees=90)
+    assert out.tobytes() == img.transpose(Image.Transpose.ROTATE_90).tobytes()
+    # Counter-clockwise, like Image.rotate: top-left corner ends up bottom-left
+    assert out.getpixel((0, 29)) == (255, 0, 0)
+
+
+def test_grayscale_with_geometry_outputs_single_band():
+    img = Image.new("RGBA", (64, 32), color=(255, 0, 0, 255))
+    out = apply_transforms(
+        img, enable_resize=True, resize_width=16, resize_height=16, rotate_degrees=45, grayscale=True
+    )
+    assert out.mode == "L"
+    assert out.getpixel((out.width // 2, out.height // 2)) == 76
+
+
+def test_compiled_plan_specializes_per_source():
+    plan = compile_transforms(True, "800", 600, True, 450, True)
+    assert plan == compile_transforms(True, "800", 600, True, 450, True)
+    assert (plan.resize_box, plan.degrees) == ((800, 600), 0)
+    with pytest.raises(AttributeError):
+        plan.extra = 1
+    # Already L and already inside the box: nothing left to do
+    assert plan.specialize((400, 300), "L") == ()
+    assert plan.specialize((1600, 1200), "RGB") == (
+        PlanStep("grayscale", None, 0), PlanStep("resize", (800, 600), 0)
+    )
+    rotated = compile_transforms(True, 100, 100, True, 30, False)
+    assert rotated.specialize((400, 200), "RGB") == (
+        PlanStep("resize", (100, 50), 0), PlanStep("rotate", None, 30)
+    )
+    assert compile_transforms(True, 800, 400, False, 30, False).specialize((400, 200), "RGB") == (
+        PlanStep("resize+rotate", (800, 400), 30),
+    )
+    assert rotated.specialize((80, 40), "RGB") == (PlanStep("rotate", None, 30),)
+
+
+def test_no_op_steps_return_the_source():
+    img = Image.new("L", (20, 10))
+    assert apply_transforms(img, grayscale=True, rotate_degrees=360) is img
+
+
+def test_explain_conversion(tmp_img_dir):
+    path = tmp_img_dir["input"] / "big.jpg"
+    Image.new("RGB", (1600, 1200)).save(path)
+    lines = explain_conversion(
+        str(path), "png", enable_resize=True, resize_width=200, resize_height=200, rotate_degrees=90
+    )
+    assert lines == [
+        "decode RGB at reduced scale: 1600x1200 -> 400x300 (JPEG DCT scaling)",
+        "resize 400x300 -> 200x150 (Lanczos)",
+        "rotate 90 (exact transpose)",
+        "encode PNG (compress_level=6)",
+    ]
+    gray = tmp_img_dir["input"] / "gray.png"
+    Image.new("L", (30, 20)).save(gray)
+    assert explain_conversion(str(gray), "jpg", grayscale=True)[1] == "skip grayscale: already L"
@@ -0,0 +1,71 @@
+"""Tests for multi-size variant output."""
+import os
+
+import pytest
+from PIL import Image
+
+from image_cli import main
+from image_ops import (
+    Variant,
+    config_to_yaml_text,
+    convert_batch,
+    convert_variants,
+    format_variants,
+    options_from_config,
+    parse_variants,
+)
+
+
+def test_parse_and_format_variants():
+    variants = parse_variants("1600:webp, 800x600:JPG, 320, 1600:webp")
+    assert variants == [Variant(1600, 1600, "webp"), Variant(800, 600, "jpg"), Variant(320, 320, "png")]
+    assert parse_variants(format_variants(variants)) == variants
+    assert parse_variants(64) == [Variant(64, 64, "png")]
+    with pytest.raises(ValueError):
+        parse_variants(" , ")
+
+
+def test_convert_variants_cascade(tmp_img_dir):
+    path = tmp_img_dir["input"] / "cat.jpg"
+    Image.linear_gradient("L").resize((400, 300)).convert("RGB").save(path)
+    out_dir = str(tmp_img_dir["output"])
+    outputs = convert_variants(
+        str(path), out_dir, "200:webp, 400:png, 60x40:jpg", rotate_degrees=90, workers=2
+    )
+    names = [os.path.basename(p) for p in outputs]
+    assert names == ["cat_200.webp", "cat_400.png", "cat_60x40.jpg"]
+    sizes = []
+    for output in outputs:
+        with Image.open(output) as img:
+            sizes.append(img.size)
+    # Aspect kept, then rotated 90 degrees
+    assert sizes == [(150, 200), (300, 400), (40, 53)]
+
+
+def test_batch_and_config_variants(rgb_png, tmp_img_dir):
+    options = options_from_config({"variants": "40:png, 20:jpg", "grayscale": True})
+    assert options["variants"] == [Variant(40, 40, "png"), Variant(20, 20, "jpg")]
+    assert "variants: 40:png, 20:jpg" in config_to_yaml_text(options)
+
+    out_dir = str(tmp_img_dir["output"])
+    [result] = convert_batch([rgb_png], out_dir, "webp", workers=1, **options)
+    assert result.error is None
+    assert [os.path.basename(p) for p in result.output_path] == ["sample_40.png", "sample_20.jpg"]
+    with Image.open(result.output_path[0]) as img:
+        assert (img.size, img.mode) == ((40, 20), "L")
+    with pytest.raises(ValueError):
+        list(convert_batch([rgb_png], out_dir, "webp", cache=object(), **options))
+
+
+def test_cli_variants(rgb_png, tmp_img_dir, capsys):
+    out_dir = str(tmp_img_dir["output"])
+    assert main([rgb_png, "-o", out_dir, "-c", "missing.yaml", "--variants", "50:png,10:webp"]) == 0
+    assert sorted(os.listdir(out_dir)) == ["sample_10.webp", "sample_50.png"]
+    assert "sample_50.png, " in capsys.readouterr().out
+
+
+def test_cli_rejects_bad_variants(rgb_png, tmp_img_dir, capsys):
+    with pytest.raises(SystemExit) as exit_info:
+        main([rgb_png, "-o", str(tmp_img_dir["output"]), "-c", "missing.yaml", "--variants", "big:png"])
+    assert exit_info.value.code == 2
+    assert "Invalid variant 'big:png'" in capsys.readouterr().err
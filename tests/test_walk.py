@@ -0,0 +1,59 @@
+"""Tests for streaming input discovery and bounded batch scheduling."""
+import io
+import itertools
+
+from PIL import Image
+
+from image_ops import convert_batch, iter_image_paths
+
+
+def test_iter_image_paths_dirs_globs_and_dedupe(rgb_png, rgba_png, multi_frame_gif, tmp_img_dir):
+    input_dir = tmp_img_dir["input"]
+    (input_dir / "notes.txt").write_text("not an image")
+    nested = input_dir / "nested"
+    nested.mkdir()
+    Image.new("RGB", (4, 4)).save(nested / "deep.JPG")
+
+    flat = list(iter_image_paths([str(input_dir)], recursive=False))
+    assert sorted(flat) == sorted([rgb_png, rgba_png, multi_frame_gif])
+
+    deep = list(iter_image_paths([str(input_dir)]))
+    assert str(nested / "deep.JPG") in deep
+    assert len(deep) == 4
+
+    # Overlapping sources yield each file once
+    mixed = list(iter_image_paths([str(input_dir / "*.png"), rgb_png, str(input_dir)], recursive=False))
+    assert sorted(mixed) == sorted([rgb_png, rgba_png, multi_frame_gif])
+
+
+def test_iter_image_paths_stdin_and_list_file(rgb_png, rgba_png, tmp_img_dir, monkeypatch):
+    listing = tmp_img_dir["root"] / "list.txt"
+    listing.write_text(f"# inputs\n{rgba_png}\n\n{tmp_img_dir['root'] / 'missing.png'}\n")
+    monkeypatch.setattr("sys.stdin", io.StringIO(f"{rgb_png}\n"))
+    assert list(iter_image_paths(["-", f"@{listing}"])) == [rgb_png, rgba_png]
+
+
+def test_iter_image_paths_is_lazy(tmp_img_dir):
+    for i in range(5):
+        Image.new("RGB", (2, 2)).save(tmp_img_dir["input"] / f"{i}.png")
+    paths = iter_image_paths([str(tmp_img_dir["input"])])
+    assert len(list(itertools.islice(paths, 2))) == 2
+
+
+def test_convert_batch_consumes_input_lazily(tmp_img_dir):
+    for i in range(8):
+        Image.new("RGB", (4, 4)).save(tmp_img_dir["input"] / f"{i}.png")
+    pulled = []
+
+    def source():
+        for path in iter_image_paths([str(tmp_img_dir["input"])]):
+            pulled.append(path)
+            yield path
+
+    results = convert_batch(source(), str(tmp_img_dir["output"]), "png", workers=2, max_pending=2, chunk_size=1)
+    first = next(results)
+    assert first.error is None
+    # Only the bounded window has been read when the first result arrives
+    assert len(pulled) <= 3
+    assert len(list(results)) == 7
+    assert len(pulled) == 8
@@ -0,0 +1,106 @@
+"""Tests for the watch-folder mode."""
+import os
+import threading
+
+import pytest
+from PIL import Image
+
+from image_cli import main
+from image_journal import BatchJournal
+from image_watch import FolderWatcher, check_watch_output_dir, watch_and_convert
+
+
+def _touch_dir(path, bump):
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + bump))
+
+
+def test_watcher_waits_for_files_to_settle(tmp_img_dir):
+    inbox = tmp_img_dir["input"]
+    path = inbox / "a.png"
+    path.write_bytes(b"partial")
+    watcher = FolderWatcher([str(inbox)], settle_seconds=1.0)
+    assert watcher.poll(now=0.0) == []
+    # Still growing: the settle clock restarts
+    path.write_bytes(b"partial, more")
+    assert watcher.poll(now=0.9) == []
+    assert watcher.poll(now=1.5) == []
+    assert watcher.poll(now=2.0) == [str(path)]
+    assert watcher.poll(now=5.0) == []
+
+
+def test_watcher_lists_only_changed_directories(tmp_img_dir):
+    inbox = tmp_img_dir["input"]
+    (inbox / "sub").mkdir()
+    (inbox / "sub" / "old.jpg").write_bytes(b"x")
+    (inbox / ".hidden.png").write_bytes(b"x")
+    (inbox / "notes.txt").write_bytes(b"x")
+    out = inbox / "out"
+    out.mkdir()
+    (out / "done.png").write_bytes(b"x")
+    watcher = FolderWatcher([str(inbox)], settle_seconds=0, rescan_interval=1000, exclude=[str(out)])
+    assert watcher.poll(now=0.0) == [str(inbox / "sub" / "old.jpg")]
+    listings = watcher.listings
+    assert watcher.poll(now=1.0) == []
+    assert watcher.listings == listings
+
+    (inbox / "sub" / "new.png").write_bytes(b"y")
+    _touch_dir(inbox / "sub", 10**9)
+    assert watcher.poll(now=2.0) == [str(inbox / "sub" / "new.png")]
+    assert watcher.listings == listings + 1
+
+    # In-place rewrites leave directory mtimes alone; the full rescan finds them
+    (inbox / "sub" / "old.jpg").write_bytes(b"changed")
+    assert watcher.poll(now=3.0) == []
+    assert watcher.poll(now=1001.0) == [str(inbox / "sub" / "old.jpg")]
+
+
+def _watch_until(directories, out_dir, count, **kwargs):
+    stop = threading.Event()
+    timer = threading.Timer(20, stop.set)
+    timer.start()
+    results = []
+    try:
+        for result in watch_and_convert(
+            directories, out_dir, "png", stop=stop, poll_interval=0.02, settle_seconds=0, **kwargs
+        ):
+            results.append(result)
+            if len(results) == count:
+                stop.set()
+    finally:
+        timer.cancel()
+    return results
+
+
+def test_watch_and_convert(tmp_img_dir):
+    inbox = tmp_img_dir["input"]
+    out_dir = str(tmp_img_dir["output"])
+    Image.new("RGB", (20, 10), (255, 0, 0)).save(inbox / "first.jpg")
+    journal_dir = str(tmp_img_dir["root"] / "jobs")
+    with BatchJournal(journal_dir, "watch") as journal:
+        [result] = _watch_until([str(inbox)], out_dir, 1, workers=1, journal=journal, grayscale=True)
+    assert result.error is None
+    with Image.open(result.output_path) as img:
+        assert (img.size, img.mode) == ((20, 10), "L")
+
+    # A restart skips what the journal lists and picks up the new file
+    Image.new("RGB", (8, 8)).save(inbox / "second.png")
+    with BatchJournal(journal_dir, "watch") as journal:
+        [result] = _watch_until([str(inbox)], out_dir, 1, workers=1, journal=journal, grayscale=True)
+        assert journal.skipped == 1
+    assert os.path.basename(result.input_path) == "second.png"
+
+
+def test_output_dir_must_not_contain_watched_dirs(tmp_img_dir, capsys):
+    inbox = str(tmp_img_dir["input"])
+    root = str(tmp_img_dir["root"])
+    for output_dir in (inbox, root):
+        with pytest.raises(ValueError):
+            check_watch_output_dir([inbox], output_dir)
+        with pytest.raises(ValueError):
+            next(watch_and_convert([inbox], output_dir, "png"))
+    # Outputs inside the watched directory are simply skipped by the watcher
+    check_watch_output_dir([root], inbox)
+
+    assert main([inbox, "-o", inbox, "-c", "missing.yaml", "--watch"]) == 2
+    assert "contains the watched directory" in capsys.readouterr().err